@@ -0,0 +1,56 @@
+class Aggregates:
+    """
+    集計値 - 経済全体の合計を差分更新で保持する
+
+    家計・企業（または ArrayEngine）は消費・生産・価格・利益・雇用が
+    変化したときに差分をここへ報告します。市場や統計の記録は
+    全エージェントを走査せずに O(1) で合計を読み出せます。
+    """
+
+    def __init__(self):
+        # 家計の集計
+        self.num_households = 0
+        self.num_employed = 0
+        self.total_money = 0.0
+        self.total_consumption = 0.0
+
+        # 企業の集計
+        self.num_firms = 0
+        self.total_price = 0.0
+        self.total_production = 0.0
+        self.total_profit = 0.0
+
+    def add_household(self, household):
+        """家計を集計対象に加える"""
+        self.num_households += 1
+        self.num_employed += 1 if household.employed else 0
+        self.total_money += household.money
+        self.total_consumption += household.consumption
+
+    def add_firm(self, firm):
+        """企業を集計対象に加える"""
+        self.num_firms += 1
+        self.total_price += firm.price
+        self.total_production += firm.production
+        self.total_profit += firm.profit
+
+    @property
+    def average_price(self):
+        """企業の平均価格"""
+        if self.num_firms == 0:
+            return 0.0
+        return self.total_price / self.num_firms
+
+    @property
+    def average_money(self):
+        """家計の平均資産"""
+        if self.num_households == 0:
+            return 0.0
+        return self.total_money / self.num_households
+
+    @property
+    def employment_rate(self):
+        """雇用率"""
+        if self.num_households == 0:
+            return 0.0
+        return self.num_employed / self.num_households
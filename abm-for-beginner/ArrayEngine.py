@@ -0,0 +1,97 @@
+import numpy as np
+
+
+class ArrayEngine:
+    """
+    配列ベースの計算エンジン - 家計と企業の状態を NumPy 配列で保持する
+
+    Household / Firm オブジェクトを1つずつ呼び出す代わりに、
+    同じ状態変数を配列として持ち、各フェーズを1回のベクトル演算で実行します。
+    エージェント数が数十万〜数百万になる場合に使用します。
+    """
+
+    def __init__(self, num_households, num_firms, aggregates=None, rng=None):
+        """
+        配列エンジンの初期化（初期値は Household / Firm と同じ）
+
+        Args:
+            num_households (int): 家計数
+            num_firms (int): 企業数
+            aggregates (Aggregates): 各フェーズの差分を報告する集計オブジェクト（省略可）
+            rng (numpy.random.Generator): モデルの乱数生成器（省略時は新しく作る）
+        """
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        # 家計の状態変数
+        self.money = np.full(num_households, 100.0)        # 資産
+        self.consumption = np.zeros(num_households)        # 前回の消費量
+        self.wage = np.full(num_households, 10.0)          # 賃金率
+        self.employed = np.ones(num_households, dtype=bool)  # 雇用状態
+
+        # 企業の状態変数
+        self.price = np.full(num_firms, 5.0)               # 商品価格
+        self.production = np.full(num_firms, 50.0)         # 生産量
+        self.profit = np.zeros(num_firms)                  # 利益
+        self.num_employees = np.zeros(num_firms, dtype=np.int64)  # 従業員数
+        self.max_hires = np.full(num_firms, 6000, dtype=np.int64)  # 採用上限
+
+        # 集計への登録
+        self.aggregates = aggregates
+        if aggregates is not None:
+            aggregates.num_households += num_households
+            aggregates.num_employed += int(self.employed.sum())
+            aggregates.total_money += float(self.money.sum())
+            aggregates.num_firms += num_firms
+            aggregates.total_price += float(self.price.sum())
+            aggregates.total_production += float(self.production.sum())
+
+    @property
+    def num_households(self):
+        return len(self.money)
+
+    @property
+    def num_firms(self):
+        return len(self.price)
+
+    def work(self):
+        """雇用されている家計が賃金を得る"""
+        wages = self.wage[self.employed]
+        self.money[self.employed] += wages
+        if self.aggregates is not None:
+            self.aggregates.total_money += float(wages.sum())
+
+    def set_price(self):
+        """価格設定 - 各企業がランダムに±10%変動"""
+        price_change = self.rng.uniform(-0.1, 0.1, self.num_firms)
+        new_price = np.maximum(1.0, self.price * (1 + price_change))
+        if self.aggregates is not None:
+            self.aggregates.total_price += float((new_price - self.price).sum())
+        self.price = new_price
+
+    def produce(self):
+        """生産 - 従業員数に基づいて生産量を決定"""
+        new_production = self.num_employees * 10.0
+        if self.aggregates is not None:
+            self.aggregates.total_production += float((new_production - self.production).sum())
+        self.production = new_production
+
+    def consume(self, price):
+        """資産を持つ家計が資産の70%を消費に使う"""
+        has_money = self.money > 0
+        consumption_budget = self.money[has_money] * 0.7
+        new_consumption = consumption_budget / price
+        if self.aggregates is not None:
+            self.aggregates.total_consumption += float(
+                (new_consumption - self.consumption[has_money]).sum())
+            self.aggregates.total_money -= float(consumption_budget.sum())
+        self.consumption[has_money] = new_consumption
+        self.money[has_money] -= consumption_budget
+
+    def calculate_profit(self, firm_sales):
+        """利益計算（firm_sales は企業ごとの販売量の配列）"""
+        revenue = firm_sales * self.price
+        wage_costs = self.num_employees * 10
+        new_profit = revenue - wage_costs
+        if self.aggregates is not None:
+            self.aggregates.total_profit += float((new_profit - self.profit).sum())
+        self.profit = new_profit
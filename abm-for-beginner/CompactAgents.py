@@ -0,0 +1,11 @@
+import random
+from Household import Household
+from Firm import Firm
+from abm_common.compact import check_fields, compact_class
+
+# FIELDS と実際の属性のずれを読み込み時に検出する
+check_fields(Household(0))
+check_fields(Firm(0, rng=random.Random(0)))
+
+CompactHousehold = compact_class(Household, __name__)
+CompactFirm = compact_class(Firm, __name__)
@@ -4,39 +4,67 @@ import numpy as np
 class Firm:
     """企業エージェント - 生産と価格設定を行う"""
 
-    def __init__(self, firm_id):
+    # インスタンスの属性（省メモリのクラスの __slots__）
+    FIELDS = ("id", "rng", "price", "production", "profit", "employees", "max_hires", "aggregates")
+
+    def __init__(self, firm_id, aggregates=None, rng=None):
+        """
+        Args:
+            firm_id (int): 企業の識別子
+            aggregates (Aggregates): 差分を報告する集計オブジェクト（省略可）
+            rng (random.Random): モデルの乱数生成器（省略時は random モジュール）
+        """
         self.id = firm_id
+        self.rng = rng if rng is not None else random
         self.price = 5.0  # 商品価格
         self.production = 50.0  # 生産量
         self.profit = 0.0  # 利益
         self.employees = []  # 従業員リスト
+        self.max_hires = 6000  # 1期間あたりの採用上限
+
+        # 集計への登録（価格・生産量・利益の差分を報告する）
+        self.aggregates = aggregates
+        if aggregates is not None:
+            aggregates.add_firm(self)
 
     def set_price(self):
         """価格設定 - ランダムに±10%変動"""
-        price_change = random.uniform(-0.1, 0.1)
+        price_change = self.rng.uniform(-0.1, 0.1)
+        old_price = self.price
         self.price = max(1.0, self.price * (1 + price_change))
+        if self.aggregates is not None:
+            self.aggregates.total_price += self.price - old_price
 
     def produce(self):
         """生産 - 従業員数に基づいて生産量を決定"""
+        old_production = self.production
         self.production = len(self.employees) * 10 #1人あたり10単位
+        if self.aggregates is not None:
+            self.aggregates.total_production += self.production - old_production
 
     def hire_workers(self, households):
-        """労働者を雇用（失業者を優先して最大10人まで）"""
-        self.employees = []
-        # 失業者を候補にする（employed == False）
+        """労働者を雇用（失業者から最大 max_hires 人まで）
+
+        この企業の従業員を入れ替えるだけで、他の企業の従業員には触れません。
+        複数企業の雇用をまとめて決めるには LaborMarket.clear_market を使ってください。
+        """
+        # 現在の従業員を手放してから、失業者の中から採用する
+        for household in self.employees:
+            household.update_employment(False)
         available_workers = [h for h in households if not h.employed]
-        # 候補が少なければ既に雇用されている人も検討するなら、available_workers.extend(...)
-        hired = random.sample(available_workers, min(6000, len(available_workers)))
-        # フラグを更新（hired のみ employed=True、それ以外は False）
-        for household in households:
-            household.employed = household in hired
-        self.employees = hired
+        self.employees = self.rng.sample(available_workers,
+                                         min(self.max_hires, len(available_workers)))
+        for household in self.employees:
+            household.update_employment(True)
 
     def calculate_profit(self, total_sales):
         """利益計算"""
         revenue = total_sales * self.price
         wage_costs = len(self.employees) * 10
+        old_profit = self.profit
         self.profit = revenue - wage_costs
+        if self.aggregates is not None:
+            self.aggregates.total_profit += self.profit - old_profit
 
     def __str__(self):
         return f"Firm {self.id}: Price={self.price:.2f}, Production={self.production:.2f}, Profit={self.profit:.2f}"
\ No newline at end of file
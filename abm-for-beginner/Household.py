@@ -8,12 +8,16 @@ class Household:
     2. 労働：賃金を得て所得を増やす
     """
 
-    def __init__(self, agent_id):
+    # インスタンスの属性（省メモリのクラスの __slots__）
+    FIELDS = ("id", "money", "consumption", "wage", "employed", "aggregates")
+
+    def __init__(self, agent_id, aggregates=None):
         """
         家計エージェントの初期化
         
         Args:
             agent_id (int): エージェントの一意識別子
+            aggregates (Aggregates): 差分を報告する集計オブジェクト（省略可）
         """
         self.id = agent_id              # エージェントID（識別用）
         self.money = 100.0              # 初期資産（貨幣残高）
@@ -21,6 +25,11 @@ class Household:
         self.wage = 10.0                # 時間当たり賃金率
         self.employed = True            # 雇用状態（True=雇用, False=失業）
 
+        # 集計への登録（状態が変わるたびに差分を報告する）
+        self.aggregates = aggregates
+        if aggregates is not None:
+            aggregates.add_household(self)
+
     def consume(self, price):
         """
         消費行動 - 資産の一部を消費に使う
@@ -41,10 +50,15 @@ class Household:
             consumption_budget = self.money * 0.7
             
             # 需要関数：予算 ÷ 価格 = 購入可能数量
+            old_consumption = self.consumption
             self.consumption = consumption_budget / price
             
             # 資産から消費額を差し引く（会計処理）
             self.money -= consumption_budget
+
+            if self.aggregates is not None:
+                self.aggregates.total_consumption += self.consumption - old_consumption
+                self.aggregates.total_money -= consumption_budget
             
         return self.consumption
 
@@ -60,6 +74,8 @@ class Household:
         if self.employed:
             # 労働所得の獲得（1期間の労働に対する賃金）
             self.money += self.wage
+            if self.aggregates is not None:
+                self.aggregates.total_money += self.wage
             
     def update_employment(self, is_employed):
         """
@@ -68,6 +84,8 @@ class Household:
         Args:
             is_employed (bool): 新しい雇用状態
         """
+        if self.aggregates is not None and is_employed != self.employed:
+            self.aggregates.num_employed += 1 if is_employed else -1
         self.employed = is_employed
 
     def __str__(self):
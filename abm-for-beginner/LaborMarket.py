@@ -0,0 +1,109 @@
+import random
+import numpy as np
+
+
+def hire_counts(max_hires, available):
+    """
+    各企業の採用数 - 応募者を全企業に均等に分ける
+
+    割り切れない分は番号の小さい企業から1人ずつ多く割り当て、
+    採用上限を超える分は上限に余裕のある企業に分け直します。
+
+    Args:
+        max_hires (array): 企業ごとの採用上限
+        available (int): 応募者の数
+
+    Returns:
+        numpy.ndarray: 企業ごとの採用数（合計は min(available, 採用上限の合計)）
+    """
+    max_hires = np.asarray(max_hires, dtype=np.int64)
+    counts = np.zeros(len(max_hires), dtype=np.int64)
+    remaining = min(int(available), int(max_hires.sum()))
+    while remaining > 0:
+        open_firms = np.flatnonzero(counts < max_hires)
+        shares = np.full(len(open_firms), remaining // len(open_firms), dtype=np.int64)
+        shares[:remaining % len(open_firms)] += 1
+        added = np.minimum(shares, max_hires[open_firms] - counts[open_firms])
+        counts[open_firms] += added
+        remaining -= int(added.sum())
+    return counts
+
+
+class LaborMarket:
+    """
+    労働市場 - 全企業の雇用を1回の走査で決定する
+
+    失業者のインデックスを作り、失業者を優先した応募者の並びを
+    hire_counts で決めた企業ごとの採用数で区切って割り当てます。
+    家計数 N・企業数 F に対して O(N + F) で、どの企業の採用も上書きされません。
+    """
+
+    def __init__(self, rng=None, np_rng=None):
+        """
+        Args:
+            rng (random.Random): 応募者の並べ替えに使う乱数生成器（省略時は random モジュール）
+            np_rng (numpy.random.Generator): 配列版で使う乱数生成器（省略時は新しく作る）
+        """
+        self.rng = rng if rng is not None else random
+        self.np_rng = np_rng if np_rng is not None else np.random.default_rng()
+
+    def clear_market(self, households, firms):
+        """
+        労働市場の清算（エージェントオブジェクト用）
+
+        Args:
+            households (list): 家計エージェントのリスト
+            firms (list): 企業エージェントのリスト
+
+        Returns:
+            int: 雇用された家計の数
+        """
+        # 失業者を優先し、候補が足りなければ既に雇用されている人も検討する
+        unemployed = [i for i, h in enumerate(households) if not h.employed]
+        employed = [i for i, h in enumerate(households) if h.employed]
+        self.rng.shuffle(unemployed)
+        self.rng.shuffle(employed)
+        pool = unemployed + employed
+
+        # 雇用フラグ（ビットマップ）
+        hired = bytearray(len(households))
+
+        # 応募者の並びを全企業に均等に（採用上限の範囲で）区切って割り当てる
+        counts = hire_counts([firm.max_hires for firm in firms], len(pool)).tolist()
+        start = 0
+        for firm, n in zip(firms, counts):
+            firm.employees = [households[i] for i in pool[start:start + n]]
+            for i in pool[start:start + n]:
+                hired[i] = 1
+            start += n
+
+        for household, flag in zip(households, hired):
+            household.update_employment(flag == 1)
+
+        return start
+
+    def clear_market_arrays(self, engine):
+        """
+        労働市場の清算（ArrayEngine 用） - clear_market と同じ規則を配列で行う
+
+        Args:
+            engine (ArrayEngine): 配列エンジン
+
+        Returns:
+            int: 雇用された家計の数
+        """
+        unemployed = np.flatnonzero(~engine.employed)
+        employed = np.flatnonzero(engine.employed)
+        pool = np.concatenate([self.np_rng.permutation(unemployed),
+                               self.np_rng.permutation(employed)])
+
+        # 各企業の採用数（clear_market と同じく全企業に均等に分ける）
+        engine.num_employees = hire_counts(engine.max_hires, len(pool))
+
+        total_hired = int(engine.num_employees.sum())
+        engine.employed[:] = False
+        engine.employed[pool[:total_hired]] = True
+        if engine.aggregates is not None:
+            engine.aggregates.num_employed = total_hired
+
+        return total_hired
@@ -5,22 +5,34 @@ import numpy as np
 class Market:
     """市場 - 取引の場"""
 
-    def __init__(self):
+    def __init__(self, aggregates=None):
+        """
+        Args:
+            aggregates (Aggregates): 需要・供給・価格の合計を保持する集計（省略時は毎回走査）
+        """
         self.total_demand = 0.0
         self.total_supply = 0.0
         self.average_price = 0.0
+        self.aggregates = aggregates
 
     def clear_market(self, households, firms):
         """市場清算 - 需要と供給を調整"""
-        # 需要の計算
-        total_demand = sum([h.consumption for h in households])
+        if self.aggregates is not None:
+            # 集計から O(1) で読み出す
+            total_demand = self.aggregates.total_consumption
+            total_supply = self.aggregates.total_production
+            if len(firms) > 0:
+                self.average_price = self.aggregates.average_price
+        else:
+            # 需要の計算
+            total_demand = sum([h.consumption for h in households])
 
-        # 供給の計算
-        total_supply = sum([f.production for f in firms])
+            # 供給の計算
+            total_supply = sum([f.production for f in firms])
 
-        # 平均価格の計算
-        if len(firms) > 0:
-            self.average_price = sum([f.price for f in firms]) / len(firms)
+            # 平均価格の計算
+            if len(firms) > 0:
+                self.average_price = sum([f.price for f in firms]) / len(firms)
 
         # 実際の取引量（需要と供給の最小値）
         traded_quantity = min(total_demand, total_supply)
@@ -35,3 +47,27 @@ class Market:
         self.total_supply = total_supply
 
         return traded_quantity
+
+    def clear_market_arrays(self, engine):
+        """市場清算（ArrayEngine 用） - clear_market と同じ計算を配列で行う"""
+        if self.aggregates is not None:
+            total_demand = self.aggregates.total_consumption
+            total_supply = self.aggregates.total_production
+            if engine.num_firms > 0:
+                self.average_price = self.aggregates.average_price
+        else:
+            total_demand = float(engine.consumption.sum())
+            total_supply = float(engine.production.sum())
+            if engine.num_firms > 0:
+                self.average_price = float(engine.price.mean())
+
+        traded_quantity = min(total_demand, total_supply)
+
+        if total_supply > 0:
+            firm_sales = (engine.production / total_supply) * traded_quantity
+            engine.calculate_profit(firm_sales)
+
+        self.total_demand = total_demand
+        self.total_supply = total_supply
+
+        return traded_quantity
@@ -1,73 +1,194 @@
-import random
+from operator import attrgetter
 import numpy as np
-import matplotlib.pyplot as plt
 from Household import Household
 from Firm import Firm
+from CompactAgents import CompactHousehold, CompactFirm
 from Market import Market
+from LaborMarket import LaborMarket
+from ArrayEngine import ArrayEngine
+from Aggregates import Aggregates
+from abm_common.random_streams import make_rngs
+from abm_common.history_store import HistoryStore
+from abm_common.panel_recorder import PanelRecorder, DEFAULT_BUFFER_DAYS
+from abm_common.profiler import Profiler, MemoryProfiler, NULL_PHASE, memory_accounts
+
+# エージェントパネルの項目（家計の雇用状態、資産、消費量）
+PANEL_FIELDS = {"employed": np.int8, "money": np.float64, "consumption": np.float64}
+
 
 class SimpleEconomy:
     """シンプルな経済システム"""
 
-    def __init__(self, num_households=20, num_firms=5):
-        self.households = [Household(i) for i in range(num_households)]
-        self.firms = [Firm(i) for i in range(num_firms)]
-        self.market = Market()
+    # start_profiling で計時するエージェント・市場のメソッド
+    PROFILED_METHODS = (
+        (Household, "work"),
+        (Household, "consume"),
+        (Firm, "set_price"),
+        (Firm, "produce"),
+        (LaborMarket, "clear_market"),
+        (LaborMarket, "clear_market_arrays"),
+        (Market, "clear_market"),
+        (Market, "clear_market_arrays"),
+        (ArrayEngine, "work"),
+        (ArrayEngine, "set_price"),
+        (ArrayEngine, "produce"),
+        (ArrayEngine, "consume"),
+    )
+
+    def __init__(self, num_households=20, num_firms=5, engine="object", seed=None,
+                 history_path=None, compact_agents=False):
+        """
+        Args:
+            num_households (int): 家計数
+            num_firms (int): 企業数
+            engine (str): "object"（エージェントオブジェクト）または
+                "array"（NumPy 配列による一括計算、大規模向け）
+            seed (int or SeedSequence): 乱数シード（None の場合は OS のエントロピーを使う）
+            history_path (str): 履歴を書き出すディレクトリ。指定すると履歴をメモリに溜めず、
+                一定の行数ごとに列ファイルへ書き出す（None の場合は系列名 -> リストの辞書）
+            compact_agents (bool): 属性を __slots__ に固定した省メモリのエージェント
+                （CompactHousehold・CompactFirm）を使うか（engine="object" のみ、結果は同じ）
+        """
+        if engine not in ("object", "array"):
+            raise ValueError(f"未対応のエンジンです: {engine}")
+
+        self.engine = engine
+        self.compact_agents = compact_agents
+        self.household_class, self.firm_class = ((CompactHousehold, CompactFirm) if compact_agents
+                                                 else (Household, Firm))
+        # この経済専用の乱数生成器（SeedSequence の2つの子ストリームから作る標準の random.Random と NumPy の Generator）
+        self.rng, self.np_rng = make_rngs(seed, block_size=None)
+        # 全体の合計（エージェントが差分を報告し、O(1) で読み出す）
+        self.aggregates = Aggregates()
+        if engine == "array":
+            self.households = []
+            self.firms = []
+            self.arrays = ArrayEngine(num_households, num_firms, self.aggregates, self.np_rng)
+        else:
+            self.households = [self.household_class(i, self.aggregates)
+                               for i in range(num_households)]
+            self.firms = [self.firm_class(i, self.aggregates, self.rng) for i in range(num_firms)]
+            self.arrays = None
+        self.market = Market(self.aggregates)
+        self.labor_market = LaborMarket(self.rng, self.np_rng)
         self.time = 0
 
         # 統計データ保存用
-        self.history = {
-            'time': [],
-            'total_consumption': [],
-            'average_price': [],
-            'total_profit': [],
-            'employment_rate': []
-        }
+        columns = ['time', 'total_consumption', 'average_price', 'total_profit', 'employment_rate']
+        if history_path is None:
+            self.history = {name: [] for name in columns}
+        else:
+            self.history = HistoryStore(history_path, columns, dtypes={'time': np.int64})
+
+        # エージェントパネルの記録（record_panel で開始する）
+        self.panel = None
+
+        # フェーズ計時（start_profiling で開始する）
+        self._profiler = None
 
-    def run_simulation(self, periods=50):
-        """シミュレーション実行"""
-        print("シミュレーション開始...")
+    def run_simulation(self, periods=50, verbose=True):
+        """
+        シミュレーション実行
+
+        Args:
+            periods (int): 実行期間
+            verbose (bool): 期間ごとの状況を表示するか
+        """
+        if verbose:
+            print("シミュレーション開始...")
 
         for t in range(periods):
             self.time = t
-            print(f"\n=== 期間 {t+1} ===")
+            if verbose:
+                print(f"\n=== 期間 {t+1} ===")
 
-            # 1. 企業が労働者を雇用
-            for firm in self.firms:
-                firm.hire_workers(self.households)
+            # 1〜5. 雇用・労働・生産・消費・市場清算
+            if self.arrays is None:
+                traded_quantity = self._run_period_objects()
+            else:
+                traded_quantity = self._run_period_arrays()
+
+            # 6. 統計の記録
+            with self.phase("statistics"):
+                self.record_statistics()
+            if self.panel is not None and self.panel.due(self.time):
+                self.panel.record(self.time, self._panel_columns(self.panel.agent_ids))
+            if self._profiler is not None:
+                self._profiler.tick(self.time)
 
-            # 2. 家計が労働
+            # 7. 現在の状態を表示
+            if verbose and t % 10 == 0:  # 10期間ごとに表示
+                self.print_status()
+
+        if isinstance(self.history, HistoryStore):
+            self.history.flush()
+        if self.panel is not None:
+            self.panel.flush()
+
+        if verbose:
+            print("\nシミュレーション完了!")
+            if self._profiler is not None and self._profiler.running:
+                print(self._profiler.format_report())
+        return self.history
+
+    def _run_period_objects(self):
+        """1期間分の処理（エージェントオブジェクトを1つずつ呼び出す）"""
+        # 1. 労働市場で全企業が労働者を雇用
+        with self.phase("labor_market"):
+            self.labor_market.clear_market(self.households, self.firms)
+
+        # 2. 家計が労働
+        with self.phase("work"):
             for household in self.households:
                 household.work()
 
-            # 3. 企業が価格設定と生産
+        # 3. 企業が価格設定と生産
+        with self.phase("production"):
             for firm in self.firms:
                 firm.set_price()
                 firm.produce()
 
-            # 4. 家計が消費
-            avg_price = sum([f.price for f in self.firms]) / len(self.firms)
+        # 4. 家計が消費
+        with self.phase("consumption"):
+            avg_price = self.aggregates.average_price
             for household in self.households:
                 household.consume(avg_price)
 
-            # 5. 市場清算
-            traded_quantity = self.market.clear_market(self.households, self.firms)
+        # 5. 市場清算
+        with self.phase("goods_market"):
+            return self.market.clear_market(self.households, self.firms)
 
-            # 6. 統計の記録
-            self.record_statistics()
+    def _run_period_arrays(self):
+        """1期間分の処理（各フェーズを配列演算1回で実行する）"""
+        arrays = self.arrays
 
-            # 7. 現在の状態を表示
-            if t % 10 == 0:  # 10期間ごとに表示
-                self.print_status()
+        # 1. 労働市場で全企業が労働者を雇用
+        with self.phase("labor_market"):
+            self.labor_market.clear_market_arrays(arrays)
 
-        print("\nシミュレーション完了!")
-        return self.history
+        # 2. 家計が労働
+        with self.phase("work"):
+            arrays.work()
+
+        # 3. 企業が価格設定と生産
+        with self.phase("production"):
+            arrays.set_price()
+            arrays.produce()
+
+        # 4. 家計が消費
+        with self.phase("consumption"):
+            avg_price = self.aggregates.average_price
+            arrays.consume(avg_price)
+
+        # 5. 市場清算
+        with self.phase("goods_market"):
+            return self.market.clear_market_arrays(arrays)
 
     def record_statistics(self):
         """統計データを記録"""
-        total_consumption = sum([h.consumption for h in self.households])
-        total_profit = sum([f.profit for f in self.firms])
-        employed = sum([1 for h in self.households if h.employed])
-        employment_rate = employed / len(self.households)
+        total_consumption = self.aggregates.total_consumption
+        total_profit = self.aggregates.total_profit
+        employment_rate = self.aggregates.employment_rate
 
         self.history['time'].append(self.time)
         self.history['total_consumption'].append(total_consumption)
@@ -75,19 +196,144 @@ class SimpleEconomy:
         self.history['total_profit'].append(total_profit)
         self.history['employment_rate'].append(employment_rate)
 
+    def phase(self, name):
+        """期間内のフェーズの計時（with 文で使う、プロファイル中でなければ何もしない）"""
+        profiler = self._profiler
+        if profiler is None or not profiler.running:
+            return NULL_PHASE
+        return profiler.phase(name)
+
+    def start_profiling(self, agent_methods=True, cprofile=False):
+        """
+        フェーズ計時の開始
+
+        以後の期間のフェーズ（労働市場・労働・生産・消費・財市場・統計）と、agent_methods=True の場合は
+        PROFILED_METHODS のメソッドごとに経過時間と呼び出し回数を集計します。
+
+        Args:
+            agent_methods (bool): エージェント・市場のメソッドも計時するか
+            cprofile (bool): cProfile でも計測するか（dump_profile で書き出す）
+
+        Returns:
+            Profiler: 計時
+        """
+        self.stop_profiling()
+        # 省メモリのエージェントを使う場合はそのクラスのメソッドを計時する
+        classes = {Household: self.household_class, Firm: self.firm_class}
+        methods = [(classes.get(cls, cls), name) for cls, name in self.PROFILED_METHODS]
+        self._profiler = Profiler(methods if agent_methods else (), cprofile)
+        self._profiler.start()
+        return self._profiler
+
+    def start_memory_profiling(self, snapshot_every=None, top=10, frames=1):
+        """
+        メモリの計測の開始
+
+        以後の期間のフェーズごとのメモリの増減を tracemalloc で計測し、snapshot_every 期間ごとと
+        終了時にスナップショットの差分と、エージェントのクラス（Household・Firm）・コンテナ
+        （企業の従業員リスト、履歴など）ごとの大きさを記録します。
+        stop_profiling() で終了し、結果は profile() で、表は format_report() で取り出します。
+
+        Args:
+            snapshot_every (int): スナップショットを取る間隔（期間数、None の場合は終了時のみ）
+            top (int): スナップショットごとに記録するソース行の数
+            frames (int): tracemalloc が割り当てごとに記録するスタックの深さ
+
+        Returns:
+            MemoryProfiler: 計測
+        """
+        self.stop_profiling()
+        self._profiler = MemoryProfiler(self._memory_accounting, snapshot_every, top, frames)
+        self._profiler.start()
+        return self._profiler
+
+    def _memory_accounting(self):
+        """エージェントのクラスとコンテナごとの大きさ（memory_accounts の形式）"""
+        history = self.history if isinstance(self.history, dict) else self.history.buffers()
+        return memory_accounts([self.households, self.firms], {
+            "households": self.households,
+            "firms": self.firms,
+            "arrays": self.arrays,
+            "history": history,
+            "panel": self.panel,
+        })
+
+    def stop_profiling(self):
+        """フェーズ計時の終了（集計結果は profile() で引き続き読める）"""
+        if self._profiler is not None:
+            self._profiler.stop()
+
+    def profile(self):
+        """フェーズ計時の集計結果（Profiler.report の形式、計時していなければ空の辞書）"""
+        return self._profiler.report() if self._profiler is not None else {}
+
+    def dump_profile(self, path):
+        """cProfile の結果を .prof 形式で書き出す（start_profiling(cprofile=True) の場合）"""
+        if self._profiler is None:
+            raise ValueError("start_profiling(cprofile=True) で計時を開始してください")
+        self._profiler.dump_stats(path)
+
+    def record_panel(self, path, every=1, sample=None, sample_seed=None,
+                     buffer_days=DEFAULT_BUFFER_DAYS):
+        """
+        エージェントパネルの記録を開始
+
+        以後の run_simulation では every 期間ごとに、選んだ家計の雇用状態・資産・消費量を記録します。
+
+        Args:
+            path (str): 出力先のディレクトリ
+            every (int): 記録する間隔（期間）
+            sample (int): 記録する家計の数（None の場合は全員）
+            sample_seed (int): 家計を選ぶ乱数シード（経済の乱数とは別に使うため結果は変わらない）
+            buffer_days (int): メモリに溜める期間数
+
+        Returns:
+            PanelRecorder: 記録
+        """
+        num_households = self.aggregates.num_households
+        if sample is None:
+            agent_ids = np.arange(num_households)
+        else:
+            picker = np.random.default_rng(sample_seed)
+            agent_ids = np.sort(picker.choice(num_households, sample, replace=False))
+        self.panel = PanelRecorder(path, PANEL_FIELDS, agent_ids, every, buffer_days)
+        return self.panel
+
+    def _panel_columns(self, agent_ids):
+        """パネルの項目ごとの値"""
+        if self.arrays is not None:
+            arrays = self.arrays
+            return {"employed": arrays.employed[agent_ids], "money": arrays.money[agent_ids],
+                    "consumption": arrays.consumption[agent_ids]}
+
+        households = [self.households[i] for i in agent_ids.tolist()]
+        n = len(households)
+        return {name: np.fromiter(map(attrgetter(name), households), dtype=dtype, count=n)
+                for name, dtype in PANEL_FIELDS.items()}
+
     def print_status(self):
         """現在の経済状況を表示"""
-        employed = sum([1 for h in self.households if h.employed])
-        avg_money = sum([h.money for h in self.households]) / len(self.households)
-        total_profit = sum([f.profit for f in self.firms])
+        employed = self.aggregates.num_employed
+        num_households = self.aggregates.num_households
+        avg_money = self.aggregates.average_money
+        total_profit = self.aggregates.total_profit
 
-        print(f"雇用者数: {employed}/{len(self.households)}")
+        print(f"雇用者数: {employed}/{num_households}")
         print(f"平均資産: {avg_money:.2f}")
         print(f"総利益: {total_profit:.2f}")
         print(f"平均価格: {self.market.average_price:.2f}")
 
-    def plot_results(self):
-        """結果をグラフで表示"""
+    def plot_results(self, path=None):
+        """
+        結果をグラフで表示
+
+        matplotlib はグラフを描くときに初めて読み込みます（描画しない実行の起動を速くするため）。
+
+        Args:
+            path (str): 画像の保存先（省略時は画面に表示する）
+        """
+        import matplotlib.pyplot as plt
+
         fig, axes = plt.subplots(2, 2, figsize=(12, 10))
         fig.suptitle('Simple ABM Simulation Results', fontsize=16)
 
@@ -116,4 +362,23 @@ class SimpleEconomy:
         axes[1, 1].set_ylabel('Employment Rate')
 
         plt.tight_layout()
-        plt.show()
\ No newline at end of file
+        if path is None:
+            plt.show()
+        else:
+            fig.savefig(path)
+            plt.close(fig)
+
+    def get_summary_statistics(self):
+        """サマリー統計の取得"""
+        if not self.history['time']:
+            return {}
+
+        return {
+            'final_total_consumption': self.history['total_consumption'][-1],
+            'final_average_price': self.history['average_price'][-1],
+            'final_total_profit': self.history['total_profit'][-1],
+            'final_employment_rate': self.history['employment_rate'][-1],
+            'max_employment_rate': max(self.history['employment_rate']),
+            'min_employment_rate': min(self.history['employment_rate']),
+            'simulation_periods': len(self.history['time'])
+        }
@@ -1,6 +1,3 @@
-import random
-import numpy as np
-import matplotlib.pyplot as plt
 from SimpleEconomy import SimpleEconomy
 
 def main():
@@ -8,8 +5,8 @@ def main():
     print("=== Simple Agent-Based Model ===")
     print("シンプルなエージェントベースモデルのデモンストレーション")
 
-    # 経済システムを作成（家計20、企業5）
-    economy = SimpleEconomy(num_households=20, num_firms=5)
+    # 経済システムを作成（家計20、企業5、再現可能な結果のため乱数シードを指定）
+    economy = SimpleEconomy(num_households=20, num_firms=5, seed=42)
 
     # 50期間のシミュレーションを実行
     history = economy.run_simulation(periods=50)
@@ -21,8 +18,4 @@ def main():
 
 
 if __name__ == "__main__":
-    # ランダムシードを設定（再現可能な結果のため）
-    random.seed(42)
-    np.random.seed(42)
-
     history = main()
\ No newline at end of file
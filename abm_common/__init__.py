@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""
+両モデル共通のモジュール
+restaurant-labor-abm と abm-for-beginner の両方から読み込むモジュールをまとめたパッケージ
+（リポジトリのルートで pip install -e . を実行すると、どのディレクトリからでも読み込めます）
+"""
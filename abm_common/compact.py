@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+省メモリのエージェントクラスの生成
+元のクラスと同じメソッドを持ち、属性を __slots__ に固定したクラスを作る
+（restaurant-labor-abm の CompactWorkerAgent・CompactCompanyAgent と
+abm-for-beginner の CompactHousehold・CompactFirm で使う）
+"""
+
+
+def check_fields(instance, set_later=()):
+    """
+    instance の属性がクラスの FIELDS と一致するか確かめる
+
+    元のクラスで作ったインスタンスの属性の辞書（__dict__）を FIELDS と比べ、
+    FIELDS にない属性、または設定されていない属性があれば ValueError を送出します。
+
+    Args:
+        instance (object): 元のクラスのインスタンス
+        set_later (iterable): __init__ の後で初めて設定される属性名（未設定でもよいもの）
+    """
+    cls = type(instance)
+    names = set(vars(instance))
+    undeclared = sorted(names - set(cls.FIELDS))
+    unset = sorted(set(cls.FIELDS) - names - set(set_later))
+    if undeclared or unset:
+        raise ValueError(f"{cls.__name__}.FIELDS がインスタンスの属性と一致しません"
+                         f"（FIELDS にない属性: {undeclared}、設定されない属性: {unset}）")
+
+
+def compact_class(cls, module, name=None):
+    """
+    cls と同じメソッドを持ち、インスタンスの属性を cls.FIELDS に固定したクラスを作る
+
+    インスタンスは属性の辞書（__dict__）を持たず、属性はオブジェクト内の固定の位置に格納されるため、
+    1体あたりのメモリが小さくなり、属性の読み書きも速くなります。
+    メソッドは cls の関数をそのまま共有するため、振る舞いと乱数の使い方は cls と同じです
+    （FIELDS にない属性を設定しようとすると AttributeError になります）。
+
+    Args:
+        cls (type): 元のクラス（インスタンスの属性名を FIELDS に持つ）
+        module (str): クラスを置くモジュールの名前（pickle でクラスを探す場所）
+        name (str): クラス名（省略時は "Compact" + 元のクラス名）
+
+    Returns:
+        type: 新しいクラス
+    """
+    name = name or f"Compact{cls.__name__}"
+    namespace = {key: value for key, value in vars(cls).items()
+                 if key not in ("__dict__", "__weakref__")}
+    namespace.update({"__slots__": tuple(cls.FIELDS), "__module__": module, "__qualname__": name})
+    return type(name, cls.__bases__, namespace)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+列指向の履歴ストア
+履歴の系列を一定の行数ごとにディスク上の列ファイルへ書き出し、メモリ使用量を一定に保つ
+"""
+import json
+import os
+from collections.abc import Mapping
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 1024  # 1回に書き出す行数
+META_FILE = "columns.json"
+
+
+class HistoryColumn:
+    """
+    履歴の1系列（リストと同じように append・添字・反復・len が使える）
+
+    値はまず chunk_size 行までメモリに溜め、溜まったら列ファイル（<系列名>.bin、
+    ヘッダなしの NumPy のバイナリ）の末尾に追記します。書き出し済みの部分は
+    np.memmap で必要な分だけ読みます。
+    """
+
+    def __init__(self, store, name, dtype=np.float64):
+        """
+        Args:
+            store (HistoryStore): この系列を持つストア
+            name (str): 系列名
+            dtype (numpy.dtype): 値の型
+        """
+        self.store = store
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        self.file = os.path.join(store.path, f"{name}.bin")
+        self._buffer = []
+
+    def append(self, value):
+        """値を1つ追加（chunk_size 行溜まったら書き出す）"""
+        self._buffer.append(value)
+        if len(self._buffer) >= self.store.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """メモリに溜まっている値を列ファイルに書き出す"""
+        if not self._buffer:
+            return
+        with open(self.file, "ab") as f:
+            f.write(np.asarray(self._buffer, dtype=self.dtype).tobytes())
+        self._buffer = []
+
+    def truncate(self, rows):
+        """先頭の rows 行だけを残す（チェックポイントから再開するときに使う）"""
+        self.flush()
+        if os.path.exists(self.file):
+            os.truncate(self.file, min(rows, self._stored_rows()) * self.dtype.itemsize)
+
+    def _stored_rows(self):
+        """書き出し済みの行数"""
+        if not os.path.exists(self.file):
+            return 0
+        return os.path.getsize(self.file) // self.dtype.itemsize
+
+    def _stored(self):
+        """書き出し済みの部分（読み取り専用の memmap）"""
+        rows = self._stored_rows()
+        if rows == 0:
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(self.file, dtype=self.dtype, mode="r", shape=(rows,))
+
+    def __len__(self):
+        return self._stored_rows() + len(self._buffer)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return np.asarray(self)[index].tolist()
+        rows = self._stored_rows()
+        if index < 0:
+            index += rows + len(self._buffer)
+        if index >= rows:
+            return self._buffer[index - rows]
+        if index < 0:
+            raise IndexError("履歴の範囲外です")
+        return self._stored()[index].item()
+
+    def __iter__(self):
+        """chunk_size 行ずつ読みながら値を返す"""
+        stored = self._stored()
+        chunk_size = self.store.chunk_size
+        for start in range(0, len(stored), chunk_size):
+            yield from stored[start:start + chunk_size].tolist()
+        yield from list(self._buffer)
+
+    def __array__(self, dtype=None, copy=None):
+        values = np.concatenate([self._stored(),
+                                 np.asarray(self._buffer, dtype=self.dtype)])
+        return values if dtype is None else values.astype(dtype)
+
+    def tolist(self):
+        return list(self)
+
+
+class HistoryStore(Mapping):
+    """
+    列指向の履歴ストア（系列名 -> HistoryColumn）
+
+    モデルの history（系列名 -> 値のリスト）の代わりに使えます。
+    ディレクトリに系列ごとの列ファイルと、系列名と値の型を記録した columns.json を作ります。
+    実行後は HistoryStore.open(path) で読み込めます。
+    """
+
+    def __init__(self, path, columns=(), dtypes=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 append=False):
+        """
+        Args:
+            path (str): 出力先のディレクトリ
+            columns (iterable): 系列名
+            dtypes (dict): 系列名 -> 値の型（指定のない系列は float64）
+            chunk_size (int): 1回に書き出す行数
+            append (bool): 既存の履歴に追記するか（False の場合は既存の列ファイルを消す）
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self._columns = {}
+        os.makedirs(path, exist_ok=True)
+
+        for name, dtype in self._read_meta().items():
+            column = HistoryColumn(self, name, dtype)
+            if append:
+                self._columns[name] = column
+            elif os.path.exists(column.file):
+                os.remove(column.file)
+
+        dtypes = dtypes or {}
+        for name in columns:
+            if name not in self._columns:
+                self._columns[name] = HistoryColumn(self, name, dtypes.get(name, np.float64))
+        self._write_meta()
+
+    @classmethod
+    def open(cls, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """書き出し済みの履歴を開く"""
+        return cls(path, chunk_size=chunk_size, append=True)
+
+    def flush(self):
+        """全系列のメモリに溜まっている値を書き出す"""
+        for column in self._columns.values():
+            column.flush()
+
+    def buffers(self):
+        """メモリに溜まっている値（系列名 -> まだ書き出していない値のリスト）"""
+        return {name: column._buffer for name, column in self._columns.items()}
+
+    def _read_meta(self):
+        meta_path = os.path.join(self.path, META_FILE)
+        if not os.path.exists(meta_path):
+            return {}
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_meta(self):
+        meta = {name: column.dtype.str for name, column in self._columns.items()}
+        with open(os.path.join(self.path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        return len(self._columns)
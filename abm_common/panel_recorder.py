@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+エージェントパネルの記録
+選んだエージェントの属性を日ごとに型付きの配列へ記録し、バッファが埋まるたびにディスクへ書き出す
+"""
+import json
+import os
+
+import numpy as np
+
+DEFAULT_BUFFER_DAYS = 30  # メモリに溜める日数
+META_FILE = "panel.json"
+AGENT_ID_FILE = "agent_id.npy"
+
+
+class PanelRecorder:
+    """
+    エージェントパネルの記録
+
+    項目ごとに (buffer_days, エージェント数) の配列を先に確保しておき、記録する日ごとに1行ずつ埋めます。
+    buffer_days 日分が埋まったら、ディレクトリ内の列ファイル（<項目名>.bin、日ごとの行を
+    ヘッダなしで並べた NumPy のバイナリ）の末尾に追記します。
+    記録したパネルは load_panel(path) で (日数, エージェント数) の配列として読めます。
+    """
+
+    def __init__(self, path, fields, agent_ids, every=1, buffer_days=DEFAULT_BUFFER_DAYS,
+                 append=False):
+        """
+        Args:
+            path (str): 出力先のディレクトリ
+            fields (dict): 項目名 -> 値の型
+            agent_ids (array): 記録するエージェントの ID（昇順）
+            every (int): 記録する間隔（日数）
+            buffer_days (int): メモリに溜める日数
+            append (bool): 既存のパネルに追記するか（False の場合は既存の列ファイルを消す）
+        """
+        self.path = path
+        self.fields = {name: np.dtype(dtype) for name, dtype in fields.items()}
+        self.agent_ids = np.asarray(agent_ids, dtype=np.int64)
+        self.every = every
+        self.buffer_days = buffer_days
+
+        self._times = np.empty(buffer_days, dtype=np.int64)
+        self._buffers = {name: np.empty((buffer_days, len(self.agent_ids)), dtype=dtype)
+                         for name, dtype in self.fields.items()}
+        self._filled = 0
+
+        os.makedirs(path, exist_ok=True)
+        if not append:
+            for name in ("time", *self.fields):
+                if os.path.exists(self._file(name)):
+                    os.remove(self._file(name))
+            np.save(os.path.join(path, AGENT_ID_FILE), self.agent_ids)
+            with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+                json.dump({"every": every,
+                           "fields": {name: dtype.str for name, dtype in self.fields.items()}}, f)
+
+    @classmethod
+    def open(cls, path, buffer_days=DEFAULT_BUFFER_DAYS):
+        """書き出し済みのパネルに追記する記録を開く"""
+        meta = _read_meta(path)
+        agent_ids = np.load(os.path.join(path, AGENT_ID_FILE))
+        return cls(path, meta["fields"], agent_ids, meta["every"], buffer_days, append=True)
+
+    def due(self, time):
+        """この日が記録する日か"""
+        return time % self.every == 0
+
+    def record(self, time, columns):
+        """
+        1日分の記録
+
+        Args:
+            time (int): 日付
+            columns (dict): 項目名 -> エージェントごとの値の配列（agent_ids の順）
+        """
+        row = self._filled
+        self._times[row] = time
+        for name, buffer in self._buffers.items():
+            buffer[row] = columns[name]
+        self._filled += 1
+        if self._filled == self.buffer_days:
+            self.flush()
+
+    def flush(self):
+        """バッファに溜まっている日を列ファイルに書き出す"""
+        if self._filled == 0:
+            return
+        with open(self._file("time"), "ab") as f:
+            f.write(self._times[:self._filled].tobytes())
+        for name, buffer in self._buffers.items():
+            with open(self._file(name), "ab") as f:
+                f.write(buffer[:self._filled].tobytes())
+        self._filled = 0
+
+    @property
+    def days(self):
+        """記録した日数"""
+        return self._stored_days() + self._filled
+
+    def truncate(self, days):
+        """先頭の days 日分だけを残す（チェックポイントから再開するときに使う）"""
+        self.flush()
+        days = min(days, self._stored_days())
+        if days == 0 and not os.path.exists(self._file("time")):
+            return
+        os.truncate(self._file("time"), days * np.dtype(np.int64).itemsize)
+        for name, dtype in self.fields.items():
+            os.truncate(self._file(name), days * len(self.agent_ids) * dtype.itemsize)
+
+    def dump(self):
+        """チェックポイント用の情報（バッファは先に書き出す）"""
+        self.flush()
+        return {"path": self.path, "days": self.days, "buffer_days": self.buffer_days}
+
+    def _stored_days(self):
+        if not os.path.exists(self._file("time")):
+            return 0
+        return os.path.getsize(self._file("time")) // np.dtype(np.int64).itemsize
+
+    def _file(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+
+def load_panel(path):
+    """
+    記録したパネルの読み込み（列ファイルは np.memmap で必要な分だけ読む）
+
+    Returns:
+        dict: "time" -> 日付の配列、"agent_id" -> エージェント ID の配列、
+            項目名 -> (日数, エージェント数) の配列
+    """
+    meta = _read_meta(path)
+    agent_ids = np.load(os.path.join(path, AGENT_ID_FILE))
+    time_file = os.path.join(path, "time.bin")
+    days = os.path.getsize(time_file) // 8 if os.path.exists(time_file) else 0
+
+    panel = {"time": _memmap(time_file, np.int64, (days,)), "agent_id": agent_ids}
+    for name, dtype in meta["fields"].items():
+        panel[name] = _memmap(os.path.join(path, f"{name}.bin"), np.dtype(dtype),
+                              (days, len(agent_ids)))
+    return panel
+
+
+def _read_meta(path):
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _memmap(file, dtype, shape):
+    if shape[0] == 0 or shape[-1] == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(file, dtype=dtype, mode="r", shape=shape)
@@ -0,0 +1,510 @@
+# -*- coding: utf-8 -*-
+"""
+フェーズ計時
+モデルのステップのフェーズとエージェントのメソッドごとに経過時間と呼び出し回数を集計する
+（MemoryProfiler はフェーズごとのメモリの増減とエージェントのクラス・コンテナごとの大きさを集計する）
+"""
+import cProfile
+import functools
+import os
+import sys
+import time
+import tracemalloc
+from array import array
+from collections import deque
+
+import numpy as np
+
+
+class _NullPhase:
+    """計時しないフェーズ（プロファイル中でないときに model.phase が返す）"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    """1つのフェーズの計時（with 文で使う）"""
+    __slots__ = ("totals", "start")
+
+    def __init__(self, totals):
+        self.totals = totals  # [秒, 回数]
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        totals = self.totals
+        totals[0] += time.perf_counter() - self.start
+        totals[1] += 1
+        return False
+
+
+class Profiler:
+    """
+    フェーズとエージェントのメソッドの計時
+
+    フェーズはモデルのステップの中で with model.phase(name): として計時します。
+    エージェントのメソッドは start() の間だけクラスの属性を計時する関数に差し替えるため、
+    プロファイルしていないときのコストはありません（差し替え中は同じプロセスの
+    他のモデルの呼び出しも数えます）。メソッドの時間は中で呼んだメソッドの時間を含みます。
+    """
+
+    def __init__(self, methods=(), cprofile=False):
+        """
+        Args:
+            methods (iterable): 計時する (クラス, メソッド名) の組
+            cprofile (bool): cProfile でも関数ごとの時間を集めるか（dump_stats で書き出す）
+        """
+        self.phases = {}   # フェーズ名 -> [秒, 回数]
+        self.methods = {}  # "クラス名.メソッド名" -> [秒, 回数]
+        self.elapsed = 0.0
+        self._targets = list(methods)
+        self._timers = {}
+        self._patched = []
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._started = None
+
+    def phase(self, name):
+        """フェーズの計時（with 文で使う）"""
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _Phase(self.phases.setdefault(name, [0.0, 0]))
+        return timer
+
+    @property
+    def running(self):
+        return self._started is not None
+
+    def start(self):
+        """計時の開始（エージェントのメソッドを差し替える）"""
+        if self.running:
+            return
+        for cls, name in self._targets:
+            self._patch(cls, name)
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        self._started = time.perf_counter()
+
+    def stop(self):
+        """計時の終了（差し替えたメソッドを元に戻す）"""
+        if not self.running:
+            return
+        self.elapsed += time.perf_counter() - self._started
+        self._started = None
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        for cls, name, original in reversed(self._patched):
+            if original is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+        self._patched = []
+
+    def _patch(self, cls, name):
+        method = getattr(cls, name)
+        if getattr(method, "_profiled", False):
+            return  # 別の Profiler が計時中
+        totals = self.methods.setdefault(f"{cls.__name__}.{name}", [0.0, 0])
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                totals[0] += time.perf_counter() - start
+                totals[1] += 1
+
+        timed._profiled = True
+        self._patched.append((cls, name, cls.__dict__.get(name)))
+        setattr(cls, name, timed)
+
+    def report(self):
+        """
+        集計結果
+
+        Returns:
+            dict: elapsed（計時した時間）、phases・methods（名前 -> seconds, calls, mean_seconds、
+                時間の長い順）
+        """
+        elapsed = self.elapsed
+        if self.running:
+            elapsed += time.perf_counter() - self._started
+        return {"elapsed": elapsed, "phases": _rows(self.phases), "methods": _rows(self.methods)}
+
+    def format_report(self):
+        """集計結果の表（文字列）"""
+        report = self.report()
+        elapsed = report["elapsed"]
+        lines = [f"計時した時間: {elapsed:.3f}s"]
+        for title, rows in (("フェーズ", report["phases"]), ("メソッド", report["methods"])):
+            if not rows:
+                continue
+            lines.append(f"{title:40s} {'秒':>10s} {'割合':>7s} {'回数':>10s} {'1回あたり':>12s}")
+            for name, row in rows.items():
+                share = row["seconds"] / elapsed * 100 if elapsed > 0 else 0.0
+                lines.append(f"{name:40s} {row['seconds']:10.3f} {share:6.1f}% "
+                             f"{row['calls']:10d} {row['mean_seconds'] * 1e6:10.1f}us")
+        return "\n".join(lines)
+
+    def tick(self, time):
+        """ステップの終わりごとの処理（MemoryProfiler がスナップショットを取る）"""
+
+    def dump_stats(self, path):
+        """
+        cProfile の結果の書き出し（python -m pstats や snakeviz などで読める .prof 形式）
+        """
+        if self._cprofile is None:
+            raise ValueError("cprofile=True で計時を開始してください")
+        self._cprofile.dump_stats(path)
+
+
+def _rows(table):
+    return {name: {"seconds": seconds, "calls": calls,
+                   "mean_seconds": seconds / calls if calls else 0.0}
+            for name, (seconds, calls) in sorted(table.items(), key=lambda item: -item[1][0])
+            if calls}
+
+
+class _MemoryPhase:
+    """1つのフェーズのメモリの計測（with 文で使う）"""
+    __slots__ = ("totals", "profiler", "start")
+
+    def __init__(self, totals, profiler):
+        self.totals = totals  # [増えたバイト数, フェーズ中の一時的な最大の増加, 回数]
+        self.profiler = profiler
+        self.start = 0
+
+    def __enter__(self):
+        self.start = self.profiler.reset_peak()
+        return self
+
+    def __exit__(self, *exc_info):
+        current = self.profiler.reset_peak()
+        totals = self.totals
+        totals[0] += current - self.start
+        totals[1] = max(totals[1], self.profiler.last_peak - self.start)
+        totals[2] += 1
+        return False
+
+
+class MemoryProfiler(Profiler):
+    """
+    フェーズごとのメモリの計測（tracemalloc）
+
+    フェーズはステップの中の model.phase(name) で、増えたバイト数（フェーズの後も残っている割り当て）と
+    フェーズ中の一時的な最大の増加を集計します（フェーズで作ったステップの局所変数は
+    ステップの終わりに解放されるため、その分はフェーズの増加に残ります）。snapshot_every ステップごとに tracemalloc の
+    スナップショットを取り、前回のスナップショットから増えた割り当ての多いソース行と、
+    accounting（モデルの _memory_accounting）によるエージェントのクラス・コンテナごとの大きさを記録します。
+    tracemalloc の計測中は実行が数倍遅くなるため、時間の計時とは同時に使いません。
+    """
+
+    def __init__(self, accounting=None, snapshot_every=None, top=10, frames=1):
+        """
+        Args:
+            accounting (callable): memory_accounts の形式の辞書を返す関数
+            snapshot_every (int): スナップショットを取る間隔（ステップ数、None の場合は開始時と終了時のみ）
+            top (int): スナップショットの差分として記録するソース行の数
+            frames (int): tracemalloc が割り当てごとに記録するスタックの深さ
+        """
+        super().__init__()
+        self.accounting = accounting
+        self.snapshot_every = snapshot_every
+        self.top = top
+        self.frames = frames
+        self.peak = 0        # 計測中のトレースしたメモリの最大
+        self.last_peak = 0   # 直前の reset_peak までの最大
+        self.snapshots = []  # スナップショットごとの記録
+        self._snapshot = None
+        self._owns_tracing = False
+
+    def phase(self, name):
+        """フェーズのメモリの計測（with 文で使う）"""
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _MemoryPhase(self.phases.setdefault(name, [0, 0, 0]), self)
+        return timer
+
+    def reset_peak(self):
+        """
+        トレースしたメモリの最大を今の値に戻す
+
+        Returns:
+            int: 今のトレースしたメモリ（戻す前の最大は last_peak に残す）
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        self.last_peak = peak
+        if peak > self.peak:
+            self.peak = peak
+        tracemalloc.reset_peak()
+        return current
+
+    def start(self):
+        """計測の開始（tracemalloc を開始していなければ開始する）"""
+        if self.running:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracing = True
+        self.reset_peak()
+        self._snapshot = self._take_snapshot()
+        super().start()
+
+    def tick(self, time):
+        """snapshot_every ステップごとにスナップショットを記録"""
+        if self.running and self.snapshot_every and time % self.snapshot_every == 0:
+            self._record(time)
+
+    def stop(self):
+        """計測の終了（終了時のスナップショットを記録し、開始した tracemalloc を止める）"""
+        if not self.running:
+            return
+        self._record(None)
+        super().stop()
+        self._snapshot = None
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def _take_snapshot(self):
+        # tracemalloc とこのモジュール自身（集計の一時的な割り当て）は除く
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    def _record(self, time):
+        current = self.reset_peak()
+        snapshot = self._take_snapshot()
+        stats = snapshot.compare_to(self._snapshot, "lineno")
+        self._snapshot = snapshot
+        record = {
+            "time": time,
+            "traced_bytes": current,
+            "top": [{"line": _frame_label(stat.traceback[0]), "size_diff": stat.size_diff,
+                     "count_diff": stat.count_diff}
+                    for stat in stats[:self.top] if stat.size_diff],
+        }
+        if self.accounting is not None:
+            record.update(self.accounting())
+        self.snapshots.append(record)
+
+    def report(self):
+        """
+        集計結果
+
+        Returns:
+            dict: elapsed・traced_bytes（今のトレースしたメモリ）・peak_bytes、
+                phases（名前 -> net_bytes, peak_bytes, calls, mean_net_bytes、増えた量の多い順）、
+                snapshots（time, traced_bytes, top と accounting の agents・containers）、
+                agents・containers（計測中は今の、終了後は終了時の大きさ）
+        """
+        elapsed = self.elapsed
+        if self.running:
+            elapsed += time.perf_counter() - self._started
+        tracing = tracemalloc.is_tracing()
+        current = tracemalloc.get_traced_memory()[0] if tracing else None
+        phases = {name: {"net_bytes": net, "peak_bytes": peak, "calls": calls,
+                         "mean_net_bytes": net / calls if calls else 0.0}
+                  for name, (net, peak, calls) in sorted(self.phases.items(),
+                                                         key=lambda item: -item[1][0])
+                  if calls}
+        report = {"elapsed": elapsed, "traced_bytes": current, "peak_bytes": self.peak,
+                  "phases": phases, "snapshots": self.snapshots}
+        if self.running and self.accounting is not None:
+            report.update(self.accounting())
+        elif self.snapshots and "agents" in self.snapshots[-1]:
+            report["agents"] = self.snapshots[-1]["agents"]
+            report["containers"] = self.snapshots[-1]["containers"]
+        return report
+
+    def format_report(self):
+        """集計結果の表（文字列）"""
+        report = self.report()
+        lines = [f"計測した時間: {report['elapsed']:.3f}s、"
+                 f"トレースしたメモリの最大: {_format_bytes(report['peak_bytes'])}"]
+
+        agents = report.get("agents", {})
+        if agents:
+            lines.append(f"{'エージェント':34s} {'数':>10s} {'バイト':>12s} {'1体あたり':>12s}")
+            for name, row in agents.items():
+                per_agent = row["bytes"] / row["count"] if row["count"] else 0
+                lines.append(f"{name:40s} {row['count']:10d} {_format_bytes(row['bytes']):>12s} "
+                             f"{per_agent:10.0f}B")
+        containers = report.get("containers", {})
+        if containers:
+            lines.append(f"{'コンテナ':36s} {'バイト':>12s}")
+            for name, nbytes in containers.items():
+                lines.append(f"{name:40s} {_format_bytes(nbytes):>12s}")
+
+        if report["phases"]:
+            lines.append(f"{'フェーズ':36s} {'増加':>10s} {'一時的な最大':>8s} {'回数':>8s} "
+                         f"{'1回あたり':>8s}")
+            for name, row in report["phases"].items():
+                lines.append(f"{name:40s} {_format_bytes(row['net_bytes'], True):>12s} "
+                             f"{_format_bytes(row['peak_bytes']):>14s} {row['calls']:10d} "
+                             f"{_format_bytes(row['mean_net_bytes'], True):>12s}")
+
+        previous = None
+        for record in report["snapshots"]:
+            label = "終了時" if record["time"] is None else f"ステップ {record['time']}"
+            growth = ("" if previous is None else
+                      f"（{_format_bytes(record['traced_bytes'] - previous, True)}）")
+            lines.append(f"{label}: {_format_bytes(record['traced_bytes'])}{growth}")
+            for stat in record["top"]:
+                lines.append(f"    {stat['line']:50s} {_format_bytes(stat['size_diff'], True):>12s} "
+                             f"{stat['count_diff']:+10d} 個")
+            previous = record["traced_bytes"]
+        return "\n".join(lines)
+
+
+# --- エージェントとコンテナの大きさ ---
+
+# 中身をたどるコンテナと、大きさを数える値
+_CONTAINERS = (list, tuple, dict, set, frozenset, deque)
+_VALUES = (int, float, complex, str, bytes, array, np.ndarray, np.generic)
+
+
+def sizeof(obj, seen):
+    """
+    値とコンテナの大きさ（バイト）
+
+    リスト・タプル・辞書・集合・deque は中身をたどって数えます。
+    それ以外のオブジェクト（エージェントや乱数生成器など）は参照だけを数え、中身はたどりません。
+    seen に含まれるオブジェクトは数えず、数えたオブジェクトは seen に加えます
+    （複数のコンテナで共有されている値を二重に数えないため）。
+    """
+    if id(obj) in seen:
+        return 0
+    if isinstance(obj, np.ndarray):
+        seen.add(id(obj))
+        # ビューはデータを持たないため、元の配列の大きさで数える
+        return sys.getsizeof(obj) + (obj.nbytes if obj.base is not None else 0)
+    if isinstance(obj, _VALUES):
+        seen.add(id(obj))
+        return sys.getsizeof(obj)
+    if not isinstance(obj, _CONTAINERS):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += sizeof(key, seen) + sizeof(value, seen)
+    else:
+        for value in obj:
+            size += sizeof(value, seen)
+    return size
+
+
+def memory_accounts(agent_groups, containers):
+    """
+    エージェントのクラスとコンテナごとの大きさの集計
+
+    エージェントの大きさはオブジェクト本体・属性の辞書・数値や文字列の属性の値の合計です。
+    コンテナの属性（企業の応募者リストなど）は "クラス名.属性名" のコンテナとして別に数えます。
+    属性の辞書の大きさは、辞書を作らせないようクラスごとに最初の1体で測った値を使います。
+    列の表（WorkerPopulation など）はエージェント数を len、大きさを NumPy 配列の列の合計とします。
+
+    Args:
+        agent_groups (iterable): エージェントのリスト、または列の表
+        containers (dict): コンテナ名 -> リスト・辞書などか、それらを属性に持つオブジェクト
+            （オブジェクトは本体と属性の値を数える）
+
+    Returns:
+        dict: "agents" -> クラス名 -> {"count", "bytes"}、"containers" -> 名前 -> バイト数
+            （どちらも大きい順）
+    """
+    seen = set()
+    agents = {}
+    found = {}
+    layouts = {}
+    for group in agent_groups:
+        if isinstance(group, (list, tuple)):
+            for agent in group:
+                _account_agent(agent, seen, agents, found, layouts)
+        else:
+            row = agents.setdefault(type(group).__name__, {"count": 0, "bytes": 0})
+            row["count"] += len(group)
+            row["bytes"] += sys.getsizeof(group) + sum(
+                sizeof(value, seen) for value in vars(group).values()
+                if isinstance(value, np.ndarray))
+
+    for name, container in containers.items():
+        if container is None:
+            continue
+        if isinstance(container, _CONTAINERS + _VALUES):
+            found[name] = sizeof(container, seen)
+        else:
+            seen.add(id(container))
+            found[name] = sys.getsizeof(container) + sizeof(_attributes(container), seen)
+    return {"agents": _largest_first(agents, lambda row: row["bytes"]),
+            "containers": _largest_first(found, lambda nbytes: nbytes)}
+
+
+def _account_agent(agent, seen, agents, containers, layouts):
+    cls = type(agent)
+    layout = layouts.get(cls)
+    if layout is None:
+        # (属性名のリスト, 属性の辞書の大きさ)
+        if hasattr(agent, "__dict__"):
+            layout = layouts[cls] = (list(vars(agent)), sys.getsizeof(vars(agent)))
+        else:
+            layout = layouts[cls] = (_slot_names(cls), 0)
+    names, dict_size = layout
+
+    row = agents.get(cls.__name__)
+    if row is None:
+        row = agents[cls.__name__] = {"count": 0, "bytes": 0}
+    seen.add(id(agent))
+    size = sys.getsizeof(agent) + dict_size
+    for name in names:
+        value = getattr(agent, name, None)
+        if isinstance(value, _CONTAINERS):
+            key = f"{cls.__name__}.{name}"
+            containers[key] = containers.get(key, 0) + sizeof(value, seen)
+        elif isinstance(value, _VALUES):
+            size += sizeof(value, seen)
+    row["count"] += 1
+    row["bytes"] += size
+
+
+def _attributes(obj):
+    if hasattr(obj, "__dict__"):
+        return vars(obj)
+    return {name: getattr(obj, name) for name in _slot_names(type(obj)) if hasattr(obj, name)}
+
+
+def _slot_names(cls):
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        names.extend([slots] if isinstance(slots, str) else slots)
+    return [name for name in names if name not in ("__dict__", "__weakref__")]
+
+
+def _largest_first(table, key):
+    return dict(sorted(table.items(), key=lambda item: -key(item[1])))
+
+
+def _frame_label(frame):
+    return f"{os.path.basename(frame.filename)}:{frame.lineno}"
+
+
+def _format_bytes(nbytes, signed=False):
+    sign = "+" if signed and nbytes >= 0 else ""
+    for unit in ("B", "KB", "MB"):
+        if abs(nbytes) < 1024:
+            return f"{sign}{nbytes:.0f}{unit}" if unit == "B" else f"{sign}{nbytes:.1f}{unit}"
+        nbytes /= 1024
+    return f"{sign}{nbytes:.1f}GB"
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+乱数ストリーム
+モデルごとに独立した乱数生成器（標準の random.Random と NumPy の Generator）を SeedSequence から作る
+"""
+import random
+import numpy as np
+
+
+def seed_sequence(seed=None):
+    """
+    シードを SeedSequence に変換
+
+    Args:
+        seed (int or SeedSequence): シード（None の場合は OS のエントロピーを使う）
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+DEFAULT_BLOCK_SIZE = 4096  # BufferedRandom が1回に引く乱数の個数
+
+
+class BufferedRandom(random.Random):
+    """
+    ブロック単位で先に引いた乱数を配る random.Random
+
+    random.randint / random.uniform は Python で書かれたメソッドを何段も経由するため、
+    エージェントのループで1回ずつ呼ぶと呼び出しのコストが目立ちます。
+    このクラスは (種類, a, b) ごとに NumPy で block_size 個の整数・一様乱数をまとめて引いてリストにし、
+    以後はリストのイテレータから1つずつ返します（1回あたり next() 1回分のコスト）。
+    random(), sample(), choice() などは C で実装された random.Random のものをそのまま使います。
+
+    (種類, a, b) ごとの Generator は SeedSequence の子として最初に使われた順に作られ、
+    ブロックは同じ Generator から続けて引くため、同じシードからは block_size に関係なく
+    同じ乱数列が得られます。
+    """
+
+    def __init__(self, seed=None, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        Args:
+            seed (int or SeedSequence): シード
+            block_size (int): 1回に引く乱数の個数
+        """
+        python_seed, self._block_seed = seed_sequence(seed).spawn(2)
+        self.block_size = block_size
+        self._generators = {}  # (種類, a, b) -> numpy.random.Generator
+        # 種類 -> {(a, b): 先に引いた乱数のイテレータ}
+        self._streams = {"randint": {}, "uniform": {}}
+        self._randint_streams = self._streams["randint"]
+        self._uniform_streams = self._streams["uniform"]
+        state = python_seed.generate_state(4, dtype=np.uint32)
+        super().__init__(int.from_bytes(state.tobytes(), "little"))
+
+    def randint(self, a, b):
+        """a 以上 b 以下の整数"""
+        try:
+            return next(self._randint_streams[a, b])
+        except (KeyError, StopIteration):
+            return self._refill("randint", a, b)
+
+    def uniform(self, a, b):
+        """a と b の間の一様乱数"""
+        try:
+            return next(self._uniform_streams[a, b])
+        except (KeyError, StopIteration):
+            return self._refill("uniform", a, b)
+
+    def _refill(self, kind, a, b):
+        """(種類, a, b) の次のブロックを引き、その先頭を返す"""
+        key = (kind, a, b)
+        generator = self._generators.get(key)
+        if generator is None:
+            generator = np.random.default_rng(self._block_seed.spawn(1)[0])
+            self._generators[key] = generator
+
+        if kind == "randint":
+            block = generator.integers(a, b, self.block_size, endpoint=True)
+        else:
+            block = a + (b - a) * generator.random(self.block_size)
+        stream = iter(block.tolist())
+        self._streams[kind][a, b] = stream
+        return next(stream)
+
+    def getstate(self):
+        """乱数の状態（先に引いたブロックの残りを含む）"""
+        buffered = []
+        for (kind, a, b), generator in self._generators.items():
+            streams = self._streams[kind]
+            remaining = list(streams.get((a, b), ()))
+            streams[a, b] = iter(remaining)
+            buffered.append(((kind, a, b), generator.bit_generator.state, remaining))
+        block_seed = self._block_seed
+        return (super().getstate(),
+                (block_seed.entropy, block_seed.spawn_key, block_seed.n_children_spawned),
+                buffered)
+
+    def setstate(self, state):
+        """getstate() で得た状態に戻す"""
+        python_state, (entropy, spawn_key, n_children_spawned), buffered = state
+        super().setstate(python_state)
+        self._block_seed = np.random.SeedSequence(entropy, spawn_key=spawn_key,
+                                                  n_children_spawned=n_children_spawned)
+        self._generators = {}
+        for streams in self._streams.values():
+            streams.clear()
+        for (kind, a, b), generator_state, remaining in buffered:
+            generator = np.random.default_rng()
+            generator.bit_generator.state = generator_state
+            self._generators[kind, a, b] = generator
+            self._streams[kind][a, b] = iter(remaining)
+
+
+def make_rngs(seed=None, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    モデル用の乱数生成器の組を作る
+
+    SeedSequence から2つの子ストリームを作り、一方で BufferedRandom（random.Random 互換）を、
+    もう一方で NumPy の Generator を初期化します。同じシードからは常に同じ組ができ、
+    異なるシード（または replicate_seed の子）からは統計的に独立な組ができます。
+
+    Args:
+        seed (int or SeedSequence): シード
+        block_size (int): BufferedRandom が1回に引く乱数の個数
+            （None の場合はバッファを持たない標準の random.Random を作る）
+
+    Returns:
+        tuple: (BufferedRandom または random.Random, numpy.random.Generator)
+    """
+    python_seed, numpy_seed = seed_sequence(seed).spawn(2)
+    if block_size is None:
+        state = python_seed.generate_state(4, dtype=np.uint32)
+        python_rng = random.Random(int.from_bytes(state.tobytes(), "little"))
+    else:
+        python_rng = BufferedRandom(python_seed, block_size)
+    return python_rng, np.random.default_rng(numpy_seed)
+
+
+def replicate_seed(base_seed, replicate):
+    """
+    反復実行用の子シード（SeedSequence(base_seed).spawn(n)[replicate] と同じ）
+
+    子シードは番号だけで決まるため、どのプロセスで何番目に実行しても結果は変わりません。
+
+    Args:
+        base_seed (int): 元になるシード
+        replicate (int): 反復の番号
+    """
+    return np.random.SeedSequence(base_seed, spawn_key=(replicate,))
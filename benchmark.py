@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+スケーリングベンチマーク
+RestaurantLaborModel / SimpleEconomy をエージェント数の段階ごとに実行し、
+1秒あたりのステップ数・フェーズごとの時間・ピークメモリを JSON に保存する
+
+使い方:
+    python benchmark.py --output bench.json
+    python benchmark.py --suite restaurant --suite restaurant-array --max-agents 36000
+    python benchmark.py --output new.json --compare bench.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from sweep import load_model_class
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# スイート名 -> (モデル名, 追加のコンストラクタ引数)
+SUITES = {
+    "restaurant": ("restaurant", {}),
+    "restaurant-array": ("restaurant-array", {}),
+    "restaurant-compact": ("restaurant", {"compact_agents": True}),
+    "simple": ("simple", {}),
+    "simple-array": ("simple", {"engine": "array"}),
+    "simple-compact": ("simple", {"compact_agents": True}),
+}
+
+# モデル名 -> エージェント数の段階（コンストラクタ引数のリスト）
+LADDERS = {
+    "restaurant": [{"num_workers": w, "num_companies": c}
+                   for w, c in ((360, 10), (3600, 100), (36000, 1000), (360000, 10000))],
+    "simple": [{"num_households": h, "num_firms": f}
+               for h, f in ((20, 5), (200, 50), (2000, 500), (20000, 5000))],
+}
+LADDERS["restaurant-array"] = LADDERS["restaurant"]
+
+
+def num_agents(params):
+    """設定のエージェント数（労働者・家計と企業の合計）"""
+    return sum(value for name, value in params.items() if name.startswith("num_"))
+
+
+def peak_rss_mb():
+    """このプロセスのピーク常駐メモリ（MB、取得できない場合は None）"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KB、macOS はバイト
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_benchmark(suite, params, steps, warmup, seed):
+    """
+    1つの設定の計測（新しいプロセスで実行される）
+
+    Args:
+        suite (str): スイート名（SUITES のキー）
+        params (dict): エージェント数のコンストラクタ引数
+        steps (int): 計測するステップ数
+        warmup (int): 計測前に実行するステップ数
+        seed (int): 乱数シード
+
+    Returns:
+        dict: 計測結果（status="error" の場合は error に例外の内容）
+    """
+    model_name, extra = SUITES[suite]
+    params = {**params, **extra}
+    result = {"suite": suite, "model": model_name, "params": params,
+              "num_agents": num_agents(params), "steps": steps, "warmup": warmup,
+              "status": "ok", "error": None, "baseline_rss_mb": peak_rss_mb()}
+    try:
+        cls = load_model_class(model_name)
+        start = time.perf_counter()
+        model = cls(**params, seed=seed)
+        result["setup_seconds"] = time.perf_counter() - start
+
+        if model_name == "simple":
+            # SimpleEconomy は run_simulation 全体を計時する
+            model.run_simulation(warmup, verbose=False)
+            model.start_profiling(agent_methods=False)
+            start = time.perf_counter()
+            model.run_simulation(steps, verbose=False)
+            elapsed = time.perf_counter() - start
+            step_times = []
+        else:
+            for _ in range(warmup):
+                model.step()
+            model.start_profiling(agent_methods=False)
+            step_times = []
+            for _ in range(steps):
+                start = time.perf_counter()
+                model.step()
+                step_times.append(time.perf_counter() - start)
+            elapsed = sum(step_times)
+
+        model.stop_profiling()
+        # ステップのフェーズ（model.phase で計時した時間）、フェーズの外の時間は "other"
+        phases = {name: row["seconds"] for name, row in model.profile()["phases"].items()}
+        phases["other"] = max(0.0, elapsed - sum(phases.values()))
+        result.update({
+            "seconds": elapsed,
+            "steps_per_second": steps / elapsed if elapsed > 0 else None,
+            "phases": phases,
+        })
+        # エージェントのクラスごとの1体あたりのバイト数（計測の後に数える）
+        result["agent_bytes"] = {name: row["bytes"] / row["count"]
+                                 for name, row in model._memory_accounting()["agents"].items()
+                                 if row["count"]}
+        if step_times:
+            result["step_seconds"] = {"min": min(step_times),
+                                      "median": statistics.median(step_times),
+                                      "max": max(step_times)}
+    except Exception:
+        result["status"] = "error"
+        result["error"] = traceback.format_exc()
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_suite(suites, steps=30, warmup=5, seed=0, max_agents=None, progress=True):
+    """
+    スイートごとにエージェント数の段階を順に計測
+
+    計測どうしが干渉しないよう、設定ごとに新しいプロセスで1つずつ実行します
+    （ピークメモリもその設定だけのものになります）。
+
+    Args:
+        suites (list): スイート名のリスト
+        steps (int): 計測するステップ数
+        warmup (int): 計測前に実行するステップ数
+        seed (int): 乱数シード
+        max_agents (int): これより多いエージェント数の設定は実行しない
+        progress (bool): 進捗を標準エラー出力に表示するか
+
+    Returns:
+        list: run_benchmark の結果のリスト
+    """
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for suite in suites:
+        model_name = SUITES[suite][0]
+        for params in LADDERS[model_name]:
+            if max_agents is not None and num_agents(params) > max_agents:
+                continue
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                try:
+                    result = executor.submit(run_benchmark, suite, params, steps, warmup,
+                                             seed).result()
+                except Exception:
+                    # メモリ不足などでプロセス自体が異常終了した場合
+                    result = {"suite": suite, "model": model_name, "params": params,
+                              "num_agents": num_agents(params), "steps": steps,
+                              "warmup": warmup, "status": "error",
+                              "error": traceback.format_exc()}
+            results.append(result)
+            if progress:
+                print(_format_result(result), file=sys.stderr)
+    return results
+
+
+def environment():
+    """計測環境の情報（バージョン間の比較用）"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(baseline, results):
+    """
+    以前の計測結果との比較
+
+    Returns:
+        list: (スイート, エージェント数, 以前の steps/s, 今回の steps/s, 比) のリスト
+    """
+    previous = {(r["suite"], r["num_agents"]): r for r in baseline["results"]
+                if r["status"] == "ok"}
+    rows = []
+    for result in results:
+        old = previous.get((result["suite"], result["num_agents"]))
+        if old is None or result["status"] != "ok":
+            continue
+        rows.append((result["suite"], result["num_agents"], old["steps_per_second"],
+                     result["steps_per_second"],
+                     result["steps_per_second"] / old["steps_per_second"]))
+    return rows
+
+
+def _format_result(result):
+    label = f"{result['suite']:18s} agents={result['num_agents']:>7d}"
+    if result["status"] != "ok":
+        return f"{label} error: {result['error'].strip().splitlines()[-1]}"
+    phases = ", ".join(f"{name} {seconds / result['seconds'] * 100:.0f}%"
+                       for name, seconds in result["phases"].items())
+    memory = (f", peak {result['peak_rss_mb']:.0f}MB"
+              if result.get("peak_rss_mb") is not None else "")
+    memory += "".join(f", {name} {nbytes:.0f}B"
+                      for name, nbytes in result.get("agent_bytes", {}).items())
+    return (f"{label} {result['steps_per_second']:10.1f} steps/s "
+            f"(setup {result['setup_seconds']:.2f}s{memory}; {phases})")
+
+
+def main(argv=None):
+    """コマンドラインからのベンチマーク実行"""
+    parser = argparse.ArgumentParser(description="ABM のスケーリングベンチマーク")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), default=None,
+                        help="実行するスイート（複数指定可、既定: 全て）")
+    parser.add_argument("--steps", type=int, default=30, help="計測するステップ数")
+    parser.add_argument("--warmup", type=int, default=5, help="計測前に実行するステップ数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    parser.add_argument("--max-agents", type=int, default=None,
+                        help="これより多いエージェント数の設定は実行しない")
+    parser.add_argument("--output", default="benchmark.json", help="結果の出力先（JSON）")
+    parser.add_argument("--compare", default=None, help="比較する以前の結果（JSON）")
+    parser.add_argument("--quiet", action="store_true", help="進捗を表示しない")
+    args = parser.parse_args(argv)
+
+    suites = args.suite or list(SUITES)
+    results = run_suite(suites, steps=args.steps, warmup=args.warmup, seed=args.seed,
+                        max_agents=args.max_agents, progress=not args.quiet)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2,
+                  ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for suite, agents, old, new, ratio in compare(baseline, results):
+            print(f"{suite:18s} agents={agents:>7d} {old:10.1f} -> {new:10.1f} steps/s "
+                  f"(x{ratio:.2f})")
+
+    failures = sum(1 for result in results if result["status"] != "ok")
+    print(f"{len(results)}件中 {len(results) - failures}件成功。結果: {args.output}",
+          file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+配列版レストラン労働力ABMモデル
+労働者と企業の状態を列（NumPy 配列）で持ち、各フェーズを一括で計算する
+"""
+import numpy as np
+from collections import defaultdict
+import checkpoint
+from restaurant_labor_model import RestaurantLaborModel, WORKER_TYPE_WEIGHTS
+from batch_matching import batch_match
+from vacancy_index import ArrayVacancyIndex, SpatialArrayVacancyIndex
+from worker_population import (WorkerPopulation, TYPE_NAMES, UNEMPLOYED,
+                               SEEKING, WAITING, EMPLOYED)
+
+
+class CompanyTable:
+    """企業表 - CompanyAgent の属性を列（NumPy 配列）で保持する"""
+
+    def __init__(self, companies):
+        """
+        企業表の初期化
+
+        Args:
+            companies (list): 属性の元になる CompanyAgent のリスト
+        """
+        self.level = np.array([c.level for c in companies], dtype=np.int64)
+        self.scale = np.array([c.scale for c in companies], dtype=np.int64)
+        self.frame = np.array([c.frame for c in companies], dtype=np.int64)
+        self.seats = np.array([c.seats for c in companies], dtype=float)
+        self.member_num = np.array([c.member_num for c in companies], dtype=np.int64)
+        self.occupancy = np.array([c.occupancy for c in companies], dtype=float)
+        self.price = np.array([c.price for c in companies], dtype=float)
+        self.food_cost = np.array([c.food_cost for c in companies], dtype=float)
+        self.turn_num_max = np.array([c.turn_num_max for c in companies], dtype=float)
+        self.wage = np.array([c.wages[c.level] for c in companies], dtype=float)
+        self.recruitment_cost = np.array([c.recruitment_cost for c in companies], dtype=float)
+        self.x = np.array([c.x for c in companies], dtype=np.int16)
+        self.y = np.array([c.y for c in companies], dtype=np.int16)
+
+        # 従業員管理（人数のみ）
+        n = len(companies)
+        self.num_applicants = np.zeros(n, dtype=np.int64)
+        self.num_employees = np.zeros(n, dtype=np.int64)
+
+        # 経営指標
+        self.sales = np.zeros(n)
+        self.costs = np.zeros(n)
+        self.profit = np.zeros(n)
+
+    def __len__(self):
+        return len(self.level)
+
+    def open_slots(self):
+        """企業ごとの応募受付可能な残り枠"""
+        return self.frame - self.num_applicants - self.num_employees
+
+    def calculate_business_metrics(self):
+        """経営指標の計算（CompanyAgent._calculate_business_metrics の一括版）"""
+        current_employees = self.member_num + self.num_employees
+        max_employees = self.member_num + self.frame
+        turn_num = self.turn_num_max * (current_employees / max_employees)
+
+        self.sales = self.seats * self.occupancy * turn_num * self.price
+
+        food_costs = self.seats * self.occupancy * turn_num * self.food_cost
+        labor_costs = current_employees * self.wage * 6
+        recruitment_costs = (self.frame - self.num_employees) * self.recruitment_cost
+        self.costs = food_costs + labor_costs + recruitment_costs
+
+        self.profit = self.sales - self.costs
+
+
+class ArrayRestaurantLaborModel(RestaurantLaborModel):
+    """
+    配列版レストラン労働力ABM
+
+    RestaurantLaborModel と同じ行動規則・同じ履歴を持ちますが、
+    労働者は WorkerPopulation、企業は CompanyTable に整数コードの列として保持し、
+    労働者と企業のステップを全員一括で計算します。
+    """
+
+    # start_profiling で計時する一括処理のメソッド
+    PROFILED_METHODS = (
+        (WorkerPopulation, "apply_to_companies"),
+        (WorkerPopulation, "step"),
+        (WorkerPopulation, "decide_applicants"),
+        (CompanyTable, "calculate_business_metrics"),
+    )
+
+    def _create_workers(self):
+        """労働者集団の生成"""
+        return WorkerPopulation.generate(self.num_workers, WORKER_TYPE_WEIGHTS,
+                                         self.lattice.width, self.lattice.height, self.np_rng)
+
+    def _create_vacancy_index(self):
+        """求人インデックスは使わない（マッチングは企業表の残り枠で行う）"""
+        return None
+
+    def _create_companies(self):
+        """
+        企業表の生成（属性の抽選は CompanyAgent と同じ）
+
+        CompanyAgent は属性の抽選のためだけに作り、求人インデックスと状態集計には登録せずに捨てます。
+        """
+        return CompanyTable([self.company_class(i, None, self.lattice, None, self.rng)
+                             for i in range(self.num_companies)])
+
+    def step(self):
+        """1ステップの実行"""
+        self.time += 1
+        if self.event_log is not None:
+            self.event_log.day = self.time
+        workers = self.workers
+        companies = self.companies
+
+        # 1. 新規応募者の選定とマッチング
+        with self.phase("matching"):
+            self._select_applicants_and_match()
+
+        # 2. 全労働者のステップ実行（離職者は勤務先から外れる）
+        with self.phase("workers"):
+            left = workers.step()
+            companies.num_employees -= np.bincount(left, minlength=len(companies))
+            self.tracker.separations.push(len(left))
+
+        # 3. 全企業のステップ実行（応募者の選考と経営指標）
+        with self.phase("companies"):
+            hired, rejected = workers.decide_applicants(companies.level)
+            hired_count = np.bincount(hired, minlength=len(companies))
+            rejected_count = np.bincount(rejected, minlength=len(companies))
+            companies.num_applicants -= hired_count + rejected_count
+            companies.num_employees += hired_count
+            companies.calculate_business_metrics()
+
+        # 4. 統計情報の記録
+        with self.phase("statistics"):
+            self._record_statistics()
+
+    def _select_applicants_and_match(self):
+        """応募者選定とマッチング処理"""
+        workers = self.workers
+
+        # 新規応募者の選定（未就職者から）
+        unemployed = np.flatnonzero(workers.state == UNEMPLOYED)
+        if len(unemployed) > self.daily_applicants:
+            new_applicants = self.np_rng.choice(unemployed, self.daily_applicants, replace=False)
+        else:
+            new_applicants = unemployed
+
+        # 求職中の労働者も応募候補に追加
+        job_seekers = np.flatnonzero((workers.state == SEEKING) & (workers.elapsed_days > 1))
+
+        all_applicants = np.concatenate([new_applicants, job_seekers])
+        chosen = self._match_workers_to_companies(all_applicants)
+
+        matched = chosen >= 0
+        workers.apply_to_companies(all_applicants[matched], chosen[matched])
+
+    def _match_workers_to_companies(self, applicants):
+        """
+        労働者と企業のマッチング（RestaurantLaborModel と同じ規則）
+
+        Returns:
+            array: 応募者ごとの応募先企業（見つからなければ -1）
+        """
+        companies = self.companies
+        workers = self.workers
+        open_slots = companies.open_slots()
+
+        if self._uses_batch_matching():
+            chosen = batch_match(workers.level[applicants], companies.level, open_slots,
+                                 self.np_rng)
+            companies.num_applicants += np.bincount(chosen[chosen >= 0],
+                                                    minlength=len(companies))
+            return chosen
+
+        # 応募順に1人ずつ
+        chosen = np.full(len(applicants), -1, dtype=np.int64)
+        index = self._create_array_vacancy_index(open_slots)
+
+        for i, worker in enumerate(applicants.tolist()):
+            company = index.choose_for(worker)
+            if company is not None:
+                index.take_slot(company)
+                chosen[i] = company
+
+        companies.num_applicants += np.bincount(chosen[chosen >= 0], minlength=len(companies))
+        return chosen
+
+    def _create_array_vacancy_index(self, open_slots):
+        """空き枠のある企業をレベル別（通勤圏を使う場合はセル×レベル別）のバケットに分けた求人インデックス"""
+        if self.commute_radius is None:
+            return ArrayVacancyIndex(self.companies, self.workers, open_slots.tolist(),
+                                     self.np_rng)
+        return SpatialArrayVacancyIndex(self.companies, self.workers, open_slots.tolist(),
+                                        self.lattice, self.commute_radius, self.np_rng)
+
+    def _record_statistics(self):
+        """統計情報の記録"""
+        workers = self.workers
+        companies = self.companies
+
+        # 雇用率
+        employed = workers.state == EMPLOYED
+        num_employed = int(np.count_nonzero(employed))
+        employment_rate = num_employed / len(workers)
+
+        # 平均賃金（雇用されている労働者の）
+        if num_employed > 0:
+            average_wage = float(companies.wage[workers.company[employed]].mean())
+        else:
+            average_wage = 0
+
+        # 総利益
+        total_profit = float(companies.profit.sum())
+
+        # マッチング率（求人枠の充足率）
+        total_positions = int(companies.frame.sum())
+        filled_positions = int(companies.num_employees.sum())
+        job_matching_rate = filled_positions / total_positions if total_positions > 0 else 0
+
+        # 離職率（直近30日の離職者数 / 雇用者数）
+        separations = self.tracker.separations.total
+        turnover_rate = separations / num_employed if num_employed > 0 else 0
+
+        self.history['time'].append(self.time)
+        self.history['employment_rate'].append(employment_rate)
+        self.history['average_wage'].append(average_wage)
+        self.history['total_profit'].append(total_profit)
+        self.history['job_matching_rate'].append(job_matching_rate)
+        self.history['turnover_rate'].append(turnover_rate)
+
+    def _print_status(self):
+        """現在の状況を表示"""
+        workers = self.workers
+        employed = workers.count(EMPLOYED)
+
+        print(f"\n=== 期間 {self.time} ===")
+        print(f"就職中: {employed}, 未就職: {workers.count(UNEMPLOYED)}, "
+              f"求職中: {workers.count(SEEKING)}, 結果待ち: {workers.count(WAITING)}")
+        print(f"雇用率: {employed/len(workers)*100:.1f}%")
+        print(f"企業総利益: {self.companies.profit.sum():,.0f}円")
+
+    def _panel_columns(self, agent_ids):
+        """パネルの項目ごとの値（列から選んだ労働者の分を取り出す）"""
+        workers = self.workers
+        return {"state": workers.state[agent_ids], "company": workers.company[agent_ids],
+                "tenure": workers.work_days[agent_ids]}
+
+    def _current_states(self):
+        """全労働者の (状態コード, 勤務先・応募先の企業 ID)"""
+        return self.workers.state.copy(), self.workers.company.copy()
+
+    def _attach_event_log(self, log):
+        """状態遷移を報告する箇所にイベントログをつなぐ"""
+        self.event_log = log
+        self.workers.event_log = log
+
+    def set_wage_table(self, wages):
+        """全企業の賃金テーブルを変更"""
+        self.companies.wage = np.array([wages[level] for level in self.companies.level.tolist()],
+                                       dtype=float)
+
+    def set_recruitment_cost(self, cost):
+        """全企業の求人コスト（未充足の求人枠1つあたり）を変更"""
+        self.companies.recruitment_cost[:] = cost
+
+    def _dump_agents(self, arrays):
+        """労働者集団と企業表の列の保存"""
+        return {
+            "workers": checkpoint.dump_columns(self.workers, "worker_", arrays),
+            "companies": checkpoint.dump_columns(self.companies, "company_", arrays),
+        }
+
+    def _load_agents(self, meta, arrays):
+        """_dump_agents の逆"""
+        agents = meta["agents"]
+        self.workers = checkpoint.load_columns(WorkerPopulation, agents["workers"], "worker_", arrays)
+        self.workers.rng = self.np_rng
+        self.workers.event_log = None
+        self.companies = checkpoint.load_columns(CompanyTable, agents["companies"], "company_",
+                                                 arrays)
+        checkpoint.load_tracker(meta["tracker"], arrays, self.tracker, [])
+
+    def _worker_type_counts(self):
+        """労働者タイプ別の人数"""
+        counts = np.bincount(self.workers.type, minlength=len(TYPE_NAMES))
+        return {name: int(count) for name, count in zip(TYPE_NAMES, counts)}
+
+    def _company_level_counts(self):
+        """企業レベル別の社数"""
+        level_counts = defaultdict(int)
+        for level in self.companies.level:
+            level_counts[int(level)] += 1
+        return level_counts
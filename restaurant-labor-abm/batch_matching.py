@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+一括マッチング
+その日の応募者全員と空き枠のある企業全体の割り当てを NumPy の配列演算で決める
+"""
+import numpy as np
+
+
+def batch_match(applicant_levels, company_levels, open_slots, rng=None):
+    """
+    応募者と企業の一括マッチング
+
+    逐次マッチング（応募順に1人ずつ、空き枠があり適合する企業から一様に選ぶ）を
+    ラウンド単位の一括処理で近似します。各ラウンドでは未決定の応募者全員が
+    適合する企業を一様に選び、枠を超えた企業では応募順の早い人から受け付け、
+    あふれた応募者は次のラウンドで残りの企業から選び直します。
+    各ラウンドで少なくとも1人が決まるため必ず終了し、通常は数ラウンドで終わります。
+
+    Args:
+        applicant_levels (array): 応募者のスキルレベル（応募順）
+        company_levels (array): 企業のレベル
+        open_slots (array): 企業ごとの応募受付可能な残り枠
+        rng (numpy.random.Generator): 乱数生成器（省略時は新しく作る）
+
+    Returns:
+        array: 応募者ごとの応募先企業の番号（見つからなければ -1）
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    applicant_levels = np.asarray(applicant_levels)
+    company_levels = np.asarray(company_levels)
+    open_slots = np.array(open_slots, dtype=np.int64)
+
+    chosen = np.full(len(applicant_levels), -1, dtype=np.int64)
+    by_level = np.argsort(company_levels, kind="stable")
+    pending = np.arange(len(applicant_levels))
+
+    while len(pending) > 0:
+        # 空き枠のある企業（レベル順）。適合する企業はこの並びの末尾側に連続する
+        available = by_level[open_slots[by_level] > 0]
+        first_eligible = np.searchsorted(company_levels[available],
+                                         applicant_levels[pending] - 1, side="left")
+        num_eligible = len(available) - first_eligible
+
+        has_candidates = num_eligible > 0
+        pending = pending[has_candidates]
+        if len(pending) == 0:
+            break
+        first_eligible = first_eligible[has_candidates]
+        num_eligible = num_eligible[has_candidates]
+
+        # 適合する企業から一様に選ぶ
+        offsets = (rng.random(len(pending)) * num_eligible).astype(np.int64)
+        picks = available[first_eligible + np.minimum(offsets, num_eligible - 1)]
+
+        # 企業ごとに応募順の早い人から残り枠の数だけ受け付ける
+        order = np.argsort(picks, kind="stable")
+        sorted_picks = picks[order]
+        rank = np.arange(len(picks)) - np.searchsorted(sorted_picks, sorted_picks, side="left")
+        accepted = np.empty(len(picks), dtype=bool)
+        accepted[order] = rank < open_slots[sorted_picks]
+
+        chosen[pending[accepted]] = picks[accepted]
+        open_slots -= np.bincount(picks[accepted], minlength=len(open_slots))
+        pending = pending[~accepted]
+
+    return chosen
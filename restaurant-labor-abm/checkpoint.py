@@ -0,0 +1,440 @@
+# -*- coding: utf-8 -*-
+"""
+チェックポイント
+モデルの状態を ID ベースの NumPy 配列（npz）と JSON のメタ情報に書き出し、同じ状態に復元する
+"""
+import json
+import os
+import numpy as np
+from collections import deque
+from worker_agent import WorkerAgent
+from company_agent import CompanyAgent
+from state_tracker import StateTracker
+from abm_common.history_store import HistoryStore
+from abm_common.panel_recorder import PanelRecorder
+from event_log import EventLog, COLUMNS as EVENT_LOG_COLUMNS
+from vacancy_index import SpatialVacancyIndex
+from abm_common.random_streams import BufferedRandom
+from worker_population import STATE_NAMES, STATE_CODES, NO_COMPANY
+
+CHECKPOINT_VERSION = 1
+
+# メタ情報（JSON）を入れる配列の名前
+META_KEY = "__meta__"
+
+
+def write_checkpoint(path, meta, arrays):
+    """
+    チェックポイントファイルの書き出し（一時ファイルに書いてから置き換える）
+
+    Args:
+        path (str or file): 出力先（ファイルオブジェクトの場合はそのまま書き込む）
+        meta (dict): JSON で保存するメタ情報
+        arrays (dict): 名前 -> NumPy 配列
+    """
+    encoded = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+    if hasattr(path, "write"):
+        np.savez(path, **{META_KEY: encoded}, **arrays)
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **{META_KEY: encoded}, **arrays)
+    os.replace(tmp_path, path)
+
+
+def read_checkpoint(path):
+    """
+    チェックポイントファイルの読み込み
+
+    Returns:
+        tuple: (メタ情報, 名前 -> NumPy 配列)
+    """
+    with np.load(path) as data:
+        arrays = {name: data[name] for name in data.files}
+    meta = json.loads(arrays.pop(META_KEY).tobytes().decode("utf-8"))
+    if meta.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"未対応のチェックポイントの形式です: {meta.get('version')}")
+    return meta, arrays
+
+
+def pack_lists(lists, dtype=np.int64):
+    """リストのリストを (値の配列, 区切り位置の配列) に詰める"""
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(values) for values in lists])
+    values = np.fromiter((v for values in lists for v in values), dtype=dtype,
+                         count=int(offsets[-1]))
+    return values, offsets
+
+
+def unpack_lists(values, offsets):
+    """pack_lists の逆（Python の値のリストのリスト）"""
+    values = values.tolist()
+    return [values[start:end] for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def dump_columns(table, prefix, arrays):
+    """
+    列指向の表（WorkerPopulation・CompanyTable など）の NumPy 配列の属性を保存
+
+    Returns:
+        list: 保存した属性名
+    """
+    names = [name for name, value in vars(table).items() if isinstance(value, np.ndarray)]
+    for name in names:
+        arrays[f"{prefix}{name}"] = getattr(table, name)
+    return names
+
+
+def load_columns(cls, names, prefix, arrays):
+    """dump_columns の逆（__init__ を通さずに表を作る）"""
+    table = cls.__new__(cls)
+    for name in names:
+        setattr(table, name, arrays[f"{prefix}{name}"])
+    return table
+
+
+# --- 乱数生成器 ---
+
+def dump_rngs(rng, np_rng, arrays):
+    """モデルの乱数生成器の状態（先に引いたブロックの残りは配列に入れる）"""
+    python_state, block_seed, buffered = rng.getstate()
+    version, internal_state, gauss_next = python_state
+    arrays["rng_mt_state"] = np.array(internal_state, dtype=np.uint32)
+
+    streams = []
+    for index, (key, generator_state, remaining) in enumerate(buffered):
+        kind = key[0]
+        dtype = np.int64 if kind == "randint" else np.float64
+        arrays[f"rng_buffer_{index}"] = np.array(remaining, dtype=dtype)
+        streams.append({"key": list(key), "state": generator_state})
+
+    return {
+        "mt_version": version,
+        "gauss_next": gauss_next,
+        "block_seed": [block_seed[0], list(block_seed[1]), block_seed[2]],
+        "block_size": rng.block_size,
+        "streams": streams,
+        "numpy": np_rng.bit_generator.state,
+    }
+
+
+def load_rngs(meta, arrays):
+    """
+    dump_rngs の逆
+
+    Returns:
+        tuple: (BufferedRandom, numpy.random.Generator)
+    """
+    python_state = (meta["mt_version"], tuple(arrays["rng_mt_state"].tolist()), meta["gauss_next"])
+    entropy, spawn_key, n_children_spawned = meta["block_seed"]
+    buffered = [(tuple(stream["key"]), stream["state"], arrays[f"rng_buffer_{index}"].tolist())
+                for index, stream in enumerate(meta["streams"])]
+
+    rng = BufferedRandom(block_size=meta["block_size"])
+    rng.setstate((python_state, (entropy, tuple(spawn_key), n_children_spawned), buffered))
+    np_rng = np.random.default_rng()
+    np_rng.bit_generator.state = meta["numpy"]
+    return rng, np_rng
+
+
+# --- 履歴 ---
+
+def dump_history(history, arrays):
+    """
+    履歴（系列名 -> 値のリスト）
+
+    HistoryStore の場合は値を列ファイルに書き出して、ディレクトリと系列ごとの行数だけを記録します。
+    """
+    if isinstance(history, HistoryStore):
+        history.flush()
+        return {"path": history.path, "rows": {name: len(column)
+                                               for name, column in history.items()}}
+    for name, values in history.items():
+        arrays[f"history_{name}"] = np.array(values)
+    return list(history)
+
+
+def load_history(meta, arrays):
+    """dump_history の逆（HistoryStore は保存時点より後に書き出された行を切り捨てる）"""
+    if isinstance(meta, dict):
+        history = HistoryStore.open(meta["path"])
+        for name, rows in meta["rows"].items():
+            history[name].truncate(rows)
+        return history
+    return {name: arrays[f"history_{name}"].tolist() for name in meta}
+
+
+def load_panel(meta):
+    """エージェントパネルの記録を開き直す（保存時点より後に書き出された日を切り捨てる）"""
+    if meta is None:
+        return None
+    panel = PanelRecorder.open(meta["path"], meta["buffer_days"])
+    panel.truncate(meta["days"])
+    return panel
+
+
+def dump_event_log(log, arrays):
+    """
+    状態遷移のイベントログ
+
+    ディスクに書き出すログはディレクトリとイベント数だけを記録し、
+    メモリ上のログはイベントの列と記録開始時点の状態を配列に入れます。
+    """
+    if log is None:
+        return None
+    log.flush()
+    meta = {"path": log.path, "events": len(log), "start_day": log.start_day, "day": log.day,
+            "chunk_size": log.chunk_size}
+    if log.path is None:
+        for name, values in log.columns().items():
+            arrays[f"transition_{name}"] = values
+        arrays["transition_initial_state"] = log.initial_state
+        arrays["transition_initial_company"] = log.initial_company
+    return meta
+
+
+def load_event_log(meta, arrays):
+    """dump_event_log の逆（ディスクのログは保存時点より後のイベントを切り捨てる）"""
+    if meta is None:
+        return None
+    if meta["path"] is not None:
+        log = EventLog.open(meta["path"], meta["chunk_size"])
+        log.truncate(meta["events"])
+    else:
+        log = EventLog(arrays["transition_initial_state"], arrays["transition_initial_company"],
+                       meta["start_day"], chunk_size=meta["chunk_size"])
+        log.append_columns({name: arrays[f"transition_{name}"] for name in EVENT_LOG_COLUMNS})
+    log.day = meta["day"]
+    return log
+
+
+# --- 労働者 ---
+
+def dump_workers(workers, arrays):
+    """労働者（ID = model.workers での位置、勤務先は企業 ID）"""
+    type_names = sorted({w.type for w in workers})
+    type_codes = {name: code for code, name in enumerate(type_names)}
+
+    arrays["worker_id"] = np.array([w.id for w in workers], dtype=np.int64)
+    arrays["worker_type"] = np.array([type_codes[w.type] for w in workers], dtype=np.int8)
+    arrays["worker_level"] = np.array([w.level for w in workers], dtype=np.int8)
+    arrays["worker_state"] = np.array([STATE_CODES[w.state] for w in workers], dtype=np.int8)
+    arrays["worker_company"] = np.array([w.company.id if w.company is not None else NO_COMPANY
+                                         for w in workers], dtype=np.int32)
+    arrays["worker_epoch"] = np.array([w.epoch for w in workers], dtype=np.int64)
+    arrays["worker_elapsed_since"] = np.array([w._elapsed_since for w in workers], dtype=np.int64)
+    arrays["worker_hired_day"] = np.array([w._hired_day for w in workers], dtype=np.int64)
+    arrays["worker_notify_day"] = np.array([w._notify_day for w in workers], dtype=np.int64)
+    arrays["worker_x"] = np.array([w.x for w in workers], dtype=np.int16)
+    arrays["worker_y"] = np.array([w.y for w in workers], dtype=np.int16)
+    return {"types": type_names}
+
+
+def load_workers(meta, arrays, scheduler, tracker, rng, worker_class=WorkerAgent):
+    """
+    dump_workers の逆（勤務先は load_companies で設定する）
+
+    Returns:
+        list: worker_class（WorkerAgent または CompactWorkerAgent）のリスト
+    """
+    type_names = meta["types"]
+    columns = zip(arrays["worker_id"].tolist(), arrays["worker_type"].tolist(),
+                  arrays["worker_level"].tolist(), arrays["worker_state"].tolist(),
+                  arrays["worker_epoch"].tolist(), arrays["worker_elapsed_since"].tolist(),
+                  arrays["worker_hired_day"].tolist(), arrays["worker_notify_day"].tolist(),
+                  arrays["worker_x"].tolist(), arrays["worker_y"].tolist())
+
+    workers = []
+    for (agent_id, type_code, level, state, epoch, elapsed_since, hired_day,
+         notify_day, x, y) in columns:
+        worker = worker_class.__new__(worker_class)
+        worker.id = agent_id
+        worker.type = type_names[type_code]
+        worker.rng = rng
+        worker.scheduler = scheduler
+        worker.level = level
+        worker.state = STATE_NAMES[state]
+        worker.company = None
+        worker.epoch = epoch
+        worker._elapsed_since = elapsed_since
+        worker._hired_day = hired_day
+        worker._notify_day = notify_day
+        worker.x = x
+        worker.y = y
+        worker.tracker = tracker
+        workers.append(worker)
+    return workers
+
+
+# --- 企業 ---
+
+COMPANY_FLOAT_COLUMNS = ("occupancy", "food_cost", "turn_num_max", "recruitment_cost",
+                         "sales", "costs", "profit")
+COMPANY_INT_COLUMNS = ("id", "level", "scale", "frame", "seats", "member_num", "price",
+                       "x", "y", "_applicant_seq")
+
+
+def dump_companies(companies, arrays):
+    """企業（応募者のヒープと従業員は労働者 ID の並びで保存する）"""
+    for column in COMPANY_FLOAT_COLUMNS:
+        arrays[f"company_{column}"] = np.array([getattr(c, column) for c in companies],
+                                               dtype=np.float64)
+    for column in COMPANY_INT_COLUMNS:
+        arrays[f"company_{column}"] = np.array([getattr(c, column) for c in companies],
+                                               dtype=np.int64)
+    arrays["company_turn_num"] = np.array([getattr(c, "turn_num", np.nan) for c in companies],
+                                          dtype=np.float64)
+
+    wage_levels = sorted(companies[0].wages) if companies else []
+    arrays["company_wages"] = np.array([[c.wages[level] for level in wage_levels]
+                                        for c in companies],
+                                       dtype=np.int64).reshape(len(companies), len(wage_levels))
+
+    # 応募者はヒープのリストの並びのまま (通知日, 応募順, 労働者 ID)
+    arrays["applicant_day"], arrays["applicant_offsets"] = pack_lists(
+        [[day for day, _, _ in c.applicants] for c in companies])
+    arrays["applicant_seq"], _ = pack_lists([[seq for _, seq, _ in c.applicants] for c in companies])
+    arrays["applicant_worker"], _ = pack_lists(
+        [[w.id for _, _, w in c.applicants] for c in companies])
+
+    # 従業員は辞書の挿入順
+    arrays["employee_worker"], arrays["employee_offsets"] = pack_lists(
+        [[w.id for w in c.employees] for c in companies])
+    return {"wage_levels": wage_levels}
+
+
+def load_companies(meta, arrays, workers, vacancy_index, tracker, rng,
+                   company_class=CompanyAgent):
+    """
+    dump_companies の逆（労働者の勤務先もここで設定する）
+
+    Returns:
+        list: company_class（CompanyAgent または CompactCompanyAgent）のリスト
+    """
+    columns = {column: arrays[f"company_{column}"].tolist()
+               for column in COMPANY_FLOAT_COLUMNS + COMPANY_INT_COLUMNS}
+    turn_nums = arrays["company_turn_num"].tolist()
+    wage_levels = meta["wage_levels"]
+    wage_tables = arrays["company_wages"].tolist()
+    applicant_days = unpack_lists(arrays["applicant_day"], arrays["applicant_offsets"])
+    applicant_seqs = unpack_lists(arrays["applicant_seq"], arrays["applicant_offsets"])
+    applicant_workers = unpack_lists(arrays["applicant_worker"], arrays["applicant_offsets"])
+    employees = unpack_lists(arrays["employee_worker"], arrays["employee_offsets"])
+
+    companies = []
+    for i in range(len(turn_nums)):
+        company = company_class.__new__(company_class)
+        for column, values in columns.items():
+            setattr(company, column, values[i])
+        if not np.isnan(turn_nums[i]):
+            company.turn_num = turn_nums[i]
+        company.rng = rng
+        company.wages = dict(zip(wage_levels, wage_tables[i]))
+        company.applicants = [(day, seq, workers[worker_id]) for day, seq, worker_id
+                              in zip(applicant_days[i], applicant_seqs[i], applicant_workers[i])]
+        company.employees = {workers[worker_id]: None for worker_id in employees[i]}
+        company.vacancy_index = vacancy_index
+        company.tracker = tracker
+        companies.append(company)
+
+    for worker, company_id in zip(workers, arrays["worker_company"].tolist()):
+        if company_id != NO_COMPANY:
+            worker.company = companies[company_id]
+    return companies
+
+
+# --- スケジューラ ---
+
+def dump_scheduler(scheduler, arrays):
+    """スケジューラ（キューはヒープのリストの並びのまま）"""
+    queue = scheduler._queue
+    arrays["event_day"] = np.array([e[0] for e in queue], dtype=np.int64)
+    arrays["event_seq"] = np.array([e[1] for e in queue], dtype=np.int64)
+    arrays["event_kind"] = np.array([e[2] for e in queue], dtype=np.int8)
+    arrays["event_worker"] = np.array([e[3].id for e in queue], dtype=np.int64)
+    arrays["event_epoch"] = np.array([e[4] for e in queue], dtype=np.int64)
+    return {"now": scheduler.now, "seq": scheduler._seq}
+
+
+def load_scheduler(meta, arrays, scheduler, workers):
+    """dump_scheduler の逆（生成済みのスケジューラに状態を戻す）"""
+    scheduler.now = meta["now"]
+    scheduler._seq = meta["seq"]
+    scheduler._queue = [(day, seq, kind, workers[worker_id], epoch)
+                        for day, seq, kind, worker_id, epoch in zip(
+                            arrays["event_day"].tolist(), arrays["event_seq"].tolist(),
+                            arrays["event_kind"].tolist(), arrays["event_worker"].tolist(),
+                            arrays["event_epoch"].tolist())]
+
+
+# --- 状態集計 ---
+
+TRACKER_COUNTERS = ("num_workers", "total_wage", "total_positions", "total_profit",
+                    "applications_today", "hires_today", "rejections_today",
+                    "separations_today", "total_hires", "total_separations")
+
+
+def dump_tracker(tracker, arrays):
+    """状態集計（状態別プールは並びのまま、雇用者の時給は労働者 ID と組で保存する）"""
+    states = list(tracker.pools)
+    arrays["pool_worker"], arrays["pool_offsets"] = pack_lists(
+        [[w.id for w in tracker.pools[state]] for state in states])
+    arrays["wage_worker"] = np.array([w.id for w in tracker._wages], dtype=np.int64)
+    arrays["wage_value"] = np.array(list(tracker._wages.values()), dtype=np.int64)
+    arrays["separation_window"] = np.array(tracker.separations.values, dtype=np.int64)
+
+    meta = {name: getattr(tracker, name) for name in TRACKER_COUNTERS}
+    meta["states"] = states
+    meta["window_size"] = tracker.separations.values.maxlen
+    meta["window_total"] = tracker.separations.total
+    return meta
+
+
+def new_tracker(meta):
+    """保存時と同じ離職率の期間を持つ空の状態集計"""
+    return StateTracker(meta["window_size"])
+
+
+def load_tracker(meta, arrays, tracker, workers):
+    """dump_tracker の逆（new_tracker で作った状態集計に状態を戻す）"""
+    for name in TRACKER_COUNTERS:
+        setattr(tracker, name, meta[name])
+
+    pools = unpack_lists(arrays["pool_worker"], arrays["pool_offsets"])
+    for state, pool in zip(meta["states"], pools):
+        members = [workers[worker_id] for worker_id in pool]
+        tracker.pools[state] = members
+        for index, worker in enumerate(members):
+            tracker._position[worker] = index
+
+    tracker._wages = {workers[worker_id]: wage for worker_id, wage in zip(
+        arrays["wage_worker"].tolist(), arrays["wage_value"].tolist())}
+    tracker.separations.values = deque(arrays["separation_window"].tolist(),
+                                       maxlen=meta["window_size"])
+    tracker.separations.total = meta["window_total"]
+
+
+# --- 求人インデックス ---
+
+def dump_vacancy_index(index, arrays):
+    """求人インデックス（バケットの辞書の並びとバケット内の並びを保存する）"""
+    keys = list(index._buckets)
+    arrays["vacancy_company"], arrays["vacancy_offsets"] = pack_lists(
+        [[c.id for c in index._buckets[key]] for key in keys])
+    meta = {"keys": [list(key) if isinstance(key, tuple) else key for key in keys]}
+    if isinstance(index, SpatialVacancyIndex):
+        meta["levels"] = sorted(index._levels)
+    return meta
+
+
+def load_vacancy_index(meta, arrays, index, companies):
+    """dump_vacancy_index の逆（生成済みの空のインデックスに状態を戻す）"""
+    buckets = unpack_lists(arrays["vacancy_company"], arrays["vacancy_offsets"])
+    for key, bucket in zip(meta["keys"], buckets):
+        key = tuple(key) if isinstance(key, list) else key
+        members = [companies[company_id] for company_id in bucket]
+        index._buckets[key] = members
+        for position, company in enumerate(members):
+            index._position[company] = position
+    if "levels" in meta:
+        index._levels = set(meta["levels"])
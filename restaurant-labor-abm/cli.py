@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Restaurant Labor ABM のコマンドライン実行
+対話なしで1回のシミュレーションを実行し、サマリー統計と履歴を JSON / CSV に書き出す
+
+使い方:
+    python cli.py --workers 3600 --companies 100 --periods 360 --seed 42 --output run.json
+    python cli.py --model array --workers 360000 --companies 10000 --output history.csv --quiet
+    python cli.py --periods 60 --profile --profile-output run.prof --plot results.png
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+# モデル名 -> (モジュール名, クラス名)（使うモデルだけを読み込む）
+MODELS = {
+    "object": ("restaurant_labor_model", "RestaurantLaborModel"),
+    "array": ("array_model", "ArrayRestaurantLaborModel"),
+}
+
+FORMATS = ("json", "csv")
+
+
+def build_model(args):
+    """コマンドライン引数からモデルを作る"""
+    module_name, class_name = MODELS[args.model]
+    module = __import__(module_name)
+    return getattr(module, class_name)(num_workers=args.workers, num_companies=args.companies,
+                                       commute_radius=args.commute_radius,
+                                       matching=args.matching, seed=args.seed,
+                                       compact_agents=args.compact_agents)
+
+
+def run(args):
+    """
+    シミュレーションの実行
+
+    Returns:
+        dict: params・elapsed・summary・history（系列名 -> 値のリスト）と、
+            --profile の場合は profile（Profiler.report の形式）
+    """
+    model = build_model(args)
+    if args.profile or args.profile_output:
+        model.start_profiling(cprofile=args.profile_output is not None)
+
+    start = time.perf_counter()
+    model.run_simulation(periods=args.periods, verbose=verbose(args))
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "params": {"model": args.model, "num_workers": args.workers,
+                   "num_companies": args.companies, "periods": args.periods,
+                   "seed": args.seed, "commute_radius": args.commute_radius,
+                   "matching": args.matching, "compact_agents": args.compact_agents},
+        "elapsed": elapsed,
+        "summary": model.get_summary_statistics(),
+        "history": {name: list(values) for name, values in model.history.items()},
+    }
+    if args.profile or args.profile_output:
+        model.stop_profiling()
+        result["profile"] = model.profile()
+        if args.profile_output:
+            model.dump_profile(args.profile_output)
+        if args.profile and not verbose(args):
+            # 表示する実行では run_simulation が終了時に表示している
+            print(model._profiler.format_report(), file=sys.stderr)
+
+    if args.plot:
+        model.plot_results(args.plot)
+    return result
+
+
+def verbose(args):
+    """進捗と結果を表示するか（結果を標準出力に書き出す場合は表示しない）"""
+    return not args.quiet and args.output != "-"
+
+
+def write_json(result, f):
+    """実行結果全体を JSON で書き出す"""
+    json.dump(result, f, indent=2, ensure_ascii=False)
+    f.write("\n")
+
+
+def write_csv(result, f):
+    """履歴を日ごとに1行の CSV で書き出す"""
+    history = result["history"]
+    writer = csv.writer(f)
+    writer.writerow(list(history))
+    writer.writerows(zip(*history.values()))
+
+
+def output_format(args):
+    """出力形式（--format の指定、なければ出力先の拡張子、どちらもなければ JSON）"""
+    if args.format is not None:
+        return args.format
+    extension = os.path.splitext(args.output or "")[1].lstrip(".").lower()
+    return extension if extension in FORMATS else "json"
+
+
+def write_result(result, args):
+    """実行結果を --output（"-" は標準出力）に書き出す"""
+    writer = write_json if output_format(args) == "json" else write_csv
+    if args.output == "-":
+        writer(result, sys.stdout)
+        return
+    with open(args.output, "w", newline="", encoding="utf-8") as f:
+        writer(result, f)
+
+
+def print_summary(result):
+    """サマリー統計の表示"""
+    stats = result["summary"]
+    if not stats:
+        return
+    print(f"最終雇用率: {stats['final_employment_rate']*100:.1f}%")
+    print(f"最終平均賃金: {stats['final_average_wage']:.0f}円/時")
+    print(f"最終企業総利益: {stats['final_total_profit']:,.0f}円")
+    print(f"最終求人充足率: {stats['final_job_matching_rate']*100:.1f}%")
+    print(f"実行時間: {result['elapsed']:.2f}s")
+
+
+def parse_args(argv=None):
+    """コマンドライン引数の解釈"""
+    parser = argparse.ArgumentParser(description="Restaurant Labor ABM のシミュレーション実行")
+    parser.add_argument("--model", choices=sorted(MODELS), default="object",
+                        help="モデル（object: RestaurantLaborModel、array: 配列版）")
+    parser.add_argument("--workers", type=int, default=3600, help="労働者数")
+    parser.add_argument("--companies", type=int, default=100, help="企業数")
+    parser.add_argument("--periods", type=int, default=360, help="実行期間（日数）")
+    parser.add_argument("--seed", type=int, default=None, help="乱数シード")
+    parser.add_argument("--commute-radius", type=int, default=None,
+                        help="通勤圏（マンハッタン距離、省略時は全市場）")
+    parser.add_argument("--matching", choices=("sequential", "batch"), default="sequential",
+                        help="マッチングの方式")
+    parser.add_argument("--compact-agents", action="store_true",
+                        help="属性を __slots__ に固定した省メモリのエージェントを使う（--model object のみ）")
+    parser.add_argument("--output", default=None,
+                        help="結果の出力先（\"-\" は標準出力、省略時は出力しない）")
+    parser.add_argument("--format", choices=FORMATS, default=None,
+                        help="出力形式（json: サマリーと履歴、csv: 履歴。既定: 出力先の拡張子から）")
+    parser.add_argument("--profile", action="store_true",
+                        help="フェーズとメソッドごとの時間を計測して表示する（--quiet では標準エラー出力）")
+    parser.add_argument("--profile-output", default=None,
+                        help="cProfile の結果（.prof）の出力先")
+    parser.add_argument("--plot", default=None,
+                        help="グラフの画像の出力先（指定した場合のみ matplotlib を読み込む）")
+    parser.add_argument("--quiet", action="store_true", help="進捗とサマリーを表示しない")
+    args = parser.parse_args(argv)
+    if args.compact_agents and args.model != "object":
+        # 配列版モデルはエージェントのオブジェクトを持たない
+        parser.error("--compact-agents は --model object でのみ使えます")
+    return args
+
+
+def main(argv=None):
+    """コマンドラインからの実行"""
+    args = parse_args(argv)
+    result = run(args)
+    if args.output is not None:
+        write_result(result, args)
+    if verbose(args):
+        print_summary(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""
+省メモリのエージェントクラス
+WorkerAgent・CompanyAgent と同じメソッドを持ち、属性を __slots__（各クラスの FIELDS）に固定したクラス
+"""
+import random
+
+from abm_common.compact import check_fields, compact_class
+from worker_agent import WorkerAgent
+from company_agent import CompanyAgent
+
+# FIELDS と実際の属性のずれを読み込み時に検出する
+check_fields(WorkerAgent(0, "freeter", rng=random.Random(0)))
+check_fields(CompanyAgent(0, rng=random.Random(0)), set_later=("turn_num",))
+
+CompactWorkerAgent = compact_class(WorkerAgent, __name__)
+CompactCompanyAgent = compact_class(CompanyAgent, __name__)
@@ -3,19 +3,32 @@
 企業エージェント
 Restaurant Labor ABMシミュレーションの企業エージェント実装
 """
+import heapq
 import random
+from lattice import Lattice
 
 class CompanyAgent:
     """企業エージェント - 飲食店の経営を行う"""
 
-    def __init__(self, company_id):
+    # インスタンスの属性（省メモリのクラスの __slots__。turn_num は最初の経営指標の計算で設定される）
+    FIELDS = ("id", "rng", "level", "scale", "frame", "seats", "member_num", "occupancy", "price",
+              "food_cost", "turn_num_max", "turn_num", "applicants", "employees", "_applicant_seq",
+              "wages", "recruitment_cost", "x", "y", "sales", "costs", "profit", "vacancy_index",
+              "tracker")
+
+    def __init__(self, company_id, vacancy_index=None, lattice=None, tracker=None, rng=None):
         """
         企業エージェントの初期化
 
         Args:
             company_id (int): 企業の一意識別子
+            vacancy_index (VacancyIndex): 空き枠の変化を報告する求人インデックス（省略可）
+            lattice (Lattice): 配置する格子空間（省略時は5x5）
+            tracker (StateTracker): 利益の変化を報告する状態集計（省略可）
+            rng (random.Random): モデルの乱数生成器（省略時は random モジュール）
         """
         self.id = company_id
+        self.rng = rng if rng is not None else random
 
         # レベル（企業グレード）の設定
         level_weights = [(20, 1), (30, 2), (20, 3), (15, 4), (10, 5), (5, 6)]
@@ -56,25 +69,37 @@ class CompanyAgent:
         self.turn_num_max = turn_num_config.get(self.price, 8)
 
         # 従業員管理
-        self.applicants = []      # 応募者リスト
-        self.employees = []       # 採用済み従業員リスト
+        self.applicants = []      # 応募者（採用通知日をキーとするヒープ）
+        self.employees = {}       # 採用済み従業員（挿入順を保つ辞書、値は未使用）
+        self._applicant_seq = 0   # 同じ通知日の応募者を応募順に並べるための番号
 
         # 賃金テーブル
         self.wages = {1: 980, 2: 1080, 3: 1180, 4: 1280, 5: 1380, 6: 1480}
 
-        # 位置（5x5格子上の位置）
-        self.x = random.randint(0, 4)
-        self.y = random.randint(0, 4)
+        # 求人コスト（未充足の求人枠1つあたり）
+        self.recruitment_cost = 3000
+
+        # 位置（格子上の位置）
+        self.x, self.y = (lattice or Lattice()).random_position(self.rng)
 
         # 経営指標
         self.sales = 0.0
         self.costs = 0.0
         self.profit = 0.0
 
+        # 求人インデックスへの登録
+        self.vacancy_index = vacancy_index
+        self._update_vacancy()
+
+        # 状態集計への登録
+        self.tracker = tracker
+        if tracker is not None:
+            tracker.add_company(self)
+
     def _weighted_choice(self, weights):
         """重み付き選択"""
         total = sum(weight for weight, _ in weights)
-        r = random.uniform(0, total)
+        r = self.rng.uniform(0, total)
         upto = 0
         for weight, choice in weights:
             if upto + weight >= r:
@@ -91,24 +116,22 @@ class CompanyAgent:
         self._calculate_business_metrics()
 
     def _process_applicants(self):
-        """応募者の選考処理"""
-        processed_applicants = []
+        """応募者の選考処理（採用通知日を迎えた応募者だけを取り出す）"""
+        applicants = self.applicants
 
-        for applicant in self.applicants[:]:  # コピーを作ってイテレート
-            if applicant.wait_days > 0:
-                # まだ待機期間中
-                continue
+        while applicants and applicants[0][2].wait_days == 0:
+            _, _, applicant = heapq.heappop(applicants)
 
             # 選考実施
             if self.level - 1 <= applicant.level:
                 # 採用
-                self.employees.append(applicant)
+                self.employees[applicant] = None
                 applicant.get_hired(self)
-                self.applicants.remove(applicant)
             else:
                 # 不採用
                 applicant.get_rejected()
-                self.applicants.remove(applicant)
+
+        self._update_vacancy()
 
     def _calculate_business_metrics(self):
         """経営指標の計算"""
@@ -125,13 +148,16 @@ class CompanyAgent:
         food_costs = self.seats * self.occupancy * self.turn_num * self.food_cost
         # - 人件費（基本従業員 + 採用済み従業員）
         labor_costs = current_employees * self.wages[self.level] * 6
-        # - 求人コスト（未充足分 x 3000円）
-        recruitment_costs = (self.frame - len(self.employees)) * 3000
+        # - 求人コスト（未充足分 x 求人コスト）
+        recruitment_costs = (self.frame - len(self.employees)) * self.recruitment_cost
 
         self.costs = food_costs + labor_costs + recruitment_costs
 
         # 利益計算
-        self.profit = self.sales - self.costs
+        profit = self.sales - self.costs
+        if self.tracker is not None:
+            self.tracker.update_profit(self.profit, profit)
+        self.profit = profit
 
     def can_accept_applicant(self):
         """新規応募者を受け入れ可能か判定"""
@@ -140,14 +166,22 @@ class CompanyAgent:
     def accept_applicant(self, worker):
         """応募者を受け入れ"""
         if self.can_accept_applicant():
-            self.applicants.append(worker)
+            heapq.heappush(self.applicants, (worker.notify_day, self._applicant_seq, worker))
+            self._applicant_seq += 1
+            self._update_vacancy()
             return True
         return False
 
     def remove_employee(self, worker):
         """従業員の削除（離職時）"""
         if worker in self.employees:
-            self.employees.remove(worker)
+            del self.employees[worker]
+            self._update_vacancy()
+
+    def _update_vacancy(self):
+        """空き枠の変化を求人インデックスに反映"""
+        if self.vacancy_index is not None:
+            self.vacancy_index.update(self)
 
     def get_distance_to(self, worker):
         """労働者との距離を計算（マンハッタン距離）"""
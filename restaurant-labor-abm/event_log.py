@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+状態遷移のイベントログ
+労働者の状態遷移を (日, 労働者 ID, 企業 ID, イベント) の追記専用の列に記録し、
+任意の日の状態の復元や採用・離職・滞在日数などのフロー指標の計算に使う
+"""
+import json
+import os
+from array import array
+
+import numpy as np
+
+from worker_population import STATE_CODES, SEEKING, WAITING, EMPLOYED, GATHERING, NO_COMPANY
+
+# イベントの種類
+APPLY = 0    # 応募（結果待ちになる）
+HIRE = 1     # 採用（就職中になる）
+REJECT = 2   # 不採用（情報収集中になる）
+QUIT = 3     # 離職（情報収集中になる）
+SEEK = 4     # 求職開始（求職中になる）
+
+EVENT_NAMES = ("apply", "hire", "reject", "quit", "seek")
+EVENT_CODES = {name: code for code, name in enumerate(EVENT_NAMES)}
+
+# イベント -> イベント後の状態コード
+EVENT_STATES = np.array([WAITING, EMPLOYED, GATHERING, GATHERING, SEEKING], dtype=np.int8)
+
+# 遷移後の状態 -> イベント（情報収集中は遷移前の状態で不採用と離職を分ける）
+_EVENTS_BY_STATE = {"結果待ち": APPLY, "就職中": HIRE, "求職中": SEEK}
+
+# 列名 -> (array モジュールの型コード, NumPy の型)
+COLUMNS = {"day": ("i", np.int32), "worker": ("i", np.int32),
+           "company": ("i", np.int32), "event": ("b", np.int8)}
+
+DEFAULT_CHUNK_SIZE = 65536  # 1回に書き出す（NumPy 配列にまとめる）イベント数
+META_FILE = "events.json"
+INITIAL_FILE = "initial.npz"
+
+
+class EventLog:
+    """
+    状態遷移のイベントログ
+
+    イベントはまず列ごとの array（4バイト・1バイトの整数）に追記し、chunk_size 件溜まったら
+    NumPy 配列にまとめます（path を指定した場合は列ファイル <列名>.bin に追記します）。
+    記録開始時点の全労働者の状態と企業も保存するため、任意の日の状態を
+    その日までのイベントだけから復元できます。
+    """
+
+    def __init__(self, initial_state, initial_company, start_day=0, path=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, append=False):
+        """
+        Args:
+            initial_state (array): 記録開始時点の労働者ごとの状態コード
+            initial_company (array): 記録開始時点の労働者ごとの企業 ID（なしは NO_COMPANY）
+            start_day (int): 記録開始の日
+            path (str): 書き出すディレクトリ（None の場合はメモリに保持する）
+            chunk_size (int): 1回に書き出すイベント数
+            append (bool): 既存のログに追記するか（False の場合は既存の列ファイルを消す）
+        """
+        self.initial_state = np.asarray(initial_state, dtype=np.int8)
+        self.initial_company = np.asarray(initial_company, dtype=np.int32)
+        self.start_day = start_day
+        self.path = path
+        self.chunk_size = chunk_size
+        self.day = start_day  # モデルが日ごとに進める（イベントの日付）
+
+        self._buffers = {name: array(code) for name, (code, _) in COLUMNS.items()}
+        self._chunks = {name: [] for name in COLUMNS}
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            if not append:
+                for name in COLUMNS:
+                    if os.path.exists(self._file(name)):
+                        os.remove(self._file(name))
+                np.savez(os.path.join(path, INITIAL_FILE), state=self.initial_state,
+                         company=self.initial_company)
+                with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+                    json.dump({"start_day": start_day}, f)
+
+    @classmethod
+    def open(cls, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """書き出し済みのログを開く（追記もできる）"""
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        with np.load(os.path.join(path, INITIAL_FILE)) as initial:
+            state, company = initial["state"], initial["company"]
+        return cls(state, company, meta["start_day"], path, chunk_size, append=True)
+
+    @property
+    def num_workers(self):
+        return len(self.initial_state)
+
+    # --- 記録 ---
+
+    def log(self, worker_id, company_id, event):
+        """イベントを1件追記"""
+        buffers = self._buffers
+        buffers["day"].append(self.day)
+        buffers["worker"].append(worker_id)
+        buffers["company"].append(company_id)
+        buffers["event"].append(event)
+        if len(buffers["event"]) >= self.chunk_size:
+            self.flush()
+
+    def log_many(self, workers, companies, event):
+        """
+        同じ種類のイベントをまとめて追記（WorkerPopulation の一括処理から呼ぶ）
+
+        Args:
+            workers (array): 労働者 ID
+            companies (array or int): 企業 ID
+            event (str): イベント名（EVENT_NAMES のいずれか）
+        """
+        if len(workers) == 0:
+            return
+        event = EVENT_CODES[event]
+        self.flush()
+        n = len(workers)
+        self.append_columns({"day": np.full(n, self.day, dtype=np.int32),
+                             "worker": np.asarray(workers, dtype=np.int32),
+                             "company": np.broadcast_to(np.asarray(companies, dtype=np.int32), (n,)),
+                             "event": np.full(n, event, dtype=np.int8)})
+
+    def on_transition(self, worker, old_state, new_state):
+        """状態集計からの状態遷移の報告（worker.company は応募・採用では新しい企業、
+        不採用・離職では元の企業）"""
+        event = _EVENTS_BY_STATE.get(new_state)
+        if event is None:
+            event = QUIT if old_state == "就職中" else REJECT
+        company = worker.company
+        self.log(worker.id, company.id if company is not None else NO_COMPANY, event)
+
+    def flush(self):
+        """バッファのイベントを NumPy 配列にまとめる（path があれば列ファイルに書き出す）"""
+        buffers = self._buffers
+        if not buffers["event"]:
+            return
+        self.append_columns({name: np.frombuffer(buffers[name], dtype=dtype).copy()
+                             for name, (_, dtype) in COLUMNS.items()})
+        for buffer in buffers.values():
+            del buffer[:]
+
+    def append_columns(self, columns):
+        """列ごとの配列のイベントを追記"""
+        if self.path is None:
+            for name, values in columns.items():
+                self._chunks[name].append(np.ascontiguousarray(values))
+        else:
+            for name, values in columns.items():
+                with open(self._file(name), "ab") as f:
+                    f.write(np.ascontiguousarray(values).tobytes())
+
+    def truncate(self, events):
+        """先頭の events 件だけを残す（チェックポイントから再開するときに使う）"""
+        self.flush()
+        if self.path is None:
+            columns = self.columns()
+            self._chunks = {name: [values[:events].copy()] for name, values in columns.items()}
+            return
+        events = min(events, len(self))
+        for name, (_, dtype) in COLUMNS.items():
+            if os.path.exists(self._file(name)):
+                os.truncate(self._file(name), events * np.dtype(dtype).itemsize)
+
+    def __len__(self):
+        """記録したイベント数"""
+        if self.path is None:
+            stored = sum(len(chunk) for chunk in self._chunks["event"])
+        elif os.path.exists(self._file("event")):
+            stored = os.path.getsize(self._file("event"))
+        else:
+            stored = 0
+        return stored + len(self._buffers["event"])
+
+    def _file(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    # --- 読み出し ---
+
+    def columns(self):
+        """
+        全イベントの列（日の順、同じ日の中では記録した順）
+
+        Returns:
+            dict: "day", "worker", "company", "event" -> NumPy 配列
+        """
+        self.flush()
+        columns = {}
+        for name, (_, dtype) in COLUMNS.items():
+            if self.path is None:
+                chunks = self._chunks[name]
+                values = np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+                self._chunks[name] = [values]
+            elif os.path.exists(self._file(name)) and os.path.getsize(self._file(name)):
+                values = np.memmap(self._file(name), dtype=dtype, mode="r")
+            else:
+                values = np.empty(0, dtype=dtype)
+            columns[name] = values
+        return columns
+
+    def state_at(self, day):
+        """
+        指定した日の終わりの全労働者の状態の復元（その日までのイベント数に比例する時間）
+
+        Returns:
+            tuple: (労働者ごとの状態コード, 労働者ごとの企業 ID)
+        """
+        columns = self.columns()
+        n = np.searchsorted(columns["day"], day, side="right")
+        workers = columns["worker"][:n]
+        state = self.initial_state.copy()
+        company = self.initial_company.copy()
+
+        # 労働者ごとの最後のイベント（逆順にして最初に現れる位置）
+        last_workers, reversed_index = np.unique(workers[::-1], return_index=True)
+        last = n - 1 - reversed_index
+        state[last_workers] = EVENT_STATES[columns["event"][last]]
+        company[last_workers] = np.where(np.isin(columns["event"][last], (APPLY, HIRE)),
+                                         columns["company"][last], NO_COMPANY)
+        return state, company
+
+    def worker_history(self, worker_id):
+        """
+        1人の労働者のイベントの一覧
+
+        Returns:
+            list: (日, イベント名, 企業 ID) のリスト
+        """
+        columns = self.columns()
+        index = np.flatnonzero(columns["worker"] == worker_id)
+        return [(day, EVENT_NAMES[event], company) for day, event, company in
+                zip(columns["day"][index].tolist(), columns["event"][index].tolist(),
+                    columns["company"][index].tolist())]
+
+    def daily_counts(self, last_day=None):
+        """
+        日ごとのイベント数（フロー指標）
+
+        Args:
+            last_day (int): 集計する最後の日（省略時は最後のイベントの日）
+
+        Returns:
+            dict: イベント名 -> 日ごとの件数の配列（添字が日）
+        """
+        columns = self.columns()
+        if last_day is None:
+            last_day = int(columns["day"][-1]) if len(columns["day"]) else self.start_day
+        return {name: np.bincount(columns["day"][columns["event"] == event],
+                                  minlength=last_day + 1)[:last_day + 1]
+                for event, name in enumerate(EVENT_NAMES)}
+
+    def spell_durations(self, state):
+        """
+        状態の滞在日数（その状態に入ってから次のイベントまでの日数、終わった滞在のみ）
+
+        記録開始前から続いている滞在は、入った日がわからないため含みません。
+
+        Args:
+            state (str or int): 状態名（"就職中" など）または状態コード
+
+        Returns:
+            array: 滞在ごとの日数
+        """
+        code = STATE_CODES[state] if isinstance(state, str) else state
+        columns = self.columns()
+        order = np.argsort(columns["worker"], kind="stable")  # 労働者ごと・日の順
+        workers = columns["worker"][order]
+        days = columns["day"][order]
+        entered = EVENT_STATES[columns["event"][order]] == code
+
+        # 同じ労働者の次のイベントがある滞在だけを数える
+        has_next = np.zeros(len(order), dtype=bool)
+        has_next[:-1] = workers[:-1] == workers[1:]
+        spells = np.flatnonzero(entered & has_next)
+        return days[spells + 1] - days[spells]
+
+    def summary(self):
+        """イベント数の内訳とログの大きさ"""
+        columns = self.columns()
+        counts = np.bincount(columns["event"], minlength=len(EVENT_NAMES))
+        result = {f"num_{name}": int(count) for name, count in zip(EVENT_NAMES, counts)}
+        result["num_events"] = len(columns["event"])
+        result["bytes"] = sum(values.nbytes for values in columns.values())
+        return result
+
+
+def initial_state_of(workers):
+    """WorkerAgent のリストから記録開始時点の (状態コード, 企業 ID) を作る"""
+    state = np.fromiter((STATE_CODES[w.state] for w in workers), dtype=np.int8, count=len(workers))
+    company = np.fromiter((w.company.id if w.company is not None else NO_COMPANY
+                           for w in workers), dtype=np.int32, count=len(workers))
+    return state, company
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+イベントスケジューラ
+労働者のタイマー（離職判定・情報収集期間の終了）をシミュレーション日で管理する
+"""
+import heapq
+import random
+from turnover import process_turnover_checks
+
+# イベントの種類
+TURNOVER_CHECK = 0   # 就職から30日ごとの離職判定
+GATHERING_END = 1    # 情報収集期間の終了（求職開始）
+
+
+class EventScheduler:
+    """
+    離散イベントスケジューラ - シミュレーション日をキーとする優先度付きキュー
+
+    毎日すべての労働者を呼び出す代わりに、イベントの期日を迎えた労働者だけを起こします。
+    労働者の日数カウンタは now と状態が変わった日から計算されるため、
+    1日あたりのコストは労働者数ではなくイベント数に比例します。
+    離職判定はその日の対象者をまとめて process_turnover_checks に渡します。
+    """
+
+    def __init__(self, rng=None, np_rng=None):
+        """
+        Args:
+            rng (random.Random): 一括処理に使う乱数生成器（省略時は random モジュール）
+            np_rng (numpy.random.Generator): 一括処理に使う NumPy の乱数生成器
+        """
+        self.rng = rng if rng is not None else random
+        self.np_rng = np_rng
+        self.now = 0        # 完了した日数（労働者フェーズの回数）
+        self._queue = []    # (期日, 登録順, 種類, 労働者, 世代)
+        self._seq = 0
+
+        # 1日分をまとめて処理するイベントの種類と処理関数
+        self._batch_handlers = {TURNOVER_CHECK: process_turnover_checks}
+
+    def __len__(self):
+        return len(self._queue)
+
+    def schedule(self, day, worker, kind):
+        """
+        イベントの登録
+
+        Args:
+            day (int): イベントを処理する日（now がこの日に進む直前に処理される）
+            worker (WorkerAgent): 起こす労働者
+            kind (int): イベントの種類
+        """
+        heapq.heappush(self._queue, (day, self._seq, kind, worker, worker.epoch))
+        self._seq += 1
+
+    def advance(self):
+        """1日進める - 期日を迎えたイベントを処理してから now を更新する"""
+        day = self.now + 1
+        queue = self._queue
+        batches = {}
+        while queue and queue[0][0] <= day:
+            _, _, kind, worker, epoch = heapq.heappop(queue)
+            # 登録後に状態が変わった労働者のイベントは無効
+            if epoch != worker.epoch:
+                continue
+            if kind in self._batch_handlers:
+                batches.setdefault(kind, []).append(worker)
+            else:
+                worker.handle_event(kind)
+
+        for kind, workers in batches.items():
+            self._batch_handlers[kind](workers, self.rng, self.np_rng)
+        self.now = day
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+格子空間
+エージェントを配置する width x height の格子（元モデルの LatticeGraph に相当）
+"""
+import random
+
+
+class Lattice:
+    """格子空間 - エージェントの位置と距離（マンハッタン距離）を扱う"""
+
+    def __init__(self, width=5, height=5):
+        """
+        格子空間の初期化
+
+        Args:
+            width (int): 格子の幅
+            height (int): 格子の高さ
+        """
+        if width < 1 or height < 1:
+            raise ValueError(f"格子の大きさが不正です: {width}x{height}")
+        self.width = width
+        self.height = height
+
+    def random_position(self, rng=random):
+        """
+        格子上のランダムな位置
+
+        Args:
+            rng (random.Random): 乱数生成器（省略時は random モジュール）
+        """
+        x = rng.randint(0, self.width - 1)
+        y = rng.randint(0, self.height - 1)
+        return x, y
+
+    def distance(self, x1, y1, x2, y2):
+        """2点間のマンハッタン距離"""
+        return abs(x1 - x2) + abs(y1 - y2)
+
+    def cells_within(self, x, y, radius):
+        """
+        (x, y) からマンハッタン距離 radius 以内のセル（格子の外は除く）
+
+        Returns:
+            list: (x, y) のリスト
+        """
+        cells = []
+        for cx in range(max(0, x - radius), min(self.width - 1, x + radius) + 1):
+            reach = radius - abs(cx - x)
+            for cy in range(max(0, y - reach), min(self.height - 1, y + reach) + 1):
+                cells.append((cx, cy))
+        return cells
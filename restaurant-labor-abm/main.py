@@ -3,8 +3,6 @@
 Restaurant Labor ABM メイン実行ファイル
 レストラン労働力ABMシミュレーションのメイン実行スクリプト
 """
-import random
-import numpy as np
 from restaurant_labor_model import RestaurantLaborModel
 
 def main():
@@ -13,15 +11,12 @@ def main():
     print("レストラン労働力エージェントベースモデル")
     print("=" * 50)
 
-    # ランダムシードの設定（再現性のため）
-    random.seed(42)
-    np.random.seed(42)
-
-    # モデルの作成
+    # モデルの作成（乱数シードはモデルごとに指定して再現性を保つ）
     # 実際の研究では労働者3600人、企業約100社だが、テスト用に小さくする
     model = RestaurantLaborModel(
         num_workers=360,    # 労働者数（元: 3600）
-        num_companies=10    # 企業数（元: 約100）
+        num_companies=10,   # 企業数（元: 約100）
+        seed=42
     )
 
     # シミュレーション実行（1年間 = 360日）
@@ -3,53 +3,141 @@
 レストラン労働力ABMモデル
 Restaurant Labor ABMシミュレーションのメインモデル
 """
-import random
-import matplotlib.pyplot as plt
+import io
+import numpy as np
 from collections import defaultdict
 from worker_agent import WorkerAgent
 from company_agent import CompanyAgent
+from compact_agents import CompactWorkerAgent, CompactCompanyAgent
+from event_scheduler import EventScheduler
+from vacancy_index import VacancyIndex, SpatialVacancyIndex
+from lattice import Lattice
+from batch_matching import batch_match
+from state_tracker import StateTracker
+from abm_common.history_store import HistoryStore
+from abm_common.panel_recorder import PanelRecorder, DEFAULT_BUFFER_DAYS
+from event_log import EventLog, initial_state_of, DEFAULT_CHUNK_SIZE
+from abm_common.profiler import Profiler, MemoryProfiler, NULL_PHASE, memory_accounts
+from worker_population import STATE_CODES, EMPLOYED, NO_COMPANY
+from abm_common.random_streams import make_rngs
+import checkpoint
+
+# 労働者タイプの分布
+WORKER_TYPE_WEIGHTS = [(30, "freeter"), (37, "student"), (24, "housewife"), (9, "foreigner")]
+
+# compact_agents -> (労働者のクラス, 企業のクラス)
+AGENT_CLASSES = {
+    False: (WorkerAgent, CompanyAgent),
+    True: (CompactWorkerAgent, CompactCompanyAgent),
+}
+
+# エージェントパネルの項目（状態コード、勤務先・応募先の企業 ID、就職日数）
+PANEL_FIELDS = {"state": np.int8, "company": np.int32, "tenure": np.int32}
+
 
 class RestaurantLaborModel:
     """レストラン労働力ABMのメインモデル"""
 
-    def __init__(self, num_workers=3600, num_companies=100):
+    # start_profiling で計時するエージェントのメソッド
+    PROFILED_METHODS = (
+        (WorkerAgent, "handle_event"),
+        (WorkerAgent, "apply_to_company"),
+        (WorkerAgent, "get_hired"),
+        (WorkerAgent, "get_rejected"),
+        (WorkerAgent, "quit_job"),
+        (CompanyAgent, "step"),
+        (CompanyAgent, "accept_applicant"),
+    )
+
+    def __init__(self, num_workers=3600, num_companies=100, width=5, height=5,
+                 commute_radius=None, matching="sequential", seed=None, history_path=None,
+                 compact_agents=False):
         """
         モデルの初期化
 
         Args:
             num_workers (int): 労働者エージェント数
             num_companies (int): 企業エージェント数
+            width (int): 格子空間の幅
+            height (int): 格子空間の高さ
+            commute_radius (int): 通勤圏の半径（マンハッタン距離）。
+                None の場合は全市場でマッチングする
+            matching (str): "sequential"（応募者を1人ずつ処理）または
+                "batch"（その日の応募者全員を配列演算で一括処理、全市場のマッチングのみ）
+            seed (int or SeedSequence): モデルの乱数シード。None の場合は OS のエントロピーを使う。
+                反復実行には random_streams.replicate_seed で作った子シードを渡す
+            history_path (str): 履歴を書き出すディレクトリ。指定すると履歴をメモリに溜めず、
+                一定の行数ごとに列ファイルへ書き出す（None の場合は系列名 -> リストの辞書）
+            compact_agents (bool): 属性を __slots__ に固定した省メモリのエージェント
+                （CompactWorkerAgent・CompactCompanyAgent）を使うか。振る舞いと結果は同じ
         """
+        if matching not in ("sequential", "batch"):
+            raise ValueError(f"未対応のマッチング方式です: {matching}")
+
         self.num_workers = num_workers
         self.num_companies = num_companies
         self.time = 0
 
+        # このモデル専用の乱数生成器（エージェントに渡し、グローバルな random は使わない）
+        self.rng, self.np_rng = make_rngs(seed)
+
+        # 格子空間
+        self.lattice = Lattice(width, height)
+        self.commute_radius = commute_radius
+        self.matching = matching
+        self.compact_agents = compact_agents
+        self.worker_class, self.company_class = AGENT_CLASSES[compact_agents]
+
+        # 労働者のタイマー（離職判定・情報収集期間）を管理するスケジューラ
+        self.scheduler = EventScheduler(self.rng, self.np_rng)
+
+        # 状態遷移のたびに更新される集計（統計の記録で全員を走査しない）
+        self.tracker = StateTracker()
+
+        # 空き枠のある企業をレベル別（通勤圏を使う場合はセル別）に保持する求人インデックス
+        self.vacancy_index = self._create_vacancy_index()
+
         # エージェントの生成
         self.workers = self._create_workers()
         self.companies = self._create_companies()
 
-        # 統計データ保存用
-        self.history = {
-            'time': [],
-            'employment_rate': [],
-            'average_wage': [],
-            'total_profit': [],
-            'job_matching_rate': [],
-            'turnover_rate': []
-        }
+        # 統計データ保存用（history_path を指定した場合はディスク上の列ファイルに書き出す）
+        self.history = self._create_history(history_path)
+
+        # エージェントパネルの記録（record_panel で開始する）
+        self.panel = None
+        self._panel_cache = None
+
+        # 状態遷移のイベントログ（record_events で開始する）
+        self.event_log = None
+
+        # フェーズ計時（start_profiling で開始する）
+        self._profiler = None
 
         # 応募者選定パラメータ
         self.daily_applicants = max(1, int(num_workers / 360))  # 1日あたりの新規応募者数
 
+    def _create_history(self, history_path):
+        """履歴の生成（系列名 -> 値のリスト、または HistoryStore）"""
+        columns = ['time', 'employment_rate', 'average_wage', 'total_profit',
+                   'job_matching_rate', 'turnover_rate']
+        if history_path is None:
+            return {name: [] for name in columns}
+        return HistoryStore(history_path, columns, dtypes={'time': np.int64})
+
+    def _create_vacancy_index(self):
+        """空の求人インデックスの生成"""
+        if self.commute_radius is None:
+            return VacancyIndex(rng=self.rng)
+        return SpatialVacancyIndex(self.lattice, self.commute_radius, rng=self.rng)
+
     def _create_workers(self):
         """労働者エージェントの生成"""
         workers = []
-        # タイプ別の分布
-        type_weights = [(30, "freeter"), (37, "student"), (24, "housewife"), (9, "foreigner")]
-
         for i in range(self.num_workers):
-            worker_type = self._weighted_choice(type_weights)
-            worker = WorkerAgent(i, worker_type)
+            worker_type = self._weighted_choice(WORKER_TYPE_WEIGHTS)
+            worker = self.worker_class(i, worker_type, self.scheduler, self.lattice,
+                                       self.tracker, self.rng)
             workers.append(worker)
 
         return workers
@@ -58,14 +146,15 @@ class RestaurantLaborModel:
         """企業エージェントの生成"""
         companies = []
         for i in range(self.num_companies):
-            company = CompanyAgent(i)
+            company = self.company_class(i, self.vacancy_index, self.lattice, self.tracker,
+                                         self.rng)
             companies.append(company)
         return companies
 
     def _weighted_choice(self, weights):
         """重み付き選択"""
         total = sum(weight for weight, _ in weights)
-        r = random.uniform(0, total)
+        r = self.rng.uniform(0, total)
         upto = 0
         for weight, choice in weights:
             if upto + weight >= r:
@@ -76,131 +165,489 @@ class RestaurantLaborModel:
     def step(self):
         """1ステップの実行"""
         self.time += 1
+        if self.event_log is not None:
+            self.event_log.day = self.time
 
         # 1. 新規応募者の選定とマッチング
-        self._select_applicants_and_match()
+        with self.phase("matching"):
+            self._select_applicants_and_match()
 
-        # 2. 全労働者のステップ実行
-        for worker in self.workers:
-            worker.step()
+        # 2. 労働者のステップ実行（期日を迎えたイベントの労働者だけを起こす）
+        with self.phase("workers"):
+            self.scheduler.advance()
 
         # 3. 全企業のステップ実行
-        for company in self.companies:
-            company.step()
+        with self.phase("companies"):
+            for company in self.companies:
+                company.step()
 
         # 4. 統計情報の記録
-        self._record_statistics()
+        with self.phase("statistics"):
+            self._record_statistics()
 
     def _select_applicants_and_match(self):
-        """応募者選定とマッチング処理"""
+        """応募者選定とマッチング処理（全労働者ではなく状態別のプールから選ぶ）"""
         # 新規応募者の選定（未就職者から）
-        unemployed = [w for w in self.workers if w.state == "未就職"]
+        unemployed = self.tracker.pool("未就職")
         if len(unemployed) > self.daily_applicants:
-            new_applicants = random.sample(unemployed, self.daily_applicants)
+            new_applicants = self.rng.sample(unemployed, self.daily_applicants)
         else:
             new_applicants = unemployed[:]
 
         # 求職中の労働者も応募候補に追加
-        job_seekers = [w for w in self.workers
-                      if w.state == "求職中" and w.elapsed_days > 1]
+        job_seekers = [w for w in self.tracker.pool("求職中") if w.elapsed_days > 1]
 
         all_applicants = new_applicants + job_seekers
 
         # マッチング処理
-        for worker in all_applicants:
-            self._match_worker_to_company(worker)
+        if self._uses_batch_matching():
+            self._batch_match_workers(all_applicants)
+        else:
+            for worker in all_applicants:
+                self._match_worker_to_company(worker)
+
+    def _uses_batch_matching(self):
+        """一括マッチングを使うか（通勤圏を使う場合は逐次処理）"""
+        return self.matching == "batch" and self.commute_radius is None
+
+    def _batch_match_workers(self, applicants):
+        """その日の応募者全員と空き枠のある企業を一括でマッチング"""
+        if not applicants:
+            return
+        companies = self.vacancy_index.companies()
+        chosen = batch_match(
+            np.array([w.level for w in applicants]),
+            np.array([c.level for c in companies]),
+            np.array([c.frame - len(c.applicants) - len(c.employees) for c in companies]),
+            self.np_rng)
+
+        for worker, index in zip(applicants, chosen):
+            if index >= 0:
+                company = companies[index]
+                worker.apply_to_company(company)
+                company.accept_applicant(worker)
 
     def _match_worker_to_company(self, worker):
         """労働者と企業のマッチング"""
-        # 応募可能な企業を検索
-        candidate_companies = []
-
-        for company in self.companies:
-            # 採用枠に余裕があるか
-            if not company.can_accept_applicant():
-                continue
-
-            # スキルレベルが適合するか
-            if worker.level - 1 <= company.level:
-                candidate_companies.append(company)
+        # 採用枠に余裕があり、スキルレベルが適合する（通勤圏内の）企業からランダムに選択
+        chosen_company = self.vacancy_index.choose_for(worker)
 
         # マッチングする企業がある場合
-        if candidate_companies:
-            # ランダムに企業を選択
-            chosen_company = random.choice(candidate_companies)
-            chosen_company.accept_applicant(worker)
+        if chosen_company is not None:
+            # 応募（企業は労働者の採用通知日で応募者を並べる）
             worker.apply_to_company(chosen_company)
+            chosen_company.accept_applicant(worker)
 
     def _record_statistics(self):
-        """統計情報の記録"""
-        # 雇用率
-        employed = sum(1 for w in self.workers if w.state == "就職中")
-        employment_rate = employed / len(self.workers)
-
-        # 平均賃金（雇用されている労働者の）
-        employed_workers = [w for w in self.workers if w.state == "就職中"]
-        if employed_workers:
-            total_wage = sum(w.company.wages[w.company.level] for w in employed_workers)
-            average_wage = total_wage / len(employed_workers)
-        else:
-            average_wage = 0
-
-        # 総利益
-        total_profit = sum(c.profit for c in self.companies)
-
-        # マッチング率（求人枠の充足率）
-        total_positions = sum(c.frame for c in self.companies)
-        filled_positions = sum(len(c.employees) for c in self.companies)
-        job_matching_rate = filled_positions / total_positions if total_positions > 0 else 0
-
-        # 離職率（概算）
-        total_workers_employed = sum(len(c.employees) for c in self.companies)
-        if total_workers_employed > 0:
-            # 簡易的な離職率計算
-            turnover_rate = 0.05  # プレースホルダー
-        else:
-            turnover_rate = 0
+        """統計情報の記録（状態集計のカウンタを読むだけで労働者・企業は走査しない）"""
+        tracker = self.tracker
+        tracker.end_day()
 
         # 履歴に記録
         self.history['time'].append(self.time)
-        self.history['employment_rate'].append(employment_rate)
-        self.history['average_wage'].append(average_wage)
-        self.history['total_profit'].append(total_profit)
-        self.history['job_matching_rate'].append(job_matching_rate)
-        self.history['turnover_rate'].append(turnover_rate)
-
-    def run_simulation(self, periods=360):
-        """シミュレーションの実行"""
-        print("レストラン労働力ABMシミュレーション開始...")
-        print(f"労働者: {self.num_workers}人, 企業: {self.num_companies}社")
-        print(f"実行期間: {periods}日")
+        self.history['employment_rate'].append(tracker.employment_rate)
+        self.history['average_wage'].append(tracker.average_wage)
+        self.history['total_profit'].append(tracker.total_profit)
+        self.history['job_matching_rate'].append(tracker.job_matching_rate)
+        # 離職率（直近30日の離職者数 / 雇用者数）
+        self.history['turnover_rate'].append(tracker.turnover_rate)
+
+    def run_simulation(self, periods=360, verbose=True, checkpoint_every=None,
+                       checkpoint_path=None):
+        """
+        シミュレーションの実行
+
+        Args:
+            periods (int): 実行期間（日数）
+            verbose (bool): 開始・進捗・完了のメッセージを表示するか
+            checkpoint_every (int): この日数ごとに checkpoint_path へチェックポイントを書き出す
+            checkpoint_path (str): チェックポイントの出力先（毎回上書きする）
+        """
+        if checkpoint_every is not None and checkpoint_path is None:
+            raise ValueError("checkpoint_every を指定する場合は checkpoint_path も指定してください")
+
+        if verbose:
+            print("レストラン労働力ABMシミュレーション開始...")
+            print(f"労働者: {self.num_workers}人, 企業: {self.num_companies}社")
+            print(f"実行期間: {periods}日")
 
+        run_until = self.time + periods
         for t in range(periods):
             self.step()
+            self._record_panel()
+            if self._profiler is not None:
+                self._profiler.tick(self.time)
 
             # 定期的な進捗表示
-            if (t + 1) % 60 == 0:
+            if verbose and (t + 1) % 60 == 0:
                 self._print_status()
 
-        print("\nシミュレーション完了!")
+            if checkpoint_every is not None and (t + 1) % checkpoint_every == 0:
+                self.save_checkpoint(checkpoint_path, run_until)
+
+        if isinstance(self.history, HistoryStore):
+            self.history.flush()
+        if self.panel is not None:
+            self.panel.flush()
+
+        if verbose:
+            print("\nシミュレーション完了!")
+            if self._profiler is not None and self._profiler.running:
+                print(self._profiler.format_report())
         return self.history
 
+    def record_panel(self, path, every=1, sample=None, sample_seed=None,
+                     buffer_days=DEFAULT_BUFFER_DAYS):
+        """
+        エージェントパネルの記録を開始
+
+        以後の run_simulation では every 日ごとに、選んだ労働者の状態コード・
+        勤務先（応募先）の企業 ID・就職日数を記録します。
+
+        Args:
+            path (str): 出力先のディレクトリ
+            every (int): 記録する間隔（日数）
+            sample (int): 記録する労働者の人数（None の場合は全員）
+            sample_seed (int): 労働者を選ぶ乱数シード（モデルの乱数とは別に使うため結果は変わらない）
+            buffer_days (int): メモリに溜める日数
+
+        Returns:
+            PanelRecorder: 記録
+        """
+        if sample is None:
+            agent_ids = np.arange(self.num_workers)
+        else:
+            picker = np.random.default_rng(sample_seed)
+            agent_ids = np.sort(picker.choice(self.num_workers, sample, replace=False))
+        self.panel = PanelRecorder(path, PANEL_FIELDS, agent_ids, every, buffer_days)
+        self._panel_cache = None
+        return self.panel
+
+    def _record_panel(self):
+        """記録する日ならエージェントパネルに1日分を書き込む"""
+        if self.panel is not None and self.panel.due(self.time):
+            self.panel.record(self.time, self._panel_columns(self.panel.agent_ids))
+
+    def _panel_columns(self, agent_ids):
+        """
+        パネルの項目ごとの値
+
+        全員の属性を毎回読むと遅いため、最初の記録で選んだ労働者の状態・勤務先・就職日を配列に写し、
+        以後は状態集計が集めた状態の変わった労働者の行だけを更新します。
+        """
+        if self._panel_cache is None:
+            workers = [self.workers[i] for i in agent_ids.tolist()]
+            n = len(workers)
+            self._panel_cache = (
+                {worker: row for row, worker in enumerate(workers)},
+                np.empty(n, dtype=np.int8), np.empty(n, dtype=np.int32),
+                np.empty(n, dtype=np.int64))
+            changed = workers
+            self.tracker.changed_workers = set()
+        else:
+            changed = self.tracker.changed_workers
+        rows, state, company, hired_day = self._panel_cache
+
+        for worker in changed:
+            row = rows.get(worker)
+            if row is not None:
+                state[row] = STATE_CODES[worker.state]
+                company[row] = worker.company.id if worker.company is not None else NO_COMPANY
+                hired_day[row] = worker._hired_day
+        self.tracker.changed_workers.clear()
+
+        tenure = np.where(state == EMPLOYED, self.scheduler.now - hired_day, 0)
+        return {"state": state, "company": company, "tenure": tenure}
+
+    def phase(self, name):
+        """ステップのフェーズの計時（with 文で使う、プロファイル中でなければ何もしない）"""
+        profiler = self._profiler
+        if profiler is None or not profiler.running:
+            return NULL_PHASE
+        return profiler.phase(name)
+
+    def start_profiling(self, agent_methods=True, cprofile=False):
+        """
+        フェーズ計時の開始
+
+        以後のステップのフェーズ（マッチング・労働者・企業・統計）と、agent_methods=True の場合は
+        PROFILED_METHODS のエージェントのメソッドごとに経過時間と呼び出し回数を集計します。
+        結果は profile() で、cprofile=True の場合の関数ごとの結果は dump_profile() で取り出します。
+
+        Args:
+            agent_methods (bool): エージェントのメソッドも計時するか
+            cprofile (bool): cProfile でも計測するか
+
+        Returns:
+            Profiler: 計時
+        """
+        self.stop_profiling()
+        # 省メモリのエージェントを使う場合はそのクラスのメソッドを計時する
+        classes = {WorkerAgent: self.worker_class, CompanyAgent: self.company_class}
+        methods = [(classes.get(cls, cls), name) for cls, name in self.PROFILED_METHODS]
+        self._profiler = Profiler(methods if agent_methods else (), cprofile)
+        self._profiler.start()
+        return self._profiler
+
+    def start_memory_profiling(self, snapshot_every=None, top=10, frames=1):
+        """
+        メモリの計測の開始
+
+        以後のステップのフェーズごとのメモリの増減を tracemalloc で計測し、snapshot_every ステップごとと
+        終了時にスナップショットの差分（増えた割り当ての多いソース行）と、エージェントのクラス
+        （WorkerAgent・CompanyAgent）・コンテナ（応募者・従業員のリスト、履歴など）ごとの大きさを記録します。
+        stop_profiling() で終了し、結果は profile() で、表は format_report() で取り出します。
+
+        Args:
+            snapshot_every (int): スナップショットを取る間隔（日数、None の場合は終了時のみ）
+            top (int): スナップショットごとに記録するソース行の数
+            frames (int): tracemalloc が割り当てごとに記録するスタックの深さ
+
+        Returns:
+            MemoryProfiler: 計測
+        """
+        self.stop_profiling()
+        self._profiler = MemoryProfiler(self._memory_accounting, snapshot_every, top, frames)
+        self._profiler.start()
+        return self._profiler
+
+    def _memory_accounting(self):
+        """エージェントのクラスとコンテナごとの大きさ（memory_accounts の形式）"""
+        history = self.history if isinstance(self.history, dict) else self.history.buffers()
+        return memory_accounts([self.workers, self.companies], {
+            "workers": self.workers,
+            "companies": self.companies,
+            "history": history,
+            "scheduler": self.scheduler,
+            "tracker": self.tracker,
+            "vacancy_index": self.vacancy_index,
+            "rng": self.rng,
+            "event_log": self.event_log,
+            "panel": self.panel,
+        })
+
+    def stop_profiling(self):
+        """フェーズ計時の終了（集計結果は profile() で引き続き読める）"""
+        if self._profiler is not None:
+            self._profiler.stop()
+
+    def profile(self):
+        """
+        フェーズ計時の集計結果
+
+        Returns:
+            dict: elapsed・phases・methods（Profiler.report の形式、メモリの計測は MemoryProfiler.report の形式、
+                計時していなければ空の辞書）
+        """
+        return self._profiler.report() if self._profiler is not None else {}
+
+    def dump_profile(self, path):
+        """cProfile の結果を .prof 形式で書き出す（start_profiling(cprofile=True) の場合）"""
+        if self._profiler is None:
+            raise ValueError("start_profiling(cprofile=True) で計時を開始してください")
+        self._profiler.dump_stats(path)
+
+    def record_events(self, path=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        状態遷移のイベントログの記録を開始
+
+        以後の応募・採用・不採用・離職・求職開始を (日, 労働者 ID, 企業 ID, イベント) として記録します。
+        開始時点の全労働者の状態も保存するため、EventLog.state_at で任意の日の状態を復元できます。
+
+        Args:
+            path (str): 書き出すディレクトリ（None の場合はメモリに保持する）
+            chunk_size (int): 1回に書き出すイベント数
+
+        Returns:
+            EventLog: イベントログ
+        """
+        state, company = self._current_states()
+        log = EventLog(state, company, self.time, path, chunk_size)
+        self._attach_event_log(log)
+        return log
+
+    def _current_states(self):
+        """全労働者の (状態コード, 勤務先・応募先の企業 ID)"""
+        return initial_state_of(self.workers)
+
+    def _attach_event_log(self, log):
+        """状態遷移を報告する箇所にイベントログをつなぐ"""
+        self.event_log = log
+        self.tracker.event_log = log
+
+    def set_wage_table(self, wages):
+        """
+        全企業の賃金テーブルを変更（雇用中の労働者の時給も新しいテーブルで数え直す）
+
+        Args:
+            wages (dict): 企業レベル -> 時給
+        """
+        for company in self.companies:
+            company.wages = dict(wages)
+        self.tracker.refresh_wages()
+
+    def set_recruitment_cost(self, cost):
+        """全企業の求人コスト（未充足の求人枠1つあたり）を変更"""
+        for company in self.companies:
+            company.recruitment_cost = cost
+
+    def clone(self):
+        """
+        モデルの複製（オブジェクトを deepcopy せず、チェックポイントの形式をメモリ上で経由する）
+
+        複製は元のモデルと同じ乱数の状態を持ち、同じ操作をすれば同じ結果になります。
+        """
+        buffer = io.BytesIO()
+        self.save_checkpoint(buffer)
+        buffer.seek(0)
+        return type(self).load_checkpoint(buffer)
+
+    def save_checkpoint(self, path, run_until=None):
+        """
+        チェックポイントの書き出し
+
+        エージェント間の参照は ID に置き換え、エージェントの属性・スケジューラのキュー・
+        状態別プール・求人インデックス・乱数生成器の状態を NumPy 配列と JSON にまとめて保存します。
+        リストやヒープの並びもそのまま保存するため、load_checkpoint で戻したモデルは
+        途中で止めなかった場合と全く同じ結果を出します。
+
+        Args:
+            path (str or file): 出力先（npz 形式）
+            run_until (int): 実行中の run_simulation が終わる日（resume で続きを実行する）
+        """
+        arrays = {}
+        meta = {
+            "version": checkpoint.CHECKPOINT_VERSION,
+            "model": type(self).__name__,
+            "num_workers": self.num_workers,
+            "num_companies": self.num_companies,
+            "time": self.time,
+            "run_until": run_until,
+            "width": self.lattice.width,
+            "height": self.lattice.height,
+            "commute_radius": self.commute_radius,
+            "matching": self.matching,
+            "compact_agents": self.compact_agents,
+            "daily_applicants": self.daily_applicants,
+            "rng": checkpoint.dump_rngs(self.rng, self.np_rng, arrays),
+            "history": checkpoint.dump_history(self.history, arrays),
+            "panel": self.panel.dump() if self.panel is not None else None,
+            "event_log": checkpoint.dump_event_log(self.event_log, arrays),
+            "tracker": checkpoint.dump_tracker(self.tracker, arrays),
+            "agents": self._dump_agents(arrays),
+        }
+        checkpoint.write_checkpoint(path, meta, arrays)
+
+    def _dump_agents(self, arrays):
+        """労働者・企業・スケジューラ・求人インデックスの保存"""
+        return {
+            "workers": checkpoint.dump_workers(self.workers, arrays),
+            "companies": checkpoint.dump_companies(self.companies, arrays),
+            "scheduler": checkpoint.dump_scheduler(self.scheduler, arrays),
+            "vacancy_index": checkpoint.dump_vacancy_index(self.vacancy_index, arrays),
+        }
+
+    @classmethod
+    def load_checkpoint(cls, path):
+        """
+        チェックポイントからモデルを復元
+
+        Args:
+            path (str or file): save_checkpoint で書き出したファイル
+
+        Returns:
+            RestaurantLaborModel: 保存時点の状態のモデル
+        """
+        return cls._from_checkpoint(*checkpoint.read_checkpoint(path))
+
+    @classmethod
+    def _from_checkpoint(cls, meta, arrays):
+        """読み込んだチェックポイントからモデルを組み立てる"""
+        if meta["model"] != cls.__name__:
+            raise ValueError(f"{meta['model']} のチェックポイントは {cls.__name__} に読み込めません")
+
+        model = cls.__new__(cls)
+        model.num_workers = meta["num_workers"]
+        model.num_companies = meta["num_companies"]
+        model.time = meta["time"]
+        model.rng, model.np_rng = checkpoint.load_rngs(meta["rng"], arrays)
+        model.lattice = Lattice(meta["width"], meta["height"])
+        model.commute_radius = meta["commute_radius"]
+        model.matching = meta["matching"]
+        model.compact_agents = meta.get("compact_agents", False)
+        model.worker_class, model.company_class = AGENT_CLASSES[model.compact_agents]
+        model.daily_applicants = meta["daily_applicants"]
+        model.history = checkpoint.load_history(meta["history"], arrays)
+        model.scheduler = EventScheduler(model.rng, model.np_rng)
+        model.tracker = checkpoint.new_tracker(meta["tracker"])
+        model.vacancy_index = model._create_vacancy_index()
+        model._load_agents(meta, arrays)
+        model.panel = checkpoint.load_panel(meta.get("panel"))
+        model._panel_cache = None
+        model.event_log = None
+        model._profiler = None
+        event_log = checkpoint.load_event_log(meta.get("event_log"), arrays)
+        if event_log is not None:
+            model._attach_event_log(event_log)
+        return model
+
+    def _load_agents(self, meta, arrays):
+        """_dump_agents の逆（状態集計も労働者の参照を使うためここで戻す）"""
+        agents = meta["agents"]
+        self.workers = checkpoint.load_workers(agents["workers"], arrays, self.scheduler,
+                                               self.tracker, self.rng, self.worker_class)
+        checkpoint.load_tracker(meta["tracker"], arrays, self.tracker, self.workers)
+        self.companies = checkpoint.load_companies(agents["companies"], arrays, self.workers,
+                                                   self.vacancy_index, self.tracker, self.rng,
+                                                   self.company_class)
+        checkpoint.load_scheduler(agents["scheduler"], arrays, self.scheduler, self.workers)
+        checkpoint.load_vacancy_index(agents["vacancy_index"], arrays, self.vacancy_index,
+                                      self.companies)
+
+    @classmethod
+    def resume(cls, path, verbose=True, checkpoint_every=None):
+        """
+        チェックポイントから中断した run_simulation の続きを実行
+
+        Args:
+            path (str): チェックポイントのファイル（続きのチェックポイントも同じ場所に書く）
+            verbose (bool): 進捗を表示するか
+            checkpoint_every (int): 続きの実行でチェックポイントを書き出す間隔（日数）
+
+        Returns:
+            RestaurantLaborModel: 実行を終えたモデル
+        """
+        meta, arrays = checkpoint.read_checkpoint(path)
+        model = cls._from_checkpoint(meta, arrays)
+        remaining = max(0, (meta["run_until"] or model.time) - model.time)
+        model.run_simulation(remaining, verbose=verbose, checkpoint_every=checkpoint_every,
+                             checkpoint_path=path)
+        return model
+
     def _print_status(self):
         """現在の状況を表示"""
-        employed = sum(1 for w in self.workers if w.state == "就職中")
-        unemployed = sum(1 for w in self.workers if w.state == "未就職")
-        job_seeking = sum(1 for w in self.workers if w.state == "求職中")
-        waiting = sum(1 for w in self.workers if w.state == "結果待ち")
+        tracker = self.tracker
+        employed = tracker.count("就職中")
+        unemployed = tracker.count("未就職")
+        job_seeking = tracker.count("求職中")
+        waiting = tracker.count("結果待ち")
 
         print(f"\n=== 期間 {self.time} ===")
         print(f"就職中: {employed}, 未就職: {unemployed}, 求職中: {job_seeking}, 結果待ち: {waiting}")
         print(f"雇用率: {employed/len(self.workers)*100:.1f}%")
+        print(f"企業総利益: {tracker.total_profit:,.0f}円")
+
+    def plot_results(self, path=None):
+        """
+        結果をグラフで表示
+
+        matplotlib はグラフを描くときに初めて読み込みます（描画しない実行の起動を速くするため）。
 
-        total_profit = sum(c.profit for c in self.companies)
-        print(f"企業総利益: {total_profit:,.0f}円")
+        Args:
+            path (str): 画像の保存先（省略時は画面に表示する）
+        """
+        import matplotlib.pyplot as plt
 
-    def plot_results(self):
-        """結果をグラフで表示"""
         fig, axes = plt.subplots(2, 3, figsize=(18, 10))
         fig.suptitle('Restaurant Labor ABM Simulation Results', fontsize=16)
 
@@ -233,27 +680,39 @@ class RestaurantLaborModel:
         axes[1, 0].grid(True)
 
         # 労働者タイプ別分布
-        type_counts = defaultdict(int)
-        for worker in self.workers:
-            type_counts[worker.type] += 1
-
+        type_counts = self._worker_type_counts()
         axes[1, 1].bar(type_counts.keys(), type_counts.values())
         axes[1, 1].set_title('Worker Type Distribution')
         axes[1, 1].set_xlabel('Worker Type')
         axes[1, 1].set_ylabel('Count')
 
         # 企業レベル別分布
-        level_counts = defaultdict(int)
-        for company in self.companies:
-            level_counts[company.level] += 1
-
+        level_counts = self._company_level_counts()
         axes[1, 2].bar(level_counts.keys(), level_counts.values())
         axes[1, 2].set_title('Company Level Distribution')
         axes[1, 2].set_xlabel('Company Level')
         axes[1, 2].set_ylabel('Count')
 
         plt.tight_layout()
-        plt.show()
+        if path is None:
+            plt.show()
+        else:
+            fig.savefig(path)
+            plt.close(fig)
+
+    def _worker_type_counts(self):
+        """労働者タイプ別の人数"""
+        type_counts = defaultdict(int)
+        for worker in self.workers:
+            type_counts[worker.type] += 1
+        return type_counts
+
+    def _company_level_counts(self):
+        """企業レベル別の社数"""
+        level_counts = defaultdict(int)
+        for company in self.companies:
+            level_counts[company.level] += 1
+        return level_counts
 
     def get_summary_statistics(self):
         """サマリー統計の取得"""
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+シナリオ分岐
+助走期間を1回だけ実行したモデルから複数の政策シナリオを分岐させ、並列に実行する
+
+使い方:
+    model = RestaurantLaborModel(num_workers=3600, num_companies=100, seed=0)
+    model.run_simulation(180, verbose=False)  # 助走期間
+    results = run_scenarios(model, {
+        "baseline": None,
+        "wage_up": {"wages": {1: 1080, 2: 1180, 3: 1280, 4: 1380, 5: 1480, 6: 1580}},
+        "cheap_recruiting": {"recruitment_cost": 1500},
+    }, periods=180)
+"""
+import io
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+import time
+import traceback
+
+from abm_common.history_store import HistoryStore
+
+# 分岐元のモデル（fork 方式では子プロセスがコピーオンライトで引き継ぐ）
+_BRANCH_MODEL = None
+_BRANCH_SCENARIOS = None
+
+
+def apply_policy(model, wages=None, recruitment_cost=None):
+    """
+    モデルに政策を適用
+
+    Args:
+        model (RestaurantLaborModel): 適用先のモデル
+        wages (dict): 企業レベル -> 時給（全企業の賃金テーブルを置き換える）
+        recruitment_cost (float): 未充足の求人枠1つあたりの求人コスト
+    """
+    if wages is not None:
+        model.set_wage_table({int(level): wage for level, wage in wages.items()})
+    if recruitment_cost is not None:
+        model.set_recruitment_cost(recruitment_cost)
+
+
+def run_branch(model, name, scenario, periods):
+    """
+    分岐した1つのシナリオの実行
+
+    例外は呼び出し元に投げず、status="error" の結果として返します。
+
+    Args:
+        model (RestaurantLaborModel): 分岐したモデル（このシナリオ専用のもの）
+        name (str): シナリオ名
+        scenario (dict or callable): apply_policy の引数の辞書、
+            またはモデルを受け取って変更する関数（None は変更なし）
+        periods (int): 分岐後の実行期間
+
+    Returns:
+        dict: name, branch_time, periods, status, summary, history, error, elapsed
+    """
+    result = {"name": name, "branch_time": model.time, "periods": periods,
+              "status": "ok", "summary": {}, "history": {}, "error": None}
+    start = time.perf_counter()
+    try:
+        if callable(scenario):
+            scenario(model)
+        elif scenario is not None:
+            apply_policy(model, **scenario)
+        result["history"] = model.run_simulation(periods=periods, verbose=False)
+        result["summary"] = model.get_summary_statistics()
+    except Exception:
+        result["status"] = "error"
+        result["error"] = traceback.format_exc()
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def _run_forked_branch(sender, name, periods):
+    """fork 方式の子プロセスでの実行（モデルはフォーク時点のコピー）"""
+    _send_result(sender, run_branch(_BRANCH_MODEL, name, _BRANCH_SCENARIOS[name], periods))
+
+
+def _run_cloned_branch(sender, snapshot, model_class, name, scenario, periods):
+    """clone 方式の子プロセスでの実行（チェックポイントから復元する）"""
+    model = model_class.load_checkpoint(io.BytesIO(snapshot))
+    _send_result(sender, run_branch(model, name, scenario, periods))
+
+
+def _send_result(sender, result):
+    """子プロセスからパイプで結果を返す（送れない場合はエラーの結果を返す）"""
+    try:
+        sender.send(result)
+    except Exception:
+        sender.send({**result, "status": "error", "summary": {}, "history": {},
+                     "error": traceback.format_exc()})
+    sender.close()
+
+
+def _run_branch_processes(context, tasks, processes, on_result, on_failure):
+    """
+    シナリオごとに子プロセスを作って実行（同時に動かすのは processes 個まで）
+
+    結果は子プロセスからパイプで受け取ります。子プロセスが結果を返さずに終了した場合
+    （メモリ不足で強制終了された場合など）や終了コードが 0 でない場合は、そのシナリオだけを失敗とします。
+
+    Args:
+        context: multiprocessing のコンテキスト
+        tasks (list): (シナリオ名, 子プロセスで実行する関数, 関数の引数) のリスト
+            （関数は引数の前に結果の送信側を受け取る）
+        processes (int): 同時に動かす子プロセスの数
+        on_result (callable): on_result(シナリオ名, 結果)
+        on_failure (callable): on_failure(シナリオ名, エラーの文字列) -> 失敗の結果
+    """
+    queue = iter(tasks)
+    running = {}  # 結果の受信側 -> (シナリオ名, 子プロセス)
+
+    def start_next():
+        task = next(queue, None)
+        if task is None:
+            return
+        name, target, args = task
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=target, args=(sender, *args), daemon=True)
+        try:
+            process.start()
+        except Exception:
+            # シナリオの関数を子プロセスに送れない場合など
+            receiver.close()
+            on_result(name, on_failure(name, traceback.format_exc()))
+            start_next()
+            return
+        finally:
+            sender.close()  # 子プロセスが終了すれば受信側で EOF になるように
+        running[receiver] = (name, process)
+
+    for _ in range(processes):
+        start_next()
+
+    while running:
+        for receiver in multiprocessing.connection.wait(list(running)):
+            name, process = running.pop(receiver)
+            try:
+                result = receiver.recv()
+            except EOFError:
+                result = None
+            receiver.close()
+            process.join()
+            if result is None or process.exitcode != 0:
+                result = on_failure(name, f"子プロセスが終了コード {process.exitcode} で"
+                                          f"異常終了しました")
+            on_result(name, result)
+            start_next()
+
+
+def fork_available():
+    """fork による子プロセスの作成が使えるか"""
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def run_scenarios(model, scenarios, periods, processes=None, method=None, progress=True):
+    """
+    助走済みのモデルから複数のシナリオを分岐させて並列に実行
+
+    全てのシナリオは分岐時点の同じ状態（乱数の状態を含む）から始まるため、
+    シナリオ間の差は政策の違いによるものだけになります（共通乱数）。
+    分岐元のモデルは変更されません。子プロセスが異常終了したシナリオは status="error" として記録し、
+    残りのシナリオは続けます。
+
+    分岐の方法:
+        "fork": シナリオごとに新しい子プロセスをフォークし、分岐元のモデルを
+            コピーオンライトで引き継ぐ（コピーは子プロセスが書き換えたページ分だけ）
+        "clone": 分岐元のモデルをメモリ上のチェックポイントにしてシナリオごとの子プロセスに送り、
+            子プロセスで復元する（fork が使えない環境用）
+
+    Args:
+        model (RestaurantLaborModel): 助走期間を実行したモデル
+        scenarios (dict): シナリオ名 -> apply_policy の引数の辞書、
+            またはモデルを受け取って変更する関数（None は変更なし）
+        periods (int): 分岐後の実行期間
+        processes (int): プロセス数（省略時は CPU コア数）
+        method (str): 分岐の方法（"fork" または "clone"、省略時は fork が使えれば fork）
+        progress (bool): 進捗を標準エラー出力に表示するか
+
+    Returns:
+        dict: シナリオ名 -> run_branch の結果（scenarios の順）
+    """
+    global _BRANCH_MODEL, _BRANCH_SCENARIOS
+    if (isinstance(model.history, HistoryStore) or model.panel is not None
+            or (model.event_log is not None and model.event_log.path is not None)):
+        # 全てのシナリオが同じ列ファイルに書き込んでしまうため
+        raise ValueError("履歴・パネルをディスクに書き出すモデルからはシナリオを分岐できません")
+    if method is None:
+        method = "fork" if fork_available() else "clone"
+    if method not in ("fork", "clone"):
+        raise ValueError(f"未対応の分岐の方法です: {method}")
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, min(processes, len(scenarios)))
+
+    names = list(scenarios)
+    results = {}
+    failures = 0
+    start = time.perf_counter()
+
+    def record(name, result):
+        nonlocal failures
+        results[name] = result
+        if result["status"] != "ok":
+            failures += 1
+        if progress:
+            print(f"[{len(results)}/{len(names)}] {result['status']:5s} {name} "
+                  f"({result['elapsed']:.1f}s, 経過 {time.perf_counter() - start:.1f}s, "
+                  f"失敗 {failures})", file=sys.stderr)
+
+    def failed(name, error):
+        return _failed_branch(model, name, periods, error)
+
+    if method == "fork":
+        # シナリオごとに子プロセスをフォークし、各シナリオが前のシナリオに書き換えられていない
+        # 分岐元のモデルから始まるようにする
+        _BRANCH_MODEL, _BRANCH_SCENARIOS = model, scenarios
+        try:
+            tasks = [(name, _run_forked_branch, (name, periods)) for name in names]
+            _run_branch_processes(multiprocessing.get_context("fork"), tasks, processes,
+                                  record, failed)
+        finally:
+            _BRANCH_MODEL, _BRANCH_SCENARIOS = None, None
+    else:
+        buffer = io.BytesIO()
+        model.save_checkpoint(buffer)
+        snapshot = buffer.getvalue()
+        tasks = [(name, _run_cloned_branch,
+                  (snapshot, type(model), name, scenarios[name], periods)) for name in names]
+        _run_branch_processes(multiprocessing.get_context(), tasks, processes, record, failed)
+
+    return {name: results[name] for name in names}
+
+
+def _failed_branch(model, name, periods, error):
+    """子プロセスから結果を受け取れなかったシナリオの結果"""
+    return {"name": name, "branch_time": model.time, "periods": periods, "status": "error",
+            "summary": {}, "history": {}, "error": error, "elapsed": 0.0}
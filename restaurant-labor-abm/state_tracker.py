@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+状態集計
+労働者の状態遷移と企業の利益の変化のたびに更新されるカウンタ
+"""
+from collections import deque
+
+
+class RollingWindow:
+    """直近 size 日分の日次の値の合計を O(1) で保持する"""
+
+    def __init__(self, size=30):
+        self.values = deque(maxlen=size)
+        self.total = 0
+
+    def push(self, value):
+        """1日分の値を追加（古い値は合計から除く）"""
+        if len(self.values) == self.values.maxlen:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+
+class StateTracker:
+    """
+    状態集計 - 状態遷移のたびにカウンタを更新する
+
+    WorkerAgent は状態が変わるたびに on_transition() を、
+    CompanyAgent は経営指標を計算するたびに update_profit() を呼びます。
+    統計の記録は全労働者・全企業を走査せず、状態別人数・雇用者の平均賃金・
+    求人枠の充足率・総利益・直近30日の離職率を O(1) で読み出せます。
+
+    労働者は状態別のプール（リスト）にも保持され、状態が変わると
+    末尾の要素との入れ替えで O(1) で移動します。応募者の抽出は
+    全労働者ではなくプールから行えます。
+    """
+
+    def __init__(self, turnover_window=30):
+        """
+        Args:
+            turnover_window (int): 離職率を計算する期間（日数）
+        """
+        self.pools = {}               # 状態 -> その状態の労働者のリスト
+        self._position = {}           # 労働者 -> プール内の位置
+        self.num_workers = 0
+        self.total_wage = 0           # 雇用者の時給の合計
+        self._wages = {}              # 雇用者 -> 採用時の時給
+
+        # 企業
+        self.total_positions = 0      # 求人枠の合計
+        self.total_profit = 0.0       # 企業の利益の合計
+
+        # その日の遷移数
+        self.applications_today = 0
+        self.hires_today = 0
+        self.rejections_today = 0
+        self.separations_today = 0
+
+        # 累計
+        self.total_hires = 0
+        self.total_separations = 0
+
+        # 直近の離職者数
+        self.separations = RollingWindow(turnover_window)
+
+        # 状態が変わった労働者（集合を入れた場合のみ集める、エージェントパネルが使う）
+        self.changed_workers = None
+
+        # 状態遷移を記録するイベントログ（省略可）
+        self.event_log = None
+
+    def add_worker(self, worker):
+        """労働者を集計対象に加える"""
+        self.num_workers += 1
+        self._add_to_pool(worker, worker.state)
+        if worker.state == "就職中":
+            self._add_wage(worker)
+
+    def add_company(self, company):
+        """企業を集計対象に加える"""
+        self.total_positions += company.frame
+        self.total_profit += company.profit
+
+    def update_profit(self, old_profit, new_profit):
+        """企業の利益の変化を反映"""
+        self.total_profit += new_profit - old_profit
+
+    def count(self, state):
+        """指定した状態の人数"""
+        return len(self.pools.get(state, ()))
+
+    def pool(self, state):
+        """指定した状態の労働者のリスト（順序は不定、呼び出し側で変更しないこと）"""
+        return self.pools.setdefault(state, [])
+
+    def on_transition(self, worker, old_state, new_state):
+        """
+        状態遷移の反映
+
+        worker.company は応募・採用では新しい企業、不採用・離職では外れる前の企業のまま呼ばれます。
+
+        Args:
+            worker (WorkerAgent): 状態が変わる労働者
+            old_state (str): 遷移前の状態
+            new_state (str): 遷移後の状態
+        """
+        self._remove_from_pool(worker, old_state)
+        self._add_to_pool(worker, new_state)
+        if self.changed_workers is not None:
+            self.changed_workers.add(worker)
+        if self.event_log is not None:
+            self.event_log.on_transition(worker, old_state, new_state)
+
+        if new_state == "結果待ち":
+            self.applications_today += 1
+        elif new_state == "就職中":
+            self.hires_today += 1
+            self.total_hires += 1
+            self._add_wage(worker)
+        elif old_state == "就職中":
+            self.separations_today += 1
+            self.total_separations += 1
+            self.total_wage -= self._wages.pop(worker)
+        elif old_state == "結果待ち" and new_state == "情報収集中":
+            self.rejections_today += 1
+
+    def _add_to_pool(self, worker, state):
+        pool = self.pools.setdefault(state, [])
+        self._position[worker] = len(pool)
+        pool.append(worker)
+
+    def _remove_from_pool(self, worker, state):
+        """末尾の労働者を空いた位置に移して O(1) で取り除く"""
+        pool = self.pools[state]
+        index = self._position.pop(worker)
+        last = pool.pop()
+        if last is not worker:
+            pool[index] = last
+            self._position[last] = index
+
+    def refresh_wages(self):
+        """雇用者の時給を勤務先の現在の賃金テーブルで数え直す（賃金テーブルの変更後に呼ぶ）"""
+        self.total_wage = 0
+        for worker in self._wages:
+            wage = worker.company.wages[worker.company.level]
+            self._wages[worker] = wage
+            self.total_wage += wage
+
+    def _add_wage(self, worker):
+        wage = worker.company.wages[worker.company.level]
+        self._wages[worker] = wage
+        self.total_wage += wage
+
+    def end_day(self):
+        """その日の集計を締め、日次の遷移数をリセット"""
+        self.separations.push(self.separations_today)
+        self.applications_today = 0
+        self.hires_today = 0
+        self.rejections_today = 0
+        self.separations_today = 0
+
+    @property
+    def num_employed(self):
+        return self.count("就職中")
+
+    @property
+    def employment_rate(self):
+        """雇用率"""
+        return self.num_employed / self.num_workers if self.num_workers > 0 else 0
+
+    @property
+    def average_wage(self):
+        """雇用されている労働者の平均時給"""
+        employed = self.num_employed
+        return self.total_wage / employed if employed > 0 else 0
+
+    @property
+    def job_matching_rate(self):
+        """求人枠の充足率（雇用者はいずれかの企業の求人枠を1つ埋めている）"""
+        if self.total_positions == 0:
+            return 0
+        return self.num_employed / self.total_positions
+
+    @property
+    def turnover_rate(self):
+        """離職率（直近の期間の離職者数 / 現在の雇用者数）"""
+        employed = self.num_employed
+        return self.separations.total / employed if employed > 0 else 0
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+離職判定
+離職率テーブル（タイプ × 在職月数）と、同じコホートの離職者をまとめて抽選する処理
+"""
+import random
+import numpy as np
+from collections import defaultdict
+
+# 離職率（タイプ別・就職日数別の月次離職率）
+TURNOVER_RATES = {
+    "freeter": {30: 0.05, 60: 0.04, 90: 0.04, 120: 0.03, 150: 0.02,
+               180: 0.02, 210: 0.03, 240: 0.03, 270: 0.03, 300: 0.03,
+               330: 0.03, 360: 0.03},
+    "student": {30: 0.13, 60: 0.06, 90: 0.05, 120: 0.05, 150: 0.05,
+               180: 0.05, 210: 0.05, 240: 0.04, 270: 0.04, 300: 0.04,
+               330: 0.04, 360: 0.04},
+    "housewife": {30: 0.03, 60: 0.02, 90: 0.02, 120: 0.02, 150: 0.02,
+                 180: 0.02, 210: 0.02, 240: 0.02, 270: 0.02, 300: 0.02,
+                 330: 0.02, 360: 0.02},
+    "foreigner": {30: 0.10, 60: 0.05, 90: 0.05, 120: 0.04, 150: 0.03,
+                 180: 0.02, 210: 0.02, 240: 0.02, 270: 0.01, 300: 0.01,
+                 330: 0.01, 360: 0.01}
+}
+
+# テーブルの行の並び（労働者タイプ）
+TURNOVER_TYPES = tuple(TURNOVER_RATES)
+TURNOVER_TYPE_INDEX = {name: index for index, name in enumerate(TURNOVER_TYPES)}
+
+DEFAULT_TURNOVER_RATE = 0.01  # 表にないタイプ・就職日数の離職率
+
+
+def _build_turnover_table():
+    """離職率テーブル（タイプ × 在職月数）。31日目以降の30日ごとの判定に使う"""
+    max_month = max(max(rates) for rates in TURNOVER_RATES.values()) // 30
+    table = np.full((len(TURNOVER_TYPES), max_month + 2), DEFAULT_TURNOVER_RATE)
+    for name, rates in TURNOVER_RATES.items():
+        for work_days, rate in rates.items():
+            table[TURNOVER_TYPE_INDEX[name], work_days // 30] = rate
+    return table
+
+
+# TURNOVER_TABLE[タイプ, 就職日数 // 30]（最終列は表にない就職日数の既定値）
+TURNOVER_TABLE = _build_turnover_table()
+MAX_TURNOVER_MONTH = TURNOVER_TABLE.shape[1] - 1
+
+
+def turnover_rate(worker_type, work_days):
+    """
+    離職率を取得
+
+    Args:
+        worker_type (str): 労働者タイプ
+        work_days (int): 就職日数（30の倍数）
+    """
+    if worker_type not in TURNOVER_TYPE_INDEX or work_days % 30 != 0:
+        return DEFAULT_TURNOVER_RATE
+    month = min(work_days // 30, MAX_TURNOVER_MONTH)
+    return float(TURNOVER_TABLE[TURNOVER_TYPE_INDEX[worker_type], month])
+
+
+def process_turnover_checks(workers, rng=random, np_rng=None):
+    """
+    その日に離職判定を迎えた労働者をコホート（タイプ × 就職日数）ごとにまとめて判定
+
+    コホートごとに離職者数を二項分布から1回だけ抽選し、その人数をコホートから
+    一様に選ぶため、1人ずつ乱数を引く場合と同じ離職率になります。
+    離職しなかった労働者には次の離職判定を登録します。
+
+    Args:
+        workers (list): 離職判定を迎えた就職中の労働者
+        rng (random.Random): 離職者の選択に使う乱数生成器
+        np_rng (numpy.random.Generator): 離職者数の抽選に使う乱数生成器（省略時は新しく作る）
+    """
+    if np_rng is None:
+        np_rng = np.random.default_rng()
+
+    cohorts = defaultdict(list)
+    for worker in workers:
+        cohorts[(worker.type, worker.work_days)].append(worker)
+
+    for (worker_type, work_days), members in cohorts.items():
+        rate = turnover_rate(worker_type, work_days)
+        num_quits = int(np_rng.binomial(len(members), rate))
+        quitters = set(rng.sample(members, num_quits)) if num_quits else ()
+
+        for worker in members:
+            if worker in quitters:
+                worker.quit_job()
+            else:
+                worker.schedule_turnover_check()
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+求人インデックス
+空き枠のある企業をレベル別に保持し、応募先の候補を全企業を走査せずに選ぶ
+"""
+import random
+
+
+class VacancyIndex:
+    """
+    求人インデックス - 空き枠のある企業をレベル別のバケットで保持する
+
+    企業は空き枠の有無が変わるたびに update() で自分を登録・削除します。
+    バケットは末尾との入れ替えで O(1) 削除できる配列で、
+    応募可能な企業からの一様な抽選はレベル数に比例する時間で行えます。
+    """
+
+    def __init__(self, companies=(), rng=None):
+        """
+        Args:
+            companies (iterable): 最初に登録する企業
+            rng (random.Random): 抽選に使う乱数生成器（省略時は random モジュール）
+        """
+        self.rng = rng if rng is not None else random
+        self._buckets = {}    # レベル -> 空き枠のある企業のリスト
+        self._position = {}   # 企業 -> バケット内の位置
+        for company in companies:
+            self.update(company)
+
+    def __len__(self):
+        return len(self._position)
+
+    def __contains__(self, company):
+        return company in self._position
+
+    def companies(self):
+        """空き枠のある企業の一覧"""
+        return list(self._position)
+
+    def _key(self, company):
+        """企業のバケットのキー"""
+        return company.level
+
+    def _eligible_keys(self, worker):
+        """労働者が応募できるバケットのキー（スキルレベルの適合条件）"""
+        return [level for level in self._buckets if worker.level - 1 <= level]
+
+    def _has_vacancy(self, company):
+        """企業に空き枠があるか"""
+        return company.can_accept_applicant()
+
+    def update(self, company):
+        """企業の空き枠の変化を反映（空き枠があれば登録、なければ削除）"""
+        registered = company in self._position
+        if self._has_vacancy(company):
+            if not registered:
+                bucket = self._buckets.setdefault(self._key(company), [])
+                self._position[company] = len(bucket)
+                bucket.append(company)
+        elif registered:
+            self._remove(company)
+
+    def _remove(self, company):
+        """バケットから削除（末尾の企業と入れ替える）"""
+        bucket = self._buckets[self._key(company)]
+        index = self._position.pop(company)
+        last = bucket.pop()
+        if last is not company:
+            bucket[index] = last
+            self._position[last] = index
+
+    def eligible_count(self, worker):
+        """労働者が応募できる企業の数"""
+        return sum(len(self._buckets[key]) for key in self._eligible_keys(worker))
+
+    def choose_for(self, worker):
+        """
+        労働者が応募できる企業から一様に1社を選ぶ
+
+        Returns:
+            CompanyAgent: 選ばれた企業（候補がなければ None）
+        """
+        buckets = [self._buckets[key] for key in self._eligible_keys(worker)]
+        total = sum(len(bucket) for bucket in buckets)
+        if total == 0:
+            return None
+
+        r = int(self.rng.random() * total)
+        for bucket in buckets:
+            if r < len(bucket):
+                return bucket[r]
+            r -= len(bucket)
+        return buckets[-1][-1]  # 丸め誤差へのフォールバック
+
+
+class SpatialVacancyIndex(VacancyIndex):
+    """
+    空間求人インデックス - 空き枠のある企業をセル×レベルのバケットで保持する
+
+    労働者は通勤圏（自分の位置からマンハッタン距離 commute_radius 以内）の
+    セルのバケットだけを調べるため、企業数ではなく通勤圏のセル数に比例する時間で選べます。
+    """
+
+    def __init__(self, lattice, commute_radius, companies=(), rng=None):
+        """
+        Args:
+            lattice (Lattice): 格子空間
+            commute_radius (int): 通勤圏の半径（マンハッタン距離）
+            companies (iterable): 最初に登録する企業
+            rng (random.Random): 抽選に使う乱数生成器（省略時は random モジュール）
+        """
+        self.lattice = lattice
+        self.commute_radius = commute_radius
+        self._levels = set()  # 登録されたことのある企業レベル
+        super().__init__(companies, rng)
+
+    def _key(self, company):
+        self._levels.add(company.level)
+        return (company.x, company.y, company.level)
+
+    def _eligible_keys(self, worker):
+        levels = [level for level in self._levels if worker.level - 1 <= level]
+        keys = []
+        for cx, cy in self.lattice.cells_within(worker.x, worker.y, self.commute_radius):
+            for level in levels:
+                key = (cx, cy, level)
+                if key in self._buckets:
+                    keys.append(key)
+        return keys
+
+
+class ArrayVacancyIndex(VacancyIndex):
+    """
+    配列版の求人インデックス - 企業表（CompanyTable）の行番号をレベル別のバケットで保持する
+
+    企業ごとの残り枠のリストを持ち、take_slot() で1つ減らして枠がなくなった企業を外します。
+    労働者は WorkerPopulation の行番号で指定します。
+    """
+
+    def __init__(self, companies, workers, open_slots, rng=None):
+        """
+        Args:
+            companies (CompanyTable): 企業表
+            workers (WorkerPopulation): 労働者集団
+            open_slots (list): 企業ごとの応募受付可能な残り枠（take_slot で減らす）
+            rng: 抽選に使う乱数生成器（random() を持つもの、省略時は random モジュール）
+        """
+        self.workers = workers
+        self.open_slots = open_slots
+        self._level = companies.level.tolist()
+        super().__init__([c for c, slots in enumerate(open_slots) if slots > 0], rng)
+
+    def _has_vacancy(self, company):
+        return self.open_slots[company] > 0
+
+    def _key(self, company):
+        return self._level[company]
+
+    def _eligible_keys(self, worker):
+        min_level = self.workers.level[worker] - 1
+        return [level for level in self._buckets if min_level <= level]
+
+    def take_slot(self, company):
+        """企業の残り枠を1つ使う（枠がなくなればバケットから外す）"""
+        self.open_slots[company] -= 1
+        self.update(company)
+
+
+class SpatialArrayVacancyIndex(ArrayVacancyIndex):
+    """
+    配列版の空間求人インデックス - 企業表の行番号をセル×レベルのバケットで保持する
+
+    SpatialVacancyIndex と同じく、労働者の通勤圏のセルのバケットだけを調べます。
+    """
+
+    def __init__(self, companies, workers, open_slots, lattice, commute_radius, rng=None):
+        """
+        Args:
+            companies (CompanyTable): 企業表
+            workers (WorkerPopulation): 労働者集団
+            open_slots (list): 企業ごとの応募受付可能な残り枠（take_slot で減らす）
+            lattice (Lattice): 格子空間
+            commute_radius (int): 通勤圏の半径（マンハッタン距離）
+            rng: 抽選に使う乱数生成器（random() を持つもの、省略時は random モジュール）
+        """
+        self.lattice = lattice
+        self.commute_radius = commute_radius
+        self._x = companies.x.tolist()
+        self._y = companies.y.tolist()
+        self._levels = sorted(set(companies.level.tolist()))
+        super().__init__(companies, workers, open_slots, rng)
+
+    def _key(self, company):
+        return (self._x[company], self._y[company], self._level[company])
+
+    def _eligible_keys(self, worker):
+        workers = self.workers
+        min_level = workers.level[worker] - 1
+        levels = [level for level in self._levels if min_level <= level]
+        keys = []
+        for cx, cy in self.lattice.cells_within(int(workers.x[worker]), int(workers.y[worker]),
+                                                self.commute_radius):
+            for level in levels:
+                key = (cx, cy, level)
+                if key in self._buckets:
+                    keys.append(key)
+        return keys
@@ -4,121 +4,169 @@
 Restaurant Labor ABMシミュレーションの労働者エージェント実装
 """
 import random
+from event_scheduler import EventScheduler, TURNOVER_CHECK, GATHERING_END
+from lattice import Lattice
+from turnover import turnover_rate
+
+# タイプ別のレベル（スキル）範囲
+LEVEL_RANGES = {
+    "freeter": (2, 6),
+    "student": (3, 5),
+    "housewife": (2, 5),
+    "foreigner": (1, 3)
+}
 
 class WorkerAgent:
-    """労働者エージェント - 求職・就職活動を行う"""
+    """労働者エージェント - 求職・就職活動を行う
 
-    def __init__(self, agent_id, worker_type):
+    日数カウンタ（elapsed_days, work_days, wait_days）は毎日加算せず、
+    状態が変わった日とスケジューラの現在日から計算します。
+    離職判定と情報収集期間の終了はスケジューラのイベントとして処理されます。
+    """
+
+    # インスタンスの属性（省メモリのクラスの __slots__。属性を追加したらここにも加える）
+    FIELDS = ("id", "type", "rng", "scheduler", "level", "state", "company", "epoch",
+              "_elapsed_since", "_hired_day", "_notify_day", "x", "y", "tracker")
+
+    def __init__(self, agent_id, worker_type, scheduler=None, lattice=None, tracker=None,
+                 rng=None):
         """
         労働者エージェントの初期化
 
         Args:
             agent_id (int): エージェントの一意識別子
             worker_type (str): 労働者タイプ（freeter, student, housewife, foreigner）
+            scheduler (EventScheduler): 共有スケジューラ（省略時はこの労働者専用のものを作る）
+            lattice (Lattice): 配置する格子空間（省略時は5x5）
+            tracker (StateTracker): 状態遷移を報告する状態集計（省略可）
+            rng (random.Random): モデルの乱数生成器（省略時は random モジュール）
         """
         self.id = agent_id
         self.type = worker_type
+        self.rng = rng if rng is not None else random
+        self.scheduler = scheduler if scheduler is not None else EventScheduler(self.rng)
 
         # タイプに応じたレベル（スキル）設定
-        if self.type == "freeter":
-            self.level = random.randint(2, 6)
-        elif self.type == "student":
-            self.level = random.randint(3, 5)
-        elif self.type == "housewife":
-            self.level = random.randint(2, 5)
-        elif self.type == "foreigner":
-            self.level = random.randint(1, 3)
+        if self.type in LEVEL_RANGES:
+            self.level = self.rng.randint(*LEVEL_RANGES[self.type])
         else:
             self.level = 3  # デフォルト
 
         # 状態変数
         self.state = "未就職"  # 未就職, 求職中, 結果待ち, 就職中, 情報収集中
         self.company = None   # 勤務先企業
-        self.elapsed_days = 0 # 離職/求職日数
-        self.work_days = 0    # 就職日数
-        self.wait_days = 0    # 採用通知待ち日数
+        self.epoch = 0        # 状態の世代（古いイベントの無効化に使う）
+
+        # 日数カウンタの基準日
+        now = self.scheduler.now
+        self._elapsed_since = now  # 離職/求職日数の起点
+        self._hired_day = now      # 就職日
+        self._notify_day = now     # 採用通知日
+
+        # 位置（格子上の位置）
+        self.x, self.y = (lattice or Lattice()).random_position(self.rng)
+
+        # 状態集計への登録
+        self.tracker = tracker
+        if tracker is not None:
+            tracker.add_worker(self)
+
+    @property
+    def elapsed_days(self):
+        """離職/求職日数"""
+        if self.state == "就職中":
+            return 0
+        return self.scheduler.now - self._elapsed_since
+
+    @property
+    def work_days(self):
+        """就職日数"""
+        if self.state != "就職中":
+            return 0
+        return self.scheduler.now - self._hired_day
+
+    @property
+    def wait_days(self):
+        """採用通知待ち日数"""
+        if self.state != "結果待ち":
+            return 0
+        return max(0, self._notify_day - self.scheduler.now)
 
-        # 位置（5x5格子上の位置）
-        self.x = random.randint(0, 4)
-        self.y = random.randint(0, 4)
+    @property
+    def notify_day(self):
+        """採用通知日（スケジューラの日付）"""
+        return self._notify_day
 
     def step(self):
-        """労働者の1ステップの行動"""
-        # 就職中で30日経過ごとに離職判定
-        if (self.state == "就職中" and
-            self.work_days > 0 and
-            self.work_days % 30 == 0):
+        """労働者の1ステップの行動（専用スケジューラを1日進める）
 
-            turnover_rate = self.get_turnover_rate()
-            if random.random() < turnover_rate:
-                self.quit_job()
+        共有スケジューラを使う場合はモデルがスケジューラを1日1回進めるため、
+        このメソッドは呼び出しません。
+        """
+        self.scheduler.advance()
 
-        # 情報収集期間が1日経過したら求職開始
-        if self.state == "情報収集中" and self.elapsed_days == 1:
-            self.state = "求職中"
+    def handle_event(self, kind):
+        """スケジューラから期日を迎えたイベントを受け取る
 
-        # 日数の更新
-        if self.state != "就職中":
-            self.elapsed_days += 1
-        else:
-            self.work_days += 1
+        離職判定（TURNOVER_CHECK）はスケジューラがコホート単位でまとめて処理します。
+        """
+        if kind == GATHERING_END:
+            # 情報収集期間が1日経過したら求職開始
+            self._set_state("求職中")
 
-        # 採用通知待ち
-        if self.wait_days > 0:
-            self.wait_days -= 1
+    def schedule_turnover_check(self):
+        """次の離職判定の登録（就職日数が次の30の倍数に達した翌日）"""
+        now = self.scheduler.now
+        next_check = now + 30 - (now - self._hired_day) % 30 + 1
+        self.scheduler.schedule(next_check, self, TURNOVER_CHECK)
 
     def get_turnover_rate(self):
         """離職率を取得"""
-        turnover_rates = {
-            "freeter": {30: 0.05, 60: 0.04, 90: 0.04, 120: 0.03, 150: 0.02,
-                       180: 0.02, 210: 0.03, 240: 0.03, 270: 0.03, 300: 0.03,
-                       330: 0.03, 360: 0.03},
-            "student": {30: 0.13, 60: 0.06, 90: 0.05, 120: 0.05, 150: 0.05,
-                       180: 0.05, 210: 0.05, 240: 0.04, 270: 0.04, 300: 0.04,
-                       330: 0.04, 360: 0.04},
-            "housewife": {30: 0.03, 60: 0.02, 90: 0.02, 120: 0.02, 150: 0.02,
-                         180: 0.02, 210: 0.02, 240: 0.02, 270: 0.02, 300: 0.02,
-                         330: 0.02, 360: 0.02},
-            "foreigner": {30: 0.10, 60: 0.05, 90: 0.05, 120: 0.04, 150: 0.03,
-                         180: 0.02, 210: 0.02, 240: 0.02, 270: 0.01, 300: 0.01,
-                         330: 0.01, 360: 0.01}
-        }
-
-        if self.type in turnover_rates:
-            return turnover_rates[self.type].get(self.work_days, 0.01)
-        return 0.01
+        return turnover_rate(self.type, self.work_days)
 
     def quit_job(self):
         """離職処理"""
-        self.state = "情報収集中"
-        self.work_days = 0
+        self._set_state("情報収集中")
+        self.epoch += 1
         if self.company:
             self.company.remove_employee(self)
             self.company = None
-        self.wait_days = 0
-        self.elapsed_days = 0
+        self._start_gathering()
 
     def apply_to_company(self, company):
-        """企業への応募"""
-        self.state = "結果待ち"
+        """企業への応募（状態集計には応募先を設定してから報告する）"""
         self.company = company
-        self.wait_days = random.randint(1, 7)  # 1-7日で通知
-        self.elapsed_days = 0
+        self._set_state("結果待ち")
+        self.epoch += 1
+        now = self.scheduler.now
+        self._notify_day = now + self.rng.randint(1, 7)  # 1-7日で通知
+        self._elapsed_since = now
 
     def get_hired(self, company):
         """採用された場合の処理"""
-        self.state = "就職中"
         self.company = company
-        self.work_days = 0
-        self.elapsed_days = 0
-        self.wait_days = 0
+        self._set_state("就職中")
+        self.epoch += 1
+        self._hired_day = self.scheduler.now
+        self.schedule_turnover_check()
 
     def get_rejected(self):
         """不採用の場合の処理"""
-        self.state = "情報収集中"
+        self._set_state("情報収集中")
+        self.epoch += 1
         self.company = None
-        self.elapsed_days = 0
-        self.wait_days = 0
+        self._start_gathering()
+
+    def _set_state(self, state):
+        """状態の変更（状態集計には勤務先・応募先を外す前に報告する）"""
+        if self.tracker is not None:
+            self.tracker.on_transition(self, self.state, state)
+        self.state = state
+
+    def _start_gathering(self):
+        """情報収集期間の開始（2日後の日次処理で求職中になる）"""
+        self._elapsed_since = self.scheduler.now
+        self.scheduler.schedule(self._elapsed_since + 2, self, GATHERING_END)
 
     def __str__(self):
         """エージェントの状態を文字列で表現"""
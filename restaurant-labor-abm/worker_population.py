@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+労働者集団（列指向）
+WorkerAgent の状態を NumPy 配列の列として保持し、全労働者を一括で更新する
+"""
+import numpy as np
+from worker_agent import LEVEL_RANGES
+from turnover import TURNOVER_TABLE, TURNOVER_TYPES, MAX_TURNOVER_MONTH
+
+# 状態コード（WorkerAgent.state の文字列に対応）
+UNEMPLOYED = 0   # 未就職
+SEEKING = 1      # 求職中
+WAITING = 2      # 結果待ち
+EMPLOYED = 3     # 就職中
+GATHERING = 4    # 情報収集中
+
+STATE_NAMES = ("未就職", "求職中", "結果待ち", "就職中", "情報収集中")
+STATE_CODES = {name: code for code, name in enumerate(STATE_NAMES)}
+
+# タイプコード（WorkerAgent.type の文字列に対応）
+TYPE_NAMES = TURNOVER_TYPES  # 離職率テーブルの行と同じ並び
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+NO_COMPANY = -1  # 勤務先・応募先なし
+
+
+class WorkerPopulation:
+    """労働者集団 - 労働者の状態を列（NumPy 配列）で保持する"""
+
+    def __init__(self, types, levels, x, y, rng=None):
+        """
+        労働者集団の初期化（全員が未就職の状態から始まる）
+
+        Args:
+            types (array): タイプコード
+            levels (array): スキルレベル
+            x (array): 格子上の x 座標
+            y (array): 格子上の y 座標
+            rng (numpy.random.Generator): モデルの乱数生成器（省略時は新しく作る）
+        """
+        n = len(types)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.type = np.asarray(types, dtype=np.int8)
+        self.level = np.asarray(levels, dtype=np.int8)
+        self.x = np.asarray(x, dtype=np.int16)
+        self.y = np.asarray(y, dtype=np.int16)
+
+        self.state = np.full(n, UNEMPLOYED, dtype=np.int8)
+        self.company = np.full(n, NO_COMPANY, dtype=np.int32)
+        self.elapsed_days = np.zeros(n, dtype=np.int32)  # 離職/求職日数
+        self.work_days = np.zeros(n, dtype=np.int32)     # 就職日数
+        self.wait_days = np.zeros(n, dtype=np.int32)     # 採用通知待ち日数
+
+        # 状態遷移を記録するイベントログ（省略可）
+        self.event_log = None
+
+    @classmethod
+    def generate(cls, num_workers, type_weights, width=5, height=5, rng=None):
+        """
+        労働者集団をランダムに生成（WorkerAgent と同じ分布）
+
+        Args:
+            num_workers (int): 労働者数
+            type_weights (list): (重み, タイプ名) のリスト
+            width (int): 格子の幅
+            height (int): 格子の高さ
+            rng (numpy.random.Generator): モデルの乱数生成器（省略時は新しく作る）
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        weights = np.array([weight for weight, _ in type_weights], dtype=float)
+        codes = np.array([TYPE_CODES[name] for _, name in type_weights])
+        types = codes[rng.choice(len(codes), num_workers, p=weights / weights.sum())]
+
+        low = np.array([LEVEL_RANGES[name][0] for name in TYPE_NAMES])
+        high = np.array([LEVEL_RANGES[name][1] for name in TYPE_NAMES])
+        levels = rng.integers(low[types], high[types] + 1)
+
+        x = rng.integers(0, width, num_workers)
+        y = rng.integers(0, height, num_workers)
+        return cls(types, levels, x, y, rng)
+
+    @classmethod
+    def from_agents(cls, workers, rng=None):
+        """WorkerAgent のリストから同じ状態の労働者集団を作る"""
+        population = cls([TYPE_CODES[w.type] for w in workers],
+                         [w.level for w in workers],
+                         [w.x for w in workers],
+                         [w.y for w in workers],
+                         rng)
+        population.state[:] = [STATE_CODES[w.state] for w in workers]
+        population.company[:] = [w.company.id if w.company is not None else NO_COMPANY
+                                 for w in workers]
+        population.elapsed_days[:] = [w.elapsed_days for w in workers]
+        population.work_days[:] = [w.work_days for w in workers]
+        population.wait_days[:] = [w.wait_days for w in workers]
+        return population
+
+    def __len__(self):
+        return len(self.state)
+
+    def count(self, state):
+        """指定した状態の人数"""
+        return int(np.count_nonzero(self.state == state))
+
+    def apply_to_companies(self, workers, companies):
+        """企業への応募（WorkerAgent.apply_to_company の一括版）"""
+        self.state[workers] = WAITING
+        self.company[workers] = companies
+        self.wait_days[workers] = self.rng.integers(1, 8, len(workers))  # 1-7日で通知
+        self.elapsed_days[workers] = 0
+        if self.event_log is not None:
+            self.event_log.log_many(workers, companies, "apply")
+
+    def step(self):
+        """
+        全労働者の1ステップの行動（WorkerAgent.step の一括版）
+
+        Returns:
+            array: 離職した労働者の元の勤務先企業
+        """
+        # 就職中で30日経過ごとに離職判定（全員分の乱数を1回の配列演算で引く）
+        due = np.flatnonzero((self.state == EMPLOYED) &
+                             (self.work_days > 0) &
+                             (self.work_days % 30 == 0))
+        months = np.minimum(self.work_days[due] // 30, MAX_TURNOVER_MONTH)
+        rates = TURNOVER_TABLE[self.type[due], months]
+        quitters = due[self.rng.random(len(due)) < rates]
+        left_companies = self.company[quitters]
+        self._quit_jobs(quitters)
+
+        # 情報収集期間が1日経過したら求職開始
+        ready = (self.state == GATHERING) & (self.elapsed_days == 1)
+        self.state[ready] = SEEKING
+        if self.event_log is not None:
+            self.event_log.log_many(np.flatnonzero(ready), NO_COMPANY, "seek")
+
+        # 日数の更新
+        employed = self.state == EMPLOYED
+        self.elapsed_days[~employed] += 1
+        self.work_days[employed] += 1
+
+        # 採用通知待ち
+        np.maximum(self.wait_days - 1, 0, out=self.wait_days)
+
+        return left_companies
+
+    def decide_applicants(self, company_levels):
+        """
+        通知日を迎えた応募者の採否（CompanyAgent._process_applicants の一括版）
+
+        Args:
+            company_levels (array): 企業ごとのレベル
+
+        Returns:
+            tuple: (採用された労働者の企業, 不採用になった労働者の企業)
+        """
+        due = np.flatnonzero((self.state == WAITING) & (self.wait_days == 0))
+        companies = self.company[due]
+        accepted = company_levels[companies] - 1 <= self.level[due]
+
+        hired = due[accepted]
+        self.state[hired] = EMPLOYED
+        self.work_days[hired] = 0
+        self.elapsed_days[hired] = 0
+
+        rejected = due[~accepted]
+        if self.event_log is not None:
+            self.event_log.log_many(hired, companies[accepted], "hire")
+            self.event_log.log_many(rejected, companies[~accepted], "reject")
+        self.state[rejected] = GATHERING
+        self.company[rejected] = NO_COMPANY
+        self.elapsed_days[rejected] = 0
+
+        return companies[accepted], companies[~accepted]
+
+    def _quit_jobs(self, workers):
+        """離職処理（WorkerAgent.quit_job の一括版）"""
+        if self.event_log is not None:
+            self.event_log.log_many(workers, self.company[workers], "quit")
+        self.state[workers] = GATHERING
+        self.work_days[workers] = 0
+        self.company[workers] = NO_COMPANY
+        self.wait_days[workers] = 0
+        self.elapsed_days[workers] = 0
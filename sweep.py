@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+パラメータスイープ
+RestaurantLaborModel / SimpleEconomy をパラメータの組み合わせと反復ごとに並列実行し、
+サマリー統計と履歴を1つの表（行のリスト、CSV）にまとめる
+
+使い方:
+    python sweep.py restaurant --param num_workers=360,3600 --param num_companies=10,100 \\
+        --replicates 10 --base-seed 0 --periods 360 \\
+        --output summary.csv --history-output history.csv
+    python sweep.py simple --param num_households=20,200 --replicates 5 --periods 50
+"""
+import argparse
+import ast
+import csv
+import itertools
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from abm_common.random_streams import replicate_seed
+
+# 各プロジェクトのモジュールはスクリプトと同じディレクトリから読み込まれる前提のため、
+# 両方のディレクトリを検索パスに加える（ワーカープロセスでも同じ）
+ROOT = os.path.dirname(os.path.abspath(__file__))
+for _project in ("restaurant-labor-abm", "abm-for-beginner"):
+    _path = os.path.join(ROOT, _project)
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+# モデル名 -> (モジュール名, クラス名, 既定の実行期間)
+MODELS = {
+    "restaurant": ("restaurant_labor_model", "RestaurantLaborModel", 360),
+    "restaurant-array": ("array_model", "ArrayRestaurantLaborModel", 360),
+    "simple": ("SimpleEconomy", "SimpleEconomy", 50),
+}
+
+
+def load_model_class(model):
+    """モデル名からモデルクラスを読み込む"""
+    if model not in MODELS:
+        raise ValueError(f"未対応のモデルです: {model}")
+    module_name, class_name, _ = MODELS[model]
+    module = __import__(module_name)
+    return getattr(module, class_name)
+
+
+def expand_grid(grid):
+    """
+    パラメータグリッドを組み合わせのリストに展開
+
+    Args:
+        grid (dict): パラメータ名 -> 値のリスト
+
+    Returns:
+        list: パラメータ名 -> 値 の辞書のリスト（全組み合わせ）
+    """
+    names = list(grid)
+    return [dict(zip(names, values))
+            for values in itertools.product(*(grid[name] for name in names))]
+
+
+def run_one(model, params, base_seed, replicate, periods):
+    """
+    1回分のシミュレーション（ワーカープロセスで実行される）
+
+    モデルには元シードと反復の番号から作った子シードを渡すため、
+    結果はどのプロセスで何番目に実行されたかに依存しません。
+    例外は呼び出し元に投げず、status="error" の結果として返します。
+
+    Args:
+        model (str): モデル名（MODELS のキー）
+        params (dict): モデルのコンストラクタ引数
+        base_seed (int): 元になる乱数シード
+        replicate (int): 反復の番号
+        periods (int): 実行期間
+
+    Returns:
+        dict: params, base_seed, replicate, status, summary, history, error, elapsed
+    """
+    result = {"model": model, "params": params, "base_seed": base_seed,
+              "replicate": replicate, "periods": periods,
+              "status": "ok", "summary": {}, "history": {}, "error": None}
+    start = time.perf_counter()
+    try:
+        seed = replicate_seed(base_seed, replicate)
+        instance = load_model_class(model)(**params, seed=seed)
+        result["history"] = instance.run_simulation(periods=periods, verbose=False)
+        result["summary"] = instance.get_summary_statistics()
+    except Exception:
+        result["status"] = "error"
+        result["error"] = traceback.format_exc()
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def run_sweep(model, grid, replicates=1, base_seed=0, periods=None, processes=None,
+              progress=True):
+    """
+    パラメータスイープの実行
+
+    パラメータの組み合わせ × 反復の各実行をプロセスプールに割り振ります。
+    反復 r は全ての組み合わせで同じ子シードを使うため（共通乱数）、
+    組み合わせ間の差にシードの違いによるばらつきが混ざりにくくなります。
+    失敗した実行は status="error" として記録し、残りの実行は続けます
+    （ワーカープロセスが異常終了した場合も、その実行だけを失敗として残りを新しいプールで続けます）。
+
+    Args:
+        model (str): モデル名（"restaurant", "restaurant-array", "simple"）
+        grid (dict): パラメータ名 -> 値のリスト
+        replicates (int): 組み合わせごとの反復回数
+        base_seed (int): 子シードの元になる乱数シード
+        periods (int): 実行期間（省略時はモデルごとの既定値）
+        processes (int): プロセス数（省略時は CPU コア数）
+        progress (bool): 進捗を標準エラー出力に表示するか
+
+    Returns:
+        list: run_one の結果のリスト（組み合わせ・反復の順）
+    """
+    load_model_class(model)  # モデル名の確認
+    if periods is None:
+        periods = MODELS[model][2]
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    runs = [(params, replicate) for params in expand_grid(grid)
+            for replicate in range(replicates)]
+    results = [None] * len(runs)
+    start = time.perf_counter()
+
+    def record(index, result):
+        results[index] = result
+        if progress:
+            done = sum(1 for r in results if r is not None)
+            failures = sum(1 for r in results if r is not None and r["status"] != "ok")
+            params, replicate = runs[index]
+            print(f"[{done}/{len(runs)}] {result['status']:5s} "
+                  f"{_format_params(params)} replicate={replicate} "
+                  f"({result['elapsed']:.1f}s, 経過 {time.perf_counter() - start:.1f}s, "
+                  f"失敗 {failures})", file=sys.stderr)
+
+    pending = list(range(len(runs)))
+    while pending:
+        # ワーカープロセスが異常終了するとプール全体が使えなくなるため、
+        # その時点で実行中だった実行を1つずつ別のプロセスでやり直して異常終了した実行を特定し、
+        # 残りの実行は新しいプールで続ける
+        suspects = _run_pool(model, runs, pending, base_seed, periods, processes, record)
+        _run_isolated(model, runs, suspects, base_seed, periods, record)
+        pending = [index for index in pending if results[index] is None]
+
+    return results
+
+
+def _run_pool(model, runs, indices, base_seed, periods, processes, record):
+    """
+    プロセスプールで実行（同時に投入する実行はプロセス数まで）
+
+    Returns:
+        list: プールが壊れた時点で実行中だった実行の番号（最後まで実行できた場合は空）
+    """
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        queue = iter(indices)
+        futures = {}
+
+        def submit_next():
+            index = next(queue, None)
+            if index is not None:
+                params, replicate = runs[index]
+                futures[executor.submit(run_one, model, params, base_seed, replicate,
+                                        periods)] = index
+
+        for _ in range(processes):
+            submit_next()
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            broken = []
+            for future in done:
+                index = futures.pop(future)
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    broken.append(index)
+                    continue
+                except Exception:
+                    result = _error_result(model, runs[index], base_seed, periods,
+                                           traceback.format_exc())
+                record(index, result)
+            if broken:
+                return broken + list(futures.values())
+            try:
+                for _ in done:
+                    submit_next()
+            except BrokenProcessPool:
+                return list(futures.values())
+    return []
+
+
+def _run_isolated(model, runs, indices, base_seed, periods, record):
+    """実行ごとに専用のプロセスで並列に実行（異常終了したプロセスの実行だけを失敗とする）"""
+    executors = [ProcessPoolExecutor(max_workers=1) for _ in indices]
+    try:
+        futures = [executor.submit(run_one, model, *runs[index], base_seed, periods)
+                   for executor, index in zip(executors, indices)]
+        for index, future in zip(indices, futures):
+            try:
+                result = future.result()
+            except Exception:
+                # ワーカープロセス自体の異常終了（メモリ不足で強制終了された場合など）
+                result = _error_result(model, runs[index], base_seed, periods,
+                                       traceback.format_exc())
+            record(index, result)
+    finally:
+        for executor in executors:
+            executor.shutdown()
+
+
+def _error_result(model, run, base_seed, periods, error):
+    """実行できなかった実行の結果（run_one の結果と同じ形式）"""
+    params, replicate = run
+    return {"model": model, "params": params, "base_seed": base_seed,
+            "replicate": replicate, "periods": periods, "status": "error",
+            "summary": {}, "history": {}, "error": error, "elapsed": 0.0}
+
+
+def summary_table(results):
+    """
+    実行ごとに1行のサマリー表
+
+    Returns:
+        list: パラメータ・反復・status・サマリー統計を列とする辞書のリスト
+    """
+    rows = []
+    for run_id, result in enumerate(results):
+        row = {"run_id": run_id, "model": result["model"]}
+        row.update(result["params"])
+        row.update({"base_seed": result["base_seed"], "replicate": result["replicate"],
+                    "periods": result["periods"],
+                    "status": result["status"], "elapsed": result["elapsed"]})
+        row.update(result["summary"])
+        if result["error"] is not None:
+            row["error"] = result["error"].strip().splitlines()[-1]
+        rows.append(row)
+    return rows
+
+
+def history_table(results):
+    """
+    実行ごと・時点ごとに1行の履歴表（成功した実行のみ）
+
+    Returns:
+        list: run_id・パラメータ・反復・履歴の各系列を列とする辞書のリスト
+    """
+    rows = []
+    for run_id, result in enumerate(results):
+        history = result["history"]
+        if result["status"] != "ok" or not history:
+            continue
+        keys = list(history)
+        for values in zip(*(history[key] for key in keys)):
+            row = {"run_id": run_id}
+            row.update(result["params"])
+            row["replicate"] = result["replicate"]
+            row.update(zip(keys, values))
+            rows.append(row)
+    return rows
+
+
+def write_csv(rows, path):
+    """辞書のリストを CSV に書き出す（列は全行の和集合、初出順）"""
+    columns = []
+    for row in rows:
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _format_params(params):
+    return " ".join(f"{name}={value}" for name, value in params.items())
+
+
+def _parse_value(text):
+    """コマンドライン引数の値を Python の値として解釈（解釈できなければ文字列）"""
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def _parse_param(text):
+    """"name=v1,v2,..." を (name, [v1, v2, ...]) に変換"""
+    name, sep, values = text.partition("=")
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f"name=値1,値2,... の形式で指定してください: {text}")
+    return name.strip(), [_parse_value(v.strip()) for v in values.split(",")]
+
+
+def main(argv=None):
+    """コマンドラインからのスイープ実行"""
+    parser = argparse.ArgumentParser(description="ABM のパラメータスイープ")
+    parser.add_argument("model", choices=sorted(MODELS), help="実行するモデル")
+    parser.add_argument("--param", action="append", type=_parse_param, default=[],
+                        metavar="NAME=V1,V2,...", help="スイープするパラメータ（複数指定可）")
+    parser.add_argument("--replicates", type=int, default=1, help="組み合わせごとの反復回数")
+    parser.add_argument("--base-seed", type=int, default=0, help="子シードの元になる乱数シード")
+    parser.add_argument("--periods", type=int, default=None, help="実行期間")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="プロセス数（既定: CPU コア数）")
+    parser.add_argument("--output", default="sweep_summary.csv", help="サマリー表の出力先")
+    parser.add_argument("--history-output", default=None, help="履歴表の出力先（省略時は出力しない）")
+    parser.add_argument("--quiet", action="store_true", help="進捗を表示しない")
+    args = parser.parse_args(argv)
+
+    grid = dict(args.param)
+    results = run_sweep(args.model, grid, replicates=args.replicates, base_seed=args.base_seed,
+                        periods=args.periods, processes=args.processes,
+                        progress=not args.quiet)
+
+    write_csv(summary_table(results), args.output)
+    if args.history_output:
+        write_csv(history_table(results), args.history_output)
+
+    failures = sum(1 for result in results if result["status"] != "ok")
+    print(f"{len(results)}件中 {len(results) - failures}件成功、{failures}件失敗。"
+          f"サマリー: {args.output}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())